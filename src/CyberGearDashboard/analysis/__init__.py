@@ -0,0 +1,8 @@
+from .frames import (
+    FRAME_DTYPE,
+    FEEDBACK_DTYPE,
+    load_frames,
+    iter_frames,
+    feedback_by_motor,
+)
+from .session import SessionFile, SessionWriter, convert_to_session
@@ -0,0 +1,361 @@
+import os
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+
+from CyberGearDriver.constants import Command, P_MIN, V_MIN, T_MIN
+
+from CyberGearDashboard.protocol import (
+    DATA_SHIFT,
+    DATA_MASK,
+    DEFAULT_HOST_CAN_ID,
+    DEVICE_ID_REPLY,
+    FEEDBACK_FAULT_SHIFT,
+    FEEDBACK_FAULT_MASK,
+    MODE_SHIFT,
+    MODE_MASK,
+    MODE_STATUS_SHIFT,
+    MODE_STATUS_MASK,
+    MOTOR_ID_MASK,
+    PARAMETER_STRUCTS,
+    POSITION_SCALE,
+    RES_SHIFT,
+    RES_MASK,
+    TEMPERATURE_SCALE,
+    TORQUE_SCALE,
+    VELOCITY_SCALE,
+)
+
+# One CAN frame, fixed-stride (24 bytes)
+FRAME_DTYPE = np.dtype(
+    [
+        ("timestamp", "<f8"),
+        ("arbitration_id", "<u4"),
+        ("dlc", "u1"),
+        ("flags", "u1"),
+        ("reserved", "u1", (2,)),
+        ("data", "u1", (8,)),
+    ]
+)
+
+# Frame flags
+FLAG_EXTENDED = 0x01
+FLAG_ERROR = 0x02
+FLAG_TX = 0x04
+
+# candump marks error frames with this bit of the CAN ID (CAN_ERR_FLAG)
+CAN_ERR_FLAG = 0x20000000
+CAN_ID_MASK = 0x1FFFFFFF
+
+# Decoded motor feedback, one row per feedback frame
+FEEDBACK_DTYPE = np.dtype(
+    [
+        ("timestamp", "<f8"),
+        ("position", "<f8"),
+        ("velocity", "<f8"),
+        ("torque", "<f8"),
+        ("temperature", "<f8"),
+        ("faults", "u1"),
+        ("mode_status", "u1"),
+    ]
+)
+
+# Decoded parameter values, one row per parameter reply
+PARAMETER_DTYPE = np.dtype(
+    [("timestamp", "<f8"), ("motor_id", "u1"), ("addr", "<u2"), ("value", "<f8")]
+)
+
+# Frames are read from text logs in chunks of about this many bytes
+CHUNK_BYTES = 64 * 1024 * 1024
+
+# Hex digit values, by ASCII code (invalid digits are 0xFF)
+HEX_VALUES = np.full(256, 0xFF, dtype=np.uint8)
+for _digit, _char in enumerate(b"0123456789abcdef"):
+    HEX_VALUES[_char] = _digit
+    HEX_VALUES[ord(chr(_char).upper())] = _digit
+
+# Numpy value types for each parameter address, for decoding parameter replies
+_PARAMETER_DTYPES = {"<B": "u1", "<H": "<u2", "<h": "<i2", "<I": "<u4", "<i": "<i4"}
+_PARAMETER_DTYPES["<f"] = "<f4"
+PARAMETER_TYPES = {
+    addr: np.dtype(_PARAMETER_DTYPES[unpacker.format])
+    for addr, unpacker in PARAMETER_STRUCTS.items()
+}
+
+
+def empty_frames(count: int = 0) -> np.ndarray:
+    return np.zeros(count, dtype=FRAME_DTYPE)
+
+
+def id_fields(frames: np.ndarray) -> Dict[str, np.ndarray]:
+    """Split the arbitration IDs into the same fields as `listen.ExCanIdInfo`"""
+    arbitration_id = frames["arbitration_id"]
+    return {
+        "id": (arbitration_id & MOTOR_ID_MASK).astype(np.uint8),
+        "data": ((arbitration_id >> DATA_SHIFT) & DATA_MASK).astype(np.uint16),
+        "mode": ((arbitration_id >> MODE_SHIFT) & MODE_MASK).astype(np.uint8),
+        "res": ((arbitration_id >> RES_SHIFT) & RES_MASK).astype(np.uint8),
+    }
+
+
+def reply_mask(frames: np.ndarray, mode: Optional[int] = None) -> np.ndarray:
+    """Which frames were sent by a motor (optionally, only of one communication type)"""
+    arbitration_id = frames["arbitration_id"]
+    destination = arbitration_id & MOTOR_ID_MASK
+    mask = (frames["flags"] & FLAG_ERROR) == 0
+    mask &= (destination == DEFAULT_HOST_CAN_ID) | (destination == DEVICE_ID_REPLY)
+    if mode is not None:
+        mask &= ((arbitration_id >> MODE_SHIFT) & MODE_MASK) == mode
+    return mask
+
+
+def sender_ids(frames: np.ndarray) -> np.ndarray:
+    return ((frames["arbitration_id"] >> DATA_SHIFT) & 0xFF).astype(np.uint8)
+
+
+def decode_feedback(frames: np.ndarray) -> np.ndarray:
+    """
+    Decode motor feedback frames (all frames given must be feedback replies).
+    Returns a FEEDBACK_DTYPE array.
+    """
+    data = frames["data"].astype(np.uint16)
+    arbitration_id = frames["arbitration_id"]
+    result = np.empty(len(frames), dtype=FEEDBACK_DTYPE)
+    result["timestamp"] = frames["timestamp"]
+    result["position"] = ((data[:, 0] << 8) | data[:, 1]) * POSITION_SCALE + P_MIN
+    result["velocity"] = ((data[:, 2] << 8) | data[:, 3]) * VELOCITY_SCALE + V_MIN
+    result["torque"] = ((data[:, 4] << 8) | data[:, 5]) * TORQUE_SCALE + T_MIN
+    result["temperature"] = ((data[:, 6] << 8) | data[:, 7]) * TEMPERATURE_SCALE
+    result["faults"] = (arbitration_id >> FEEDBACK_FAULT_SHIFT) & FEEDBACK_FAULT_MASK
+    result["mode_status"] = (arbitration_id >> MODE_STATUS_SHIFT) & MODE_STATUS_MASK
+    return result
+
+
+def decode_parameters(frames: np.ndarray) -> np.ndarray:
+    """Decode all parameter read replies. Returns a PARAMETER_DTYPE array."""
+    mask = reply_mask(frames, Command.READ_PARAM_UPPER.value)
+    mask |= reply_mask(frames, Command.READ_PARAM_LOWER.value)
+    replies = frames[mask]
+    data = replies["data"]
+
+    result = np.empty(len(replies), dtype=PARAMETER_DTYPE)
+    result["timestamp"] = replies["timestamp"]
+    result["motor_id"] = sender_ids(replies)
+    result["addr"] = data[:, 0].astype(np.uint16) | (data[:, 1].astype(np.uint16) << 8)
+    result["value"] = np.nan
+
+    # Reinterpret the value bytes once per parameter type
+    value_bytes = np.ascontiguousarray(data[:, 4:8])
+    for dtype in set(PARAMETER_TYPES.values()):
+        addrs = [addr for addr, t in PARAMETER_TYPES.items() if t == dtype]
+        rows = np.isin(result["addr"], addrs)
+        if rows.any():
+            raw = value_bytes[rows, : dtype.itemsize].copy().view(dtype)
+            result["value"][rows] = raw[:, 0]
+    return result
+
+
+def split_by_motor(motor_ids: np.ndarray, values: np.ndarray) -> Dict[int, np.ndarray]:
+    """Split rows into one array per motor ID, keeping their order"""
+    order = np.argsort(motor_ids, kind="stable")
+    sorted_ids = motor_ids[order]
+    ids, starts = np.unique(sorted_ids, return_index=True)
+    groups = np.split(values[order], starts[1:])
+    return {int(id): group for id, group in zip(ids, groups)}
+
+
+def feedback_by_motor(frames: np.ndarray) -> Dict[int, np.ndarray]:
+    """Decode all feedback frames into a time series (FEEDBACK_DTYPE) per motor ID"""
+    feedback = frames[reply_mask(frames, Command.STATE.value)]
+    return split_by_motor(sender_ids(feedback), decode_feedback(feedback))
+
+
+def parameters_by_motor(frames: np.ndarray) -> Dict[int, np.ndarray]:
+    """Decode all parameter replies (PARAMETER_DTYPE) per motor ID"""
+    parameters = decode_parameters(frames)
+    return split_by_motor(parameters["motor_id"], parameters)
+
+
+def parse_hex(columns: np.ndarray) -> np.ndarray:
+    """Parse a 2D array of ASCII hex digits (one number per row) into integers"""
+    digits = HEX_VALUES[columns].astype(np.uint64)
+    powers = np.uint64(16) ** np.arange(columns.shape[1] - 1, -1, -1, dtype=np.uint64)
+    return digits @ powers
+
+
+def parse_decimal(columns: np.ndarray) -> np.ndarray:
+    """Parse a 2D array of ASCII decimal digits (one number per row) into integers"""
+    digits = columns.astype(np.int64) - ord("0")
+    powers = 10 ** np.arange(columns.shape[1] - 1, -1, -1, dtype=np.int64)
+    return digits @ powers
+
+
+def parse_candump_block(lines: np.ndarray) -> Optional[np.ndarray]:
+    """
+    Parse equal length candump log lines, all at once, as a 2D array of bytes.
+    For example: `(1436509052.249713) can0 0200007F#7FFF80007FFF012C`
+    Returns None if the lines don't all share the same layout.
+    """
+    first = lines[0].tobytes()
+    try:
+        dot = first.index(b".")
+        close = first.index(b")")
+        space = first.rindex(b" ")
+        hash = first.index(b"#")
+    except ValueError:
+        return None
+    if first[0:1] != b"(" or not close < space < hash:
+        return None
+    layout = (dot, close, space, hash)
+    expected = np.frombuffer(b".) #", dtype=np.uint8)
+    if not (lines[:, layout] == expected).all():
+        return None
+
+    id_columns = lines[:, space + 1 : hash]
+    data_columns = lines[:, hash + 1 :]
+    if data_columns.shape[1] % 2 or data_columns.shape[1] > 16:
+        return None
+    if (HEX_VALUES[id_columns] == 0xFF).any() or (
+        HEX_VALUES[data_columns] == 0xFF
+    ).any():
+        return None
+
+    frames = empty_frames(len(lines))
+    seconds = parse_decimal(lines[:, 1:dot])
+    fraction = parse_decimal(lines[:, dot + 1 : close])
+    frames["timestamp"] = seconds + fraction / 10 ** (close - dot - 1)
+    arbitration_ids = parse_hex(id_columns)
+    error = (arbitration_ids & CAN_ERR_FLAG) != 0
+    frames["arbitration_id"] = arbitration_ids & CAN_ID_MASK
+    frames["flags"] = np.where(error, FLAG_ERROR, 0) | (
+        FLAG_EXTENDED if hash - space - 1 > 3 else 0
+    )
+
+    dlc = data_columns.shape[1] // 2
+    frames["dlc"] = dlc
+    if dlc:
+        nibbles = HEX_VALUES[data_columns].reshape(len(lines), dlc, 2)
+        frames["data"][:, :dlc] = (nibbles[:, :, 0] << 4) | nibbles[:, :, 1]
+    return frames
+
+
+def parse_candump_line(line: bytes) -> Optional[np.ndarray]:
+    """Parse a single candump log line the slow way (i.e. remote or error frames)"""
+    try:
+        timestamp, _channel, frame = line.split()
+        can_id, data = frame.split(b"#", 1)
+    except ValueError:
+        return None
+    result = empty_frames(1)
+    result["timestamp"] = float(timestamp.strip(b"()"))
+    result["arbitration_id"] = int(can_id, 16)
+    flags = FLAG_EXTENDED if len(can_id) > 3 else 0
+    if result["arbitration_id"][0] & CAN_ERR_FLAG:
+        flags |= FLAG_ERROR
+        result["arbitration_id"] &= CAN_ID_MASK
+    result["flags"] = flags
+    if not data.startswith(b"R"):
+        payload = bytes.fromhex(data.decode()[:16])
+        result["dlc"] = len(payload)
+        result["data"][0, : len(payload)] = list(payload)
+    return result
+
+
+def parse_candump(buffer: bytes) -> np.ndarray:
+    """Parse a block of complete candump log lines"""
+    raw = np.frombuffer(buffer, dtype=np.uint8)
+    ends = np.flatnonzero(raw == ord("\n"))
+    if len(ends) == 0:
+        return empty_frames()
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    lengths = ends - starts
+
+    # Lines with the same length almost always share the same layout,
+    # so each group can be parsed as one 2D array
+    parts = []
+    positions = []
+    for length in np.unique(lengths):
+        if length == 0:
+            continue
+        rows = np.flatnonzero(lengths == length)
+        lines = raw[starts[rows, None] + np.arange(length)]
+        frames = parse_candump_block(lines)
+        if frames is None:
+            frames = [parse_candump_line(line.tobytes()) for line in lines]
+            keep = [i for i, frame in enumerate(frames) if frame is not None]
+            frames = (
+                np.concatenate([frames[i] for i in keep]) if keep else empty_frames()
+            )
+            rows = rows[keep]
+        parts.append(frames)
+        positions.append(rows)
+
+    if not parts:
+        return empty_frames()
+    frames = np.concatenate(parts)
+    return frames[np.argsort(np.concatenate(positions), kind="stable")]
+
+
+def iter_candump(path: str, chunk_bytes: int = CHUNK_BYTES) -> Iterator[np.ndarray]:
+    """Read a candump log file (`candump -L`), in chunks of frames"""
+    with open(path, "rb") as file:
+        remainder = b""
+        while True:
+            block = file.read(chunk_bytes)
+            if not block:
+                break
+            block = remainder + block
+            cut = block.rfind(b"\n") + 1
+            remainder = block[cut:]
+            yield parse_candump(block[:cut])
+        if remainder.strip():
+            yield parse_candump(remainder + b"\n")
+
+
+def iter_python_can(path: str, chunk_size: int = 1_000_000) -> Iterator[np.ndarray]:
+    """Read any log format python-can supports (asc, blf, trc, csv, ...), in chunks of frames"""
+    import can
+
+    frames = empty_frames(chunk_size)
+    count = 0
+    for msg in can.LogReader(path):
+        frame = frames[count]
+        frame["timestamp"] = msg.timestamp
+        frame["arbitration_id"] = msg.arbitration_id
+        frame["dlc"] = min(msg.dlc, 8)
+        frame["flags"] = (
+            (FLAG_EXTENDED if msg.is_extended_id else 0)
+            | (FLAG_ERROR if msg.is_error_frame else 0)
+            | (0 if msg.is_rx else FLAG_TX)
+        )
+        frame["data"][: len(msg.data[:8])] = list(msg.data[:8])
+        count += 1
+        if count == chunk_size:
+            yield frames
+            frames = empty_frames(chunk_size)
+            count = 0
+    if count:
+        yield frames[:count]
+
+
+def iter_frames(path: str) -> Iterator[np.ndarray]:
+    """Read a CAN log file in chunks of frames (FRAME_DTYPE), choosing the reader by extension"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".cgs":
+        from CyberGearDashboard.analysis.session import SessionFile
+
+        yield from SessionFile(path).iter_chunks()
+    elif extension == ".npy":
+        yield np.load(path, mmap_mode="r")
+    elif extension in (".log", ".candump"):
+        yield from iter_candump(path)
+    else:
+        yield from iter_python_can(path)
+
+
+def load_frames(path: str) -> np.ndarray:
+    """Load a whole CAN log file into one FRAME_DTYPE array"""
+    chunks = list(iter_frames(path))
+    if len(chunks) == 1:
+        return chunks[0]
+    return np.concatenate(chunks) if chunks else empty_frames()
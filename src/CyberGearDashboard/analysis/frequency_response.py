@@ -0,0 +1,140 @@
+import math
+from typing import Optional, Tuple
+
+import numpy as np
+
+# The response is averaged over this many half-overlapping segments (Welch's method)
+DEFAULT_SEGMENTS = 8
+
+# Below this coherence, the output isn't explained by the input (noise, nonlinearity)
+MIN_COHERENCE = 0.6
+
+
+class FrequencyResponse:
+    """A measured frequency response (transfer function estimate) and its coherence"""
+
+    frequency: np.ndarray
+    response: np.ndarray
+    coherence: np.ndarray
+
+    def __init__(
+        self, frequency: np.ndarray, response: np.ndarray, coherence: np.ndarray
+    ):
+        self.frequency = frequency
+        self.response = response
+        self.coherence = coherence
+
+    @property
+    def magnitude_db(self) -> np.ndarray:
+        with np.errstate(divide="ignore"):
+            return 20 * np.log10(np.abs(self.response))
+
+    @property
+    def phase_deg(self) -> np.ndarray:
+        return np.degrees(np.unwrap(np.angle(self.response)))
+
+    def valid(self, min_coherence: float = MIN_COHERENCE) -> np.ndarray:
+        """Which points can be trusted"""
+        return (self.frequency > 0) & (self.coherence >= min_coherence)
+
+
+def multisine(
+    t: np.ndarray, frequencies: np.ndarray, amplitude: float = 1.0
+) -> np.ndarray:
+    """
+    A sum of sines at `frequencies`, with Schroeder phases to keep the peak low,
+    scaled so the peak is `amplitude`.
+    """
+    count = len(frequencies)
+    k = np.arange(1, count + 1)
+    phases = -math.pi * k * (k - 1) / count
+    signal = np.cos(2 * math.pi * np.outer(t, frequencies) + phases).sum(axis=1)
+    peak = np.abs(signal).max()
+    return signal * (amplitude / peak) if peak else signal
+
+
+def log_frequencies(
+    start: float, end: float, count: int, resolution: float
+) -> np.ndarray:
+    """
+    About `count` log spaced frequencies between start and end, snapped to multiples
+    of `resolution` (the FFT bin width) so no energy leaks between bins.
+    """
+    start = max(start, resolution)
+    bins = np.round(np.geomspace(start, end, count) / resolution)
+    return np.unique(bins[bins > 0]) * resolution
+
+
+def segments(signal: np.ndarray, length: int) -> np.ndarray:
+    """Split a signal into half-overlapping segments, one per row"""
+    step = max(length // 2, 1)
+    return np.lib.stride_tricks.sliding_window_view(signal, length)[::step]
+
+
+def transfer_function(
+    u: np.ndarray, y: np.ndarray, rate: float, segment_count: int = DEFAULT_SEGMENTS
+) -> FrequencyResponse:
+    """
+    Estimate the frequency response from input `u` to output `y` (uniformly sampled
+    at `rate`), with the H1 estimator: cross spectrum over input spectrum, averaged
+    over Hann windowed segments.
+    """
+    length = min(len(u), len(y))
+    segment_length = max(2 * length // (segment_count + 1), 2)
+    window = np.hanning(segment_length)
+
+    def spectra(signal: np.ndarray) -> np.ndarray:
+        rows = segments(signal[:length], segment_length)
+        rows = rows - rows.mean(axis=1, keepdims=True)
+        return np.fft.rfft(rows * window, axis=1)
+
+    U = spectra(u)
+    Y = spectra(y)
+    Puu = np.mean(np.abs(U) ** 2, axis=0)
+    Pyy = np.mean(np.abs(Y) ** 2, axis=0)
+    Puy = np.mean(np.conj(U) * Y, axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        response = Puy / Puu
+        coherence = np.abs(Puy) ** 2 / (Puu * Pyy)
+    frequency = np.fft.rfftfreq(segment_length, 1.0 / rate)
+    return FrequencyResponse(frequency, response, np.nan_to_num(coherence))
+
+
+def align(
+    input_times: np.ndarray,
+    inputs: np.ndarray,
+    output_times: np.ndarray,
+    outputs: np.ndarray,
+    rate: float,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Resample timestamped input and output samples onto a common grid at `rate`,
+    over the time they overlap. Input samples that weren't sent (NaN times) are dropped.
+    """
+    sent = ~np.isnan(input_times)
+    input_times = input_times[sent]
+    inputs = inputs[sent]
+    start = max(input_times[0], output_times[0])
+    end = min(input_times[-1], output_times[-1])
+    grid = np.arange(start, end, 1.0 / rate)
+
+    # The input is held between sends (zero-order hold)
+    held = np.searchsorted(input_times, grid, side="right") - 1
+    return inputs[held], np.interp(grid, output_times, outputs)
+
+
+def measure(
+    input_times: np.ndarray,
+    inputs: np.ndarray,
+    output_times: np.ndarray,
+    outputs: np.ndarray,
+    rate: float,
+    segment_count: int = DEFAULT_SEGMENTS,
+) -> Optional[FrequencyResponse]:
+    """The frequency response from timestamped samples (None without enough overlap)"""
+    if np.count_nonzero(~np.isnan(input_times)) < 2 or len(output_times) < 2:
+        return None
+    u, y = align(input_times, inputs, output_times, outputs, rate)
+    if len(u) < segment_count * 4:
+        return None
+    return transfer_function(u, y, rate, segment_count)
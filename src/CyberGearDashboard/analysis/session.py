@@ -0,0 +1,280 @@
+import os
+import time
+import struct
+import threading
+from typing import Iterator, List, Optional
+
+import can
+import numpy as np
+
+from CyberGearDriver.constants import Command
+
+from CyberGearDashboard.analysis.frames import (
+    FRAME_DTYPE,
+    FLAG_EXTENDED,
+    FLAG_ERROR,
+    FLAG_TX,
+    decode_feedback,
+    empty_frames,
+    reply_mask,
+    sender_ids,
+)
+
+# Session file layout: a short header followed by fixed-stride FRAME_DTYPE records
+SESSION_MAGIC = b"CGSESS\x00\x01"
+SESSION_HEADER = struct.Struct("<8sII16x")  # magic, record size, index stride
+SESSION_EXTENSION = ".cgs"
+
+# The time index (a sidecar `.idx` file) holds the timestamp of every Nth frame
+INDEX_STRIDE = 4096
+INDEX_EXTENSION = ".idx"
+
+# One record, packed the same as FRAME_DTYPE
+RECORD_STRUCT = struct.Struct("<dIBB2x8s")
+
+# Frames are buffered and written to disk in blocks
+WRITE_BLOCK_FRAMES = 4096
+
+# Large windows are read as this many frames, in evenly spaced contiguous blocks
+MAX_WINDOW_FRAMES = 500_000
+SAMPLE_BLOCK_FRAMES = 512
+
+# Chunk size for streaming a whole session
+READ_CHUNK_FRAMES = 4_000_000
+
+assert RECORD_STRUCT.size == FRAME_DTYPE.itemsize
+
+
+def index_path(path: str) -> str:
+    return path + INDEX_EXTENSION
+
+
+class SessionWriter:
+    """
+    Records CAN frames to a session file. Safe to call from the receive and send threads.
+
+    Frames are stamped with the wall clock. Received frames keep the adapter's timing,
+    shifted by the offset between the two clocks, measured at the first received frame.
+    """
+
+    path: str
+    count: int
+    clock_offset: Optional[float]
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self.lock = threading.Lock()
+        self.buffer = bytearray(WRITE_BLOCK_FRAMES * RECORD_STRUCT.size)
+        self.buffered = 0
+        self.index: List[float] = []
+        self.indexed = 0
+        self.last_timestamp = 0.0
+        self.clock_offset = None
+
+        self.file = open(path, "wb")
+        self.file.write(
+            SESSION_HEADER.pack(SESSION_MAGIC, RECORD_STRUCT.size, INDEX_STRIDE)
+        )
+        self.index_file = open(index_path(path), "wb")
+
+    def message_received(self, msg: can.Message):
+        if not msg.timestamp:
+            self.add(msg, time.time(), 0)
+            return
+        if self.clock_offset is None:
+            self.clock_offset = time.time() - msg.timestamp
+        self.add(msg, msg.timestamp + self.clock_offset, 0)
+
+    def message_sent(self, msg: can.Message):
+        self.add(msg, time.time(), FLAG_TX)
+
+    def add(self, msg: can.Message, timestamp: float, flags: int):
+        if msg.is_extended_id:
+            flags |= FLAG_EXTENDED
+        if msg.is_error_frame:
+            flags |= FLAG_ERROR
+        data = bytes(msg.data[:8])
+        with self.lock:
+            if self.file is None:
+                return
+            # Index entries must never go backwards, or the lookup can't bisect them
+            if self.count % INDEX_STRIDE == 0:
+                self.index.append(max(timestamp, self.last_timestamp))
+            self.last_timestamp = max(timestamp, self.last_timestamp)
+
+            RECORD_STRUCT.pack_into(
+                self.buffer,
+                self.buffered * RECORD_STRUCT.size,
+                timestamp,
+                msg.arbitration_id,
+                len(data),
+                flags,
+                data,
+            )
+            self.count += 1
+            self.buffered += 1
+            if self.buffered == WRITE_BLOCK_FRAMES:
+                self.flush()
+
+    def write_frames(self, frames: np.ndarray):
+        """Append an array of frames (FRAME_DTYPE), i.e. to convert another log"""
+        with self.lock:
+            self.flush()
+            first = (-self.count) % INDEX_STRIDE
+            timestamps = np.maximum.accumulate(
+                np.maximum(frames["timestamp"], self.last_timestamp)
+            )
+            self.index.extend(timestamps[first::INDEX_STRIDE].tolist())
+            if len(frames):
+                self.last_timestamp = float(timestamps[-1])
+            self.file.write(np.ascontiguousarray(frames, dtype=FRAME_DTYPE).tobytes())
+            self.count += len(frames)
+            self.flush()
+
+    def flush(self):
+        """Write the buffered frames and index entries to disk (call with the lock held)"""
+        if self.buffered:
+            self.file.write(self.buffer[: self.buffered * RECORD_STRUCT.size])
+            self.buffered = 0
+        if len(self.index) > self.indexed:
+            self.index_file.write(np.array(self.index[self.indexed :]).tobytes())
+            self.indexed = len(self.index)
+        self.file.flush()
+        self.index_file.flush()
+
+    def close(self):
+        with self.lock:
+            if self.file is None:
+                return
+            self.flush()
+            self.file.close()
+            self.index_file.close()
+            self.file = None
+
+
+class SessionFile:
+    """
+    A memory-mapped session file. Nothing is read until it's used, so only the pages
+    for the time window being looked at are ever loaded.
+    """
+
+    path: str
+    frames: np.ndarray
+    index: np.ndarray
+    index_stride: int
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as file:
+            magic, record_size, self.index_stride = SESSION_HEADER.unpack(
+                file.read(SESSION_HEADER.size)
+            )
+        if magic != SESSION_MAGIC or record_size != FRAME_DTYPE.itemsize:
+            raise ValueError(f"{path} is not a CyberGear session file")
+
+        # A partly written last record (i.e. after a crash) is ignored
+        size = os.path.getsize(path) - SESSION_HEADER.size
+        count = size // record_size
+        if count:
+            self.frames = np.memmap(
+                path,
+                dtype=FRAME_DTYPE,
+                mode="r",
+                offset=SESSION_HEADER.size,
+                shape=(count,),
+            )
+        else:
+            self.frames = empty_frames()
+        self.index = self.load_index()
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def load_index(self) -> np.ndarray:
+        """Load the time index, rebuilding the part that's missing (i.e. after a crash)"""
+        entries = -(-len(self.frames) // self.index_stride)
+        index = np.empty(0)
+        if os.path.exists(index_path(self.path)):
+            index = np.fromfile(index_path(self.path), dtype="<f8")[:entries]
+        if len(index) < entries:
+            start = len(index) * self.index_stride
+            rebuilt = self.frames["timestamp"][start :: self.index_stride]
+            floor = index[-1] if len(index) else -np.inf
+            rebuilt = np.maximum.accumulate(np.maximum(rebuilt, floor))
+            index = np.concatenate((index, rebuilt))
+        return index
+
+    @property
+    def start_time(self) -> float:
+        return float(self.frames["timestamp"][0]) if len(self.frames) else 0.0
+
+    @property
+    def end_time(self) -> float:
+        return float(self.frames["timestamp"][-1]) if len(self.frames) else 0.0
+
+    @property
+    def duration(self) -> float:
+        return self.end_time - self.start_time
+
+    def index_of(self, timestamp: float) -> int:
+        """The position of the first frame at, or after, a timestamp"""
+        block = max(int(np.searchsorted(self.index, timestamp, side="right")) - 1, 0)
+        start = block * self.index_stride
+        end = min(start + self.index_stride, len(self.frames))
+        timestamps = self.frames["timestamp"][start:end]
+        return start + int(np.searchsorted(timestamps, timestamp))
+
+    def window(
+        self, start: float, end: float, max_frames: int = MAX_WINDOW_FRAMES
+    ) -> np.ndarray:
+        """
+        The frames between two timestamps. Windows with more than `max_frames` are sampled
+        in evenly spaced contiguous blocks, so every motor's messages are still in them.
+        """
+        first = self.index_of(start)
+        last = self.index_of(end)
+        count = last - first
+        if count <= max_frames:
+            return self.frames[first:last]
+        blocks = max_frames // SAMPLE_BLOCK_FRAMES
+        starts = np.linspace(first, last - SAMPLE_BLOCK_FRAMES, blocks).astype(np.int64)
+        positions = (starts[:, None] + np.arange(SAMPLE_BLOCK_FRAMES)).ravel()
+        return self.frames[positions]
+
+    def feedback(
+        self,
+        motor_id: int,
+        start: float,
+        end: float,
+        max_frames: int = MAX_WINDOW_FRAMES,
+    ) -> np.ndarray:
+        """A motor's decoded feedback (FEEDBACK_DTYPE) between two timestamps"""
+        frames = self.window(start, end, max_frames)
+        mask = reply_mask(frames, Command.STATE.value)
+        mask &= sender_ids(frames) == motor_id
+        return decode_feedback(frames[mask])
+
+    def motor_ids(self, sample_frames: int = MAX_WINDOW_FRAMES) -> List[int]:
+        """The IDs of the motors that sent feedback (from a sample across the session)"""
+        frames = self.window(self.start_time, np.inf, sample_frames)
+        replies = frames[reply_mask(frames)]
+        return sorted(int(id) for id in np.unique(sender_ids(replies)))
+
+    def iter_chunks(
+        self, chunk_frames: int = READ_CHUNK_FRAMES
+    ) -> Iterator[np.ndarray]:
+        """Stream the whole session in chunks of frames"""
+        for start in range(0, len(self.frames), chunk_frames):
+            yield self.frames[start : start + chunk_frames]
+
+
+def convert_to_session(frames: Iterator[np.ndarray], path: str) -> int:
+    """Write chunks of frames (i.e. from `frames.iter_frames`) to a new session file"""
+    writer = SessionWriter(path)
+    try:
+        for chunk in frames:
+            writer.write_frames(chunk)
+    finally:
+        writer.close()
+    return writer.count
@@ -0,0 +1,51 @@
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+
+# FFT windows, by name
+WINDOWS: Dict[str, Callable[[int], np.ndarray]] = {
+    "Hann": np.hanning,
+    "Hamming": np.hamming,
+    "Blackman": np.blackman,
+    "Rectangular": np.ones,
+}
+
+# The floor of the dB scale, instead of -inf for empty bins
+MIN_DB = -200.0
+
+
+def resample(times: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, float]:
+    """
+    Resample to evenly spaced samples over the same time span, since polled samples
+    arrive with jitter. Returns the samples and the sample rate (in Hz).
+    """
+    count = len(values)
+    duration = times[-1] - times[0]
+    if count < 2 or duration <= 0:
+        return values, 0.0
+    uniform = np.linspace(times[0], times[-1], count)
+    return np.interp(uniform, times, values), (count - 1) / duration
+
+
+def power_spectrum(
+    values: np.ndarray, rate: float, window: str = "Hann"
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    The one-sided power spectrum of the samples (without their mean), corrected for
+    the window's gain so a sine of amplitude A shows up at A²/2.
+    Returns the frequencies (in Hz) and the power per bin.
+    """
+    count = len(values)
+    taper = WINDOWS[window](count)
+    spectrum = np.fft.rfft((values - values.mean()) * taper)
+    power = np.abs(spectrum) ** 2 * (2.0 / taper.sum() ** 2)
+    power[0] /= 2
+    if count % 2 == 0:
+        power[-1] /= 2
+    return np.fft.rfftfreq(count, 1.0 / rate), power
+
+
+def to_db(power: np.ndarray) -> np.ndarray:
+    """Power to dB (relative to a unit RMS value)"""
+    with np.errstate(divide="ignore"):
+        return np.maximum(10 * np.log10(power), MIN_DB)
@@ -0,0 +1,101 @@
+from typing import Dict
+
+import numpy as np
+
+# Rise time is measured between these fractions of the step
+RISE_LOW = 0.1
+RISE_HIGH = 0.9
+
+# Settled means staying within this fraction of the step size from the target
+SETTLING_BAND = 0.02
+
+# Steady-state error is the mean error over this last fraction of the response
+STEADY_STATE_TAIL = 0.1
+
+STEP_METRICS = (
+    "rise_time",
+    "overshoot",
+    "settling_time",
+    "steady_state_error",
+    "iae",
+)
+
+
+def resample(t: np.ndarray, y: np.ndarray, grid: np.ndarray) -> np.ndarray:
+    """Resample a captured response onto a common time grid"""
+    if not len(t):
+        return np.full(len(grid), np.nan)
+    return np.interp(grid, t, y)
+
+
+def first_index(mask: np.ndarray) -> np.ndarray:
+    """The first True column of each row (or -1 if there isn't one)"""
+    found = mask.any(axis=1)
+    return np.where(found, mask.argmax(axis=1), -1)
+
+
+def step_metrics(
+    t: np.ndarray,
+    responses: np.ndarray,
+    initial: np.ndarray,
+    target: np.ndarray,
+    band: float = SETTLING_BAND,
+) -> Dict[str, np.ndarray]:
+    """
+    Step response metrics for a batch of responses, all sampled on the same time grid `t`
+    (starting at the step). `responses` has one row per response, `initial` and `target`
+    one value per response (or a single value for all).
+
+    Returns an array per metric, with NaN where it couldn't be measured (i.e. a response
+    that never rose, or never settled). Overshoot is in percent of the step.
+    """
+    responses = np.atleast_2d(responses)
+    count = responses.shape[0]
+    initial = np.broadcast_to(np.asarray(initial, dtype=float), (count,))[:, None]
+    target = np.broadcast_to(np.asarray(target, dtype=float), (count,))[:, None]
+    size = target - initial
+    with np.errstate(invalid="ignore", divide="ignore"):
+        progress = (responses - initial) / size
+
+    def time_at(index: np.ndarray) -> np.ndarray:
+        return np.where(index >= 0, t[np.maximum(index, 0)], np.nan)
+
+    low = first_index(progress >= RISE_LOW)
+    high = first_index(progress >= RISE_HIGH)
+    rise_time = time_at(high) - time_at(low)
+
+    overshoot = np.maximum(np.nanmax(progress, axis=1) - 1, 0) * 100
+
+    # Settling time: just after the last sample outside the band
+    outside = ~(np.abs(progress - 1) <= band)
+    last_outside = outside.shape[1] - 1 - first_index(outside[:, ::-1])
+    settled = ~outside[:, -1]
+    settling_index = np.minimum(last_outside + 1, len(t) - 1)
+    settling_time = np.where(
+        settled, np.where(outside.any(axis=1), t[settling_index], 0.0), np.nan
+    )
+
+    tail = max(int(len(t) * STEADY_STATE_TAIL), 1)
+    steady_state_error = np.nanmean(responses[:, -tail:], axis=1) - target[:, 0]
+
+    # Integral of absolute error, to rank responses by
+    error = np.abs(target - responses)
+    iae = np.sum((error[:, 1:] + error[:, :-1]) / 2 * np.diff(t), axis=1)
+
+    return {
+        "rise_time": rise_time,
+        "overshoot": overshoot,
+        "settling_time": settling_time,
+        "steady_state_error": steady_state_error,
+        "iae": iae,
+    }
+
+
+def rank(metrics: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    The order to rank responses in: settled ones first, then by the integral of
+    absolute error (lower is better).
+    """
+    unsettled = np.isnan(metrics["settling_time"])
+    iae = np.nan_to_num(metrics["iae"], nan=np.inf)
+    return np.lexsort((iae, unsettled))
@@ -0,0 +1,386 @@
+import os
+import csv
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, TextIO
+
+import numpy as np
+
+from CyberGearDriver.constants import Command, P_MIN
+
+from CyberGearDashboard.analysis.frames import (
+    FLAG_ERROR,
+    decode_feedback,
+    iter_frames,
+    reply_mask,
+    sender_ids,
+)
+from CyberGearDashboard.protocol import (
+    MODE_SHIFT,
+    MODE_MASK,
+    MOTOR_ID_MASK,
+    PARAMETER_ADDRESSES,
+    POSITION_SCALE,
+    FEEDBACK_FAULT_TEXT,
+)
+
+# Default summary window, in seconds
+DEFAULT_WINDOW = 60.0
+
+# Position commands come from operation control frames, or writes to the position reference
+LOC_REF_ADDR = PARAMETER_ADDRESSES["loc_ref"]
+
+SUMMARY_COLUMNS = (
+    "file",
+    "motor",
+    "window_start",
+    "samples",
+    "rms_torque",
+    "peak_velocity",
+    "rms_tracking_error",
+    "max_tracking_error",
+    "start_temperature",
+    "temperature_rise",
+    "max_temperature",
+    "fault_episodes",
+    "fault_time",
+)
+
+
+def position_commands(frames: np.ndarray) -> Dict[int, np.ndarray]:
+    """
+    The position setpoints sent to each motor, as (timestamp, position) rows, from
+    operation control frames and position reference (loc_ref) writes.
+    """
+    arbitration_id = frames["arbitration_id"]
+    mode = (arbitration_id >> MODE_SHIFT) & MODE_MASK
+    motor_ids = arbitration_id & MOTOR_ID_MASK
+    data = frames["data"]
+    valid = ((frames["flags"] & FLAG_ERROR) == 0) & ~reply_mask(frames)
+
+    control = valid & (mode == Command.POSITION.value)
+    control_position = (
+        (data[:, 0].astype(np.uint16) << 8) | data[:, 1]
+    ) * POSITION_SCALE + P_MIN
+
+    write = valid & (mode == Command.WRITE_PARAM_UPPER.value)
+    write &= (data[:, 0].astype(np.uint16) | (data[:, 1].astype(np.uint16) << 8)) == (
+        LOC_REF_ADDR
+    )
+    write_position = np.ascontiguousarray(data[:, 4:8]).view("<f4")[:, 0]
+
+    mask = control | write
+    position = np.where(control, control_position, write_position)[mask]
+    timestamps = frames["timestamp"][mask]
+    ids = motor_ids[mask]
+
+    commands = {}
+    for motor_id in np.unique(ids):
+        rows = ids == motor_id
+        commands[int(motor_id)] = np.stack((timestamps[rows], position[rows]), axis=1)
+    return commands
+
+
+def maximum_by_window(totals: np.ndarray, windows: np.ndarray, values: np.ndarray):
+    """totals[w] = max(totals[w], values in window w)"""
+    if not len(values):
+        return
+    starts = np.flatnonzero(np.diff(windows, prepend=-1))
+    if (np.diff(windows) >= 0).all():
+        # Sorted by time, the usual case: reduce each run of samples at once
+        ids = windows[starts]
+        totals[ids] = np.maximum(totals[ids], np.maximum.reduceat(values, starts))
+    else:
+        np.maximum.at(totals, windows, values)
+
+
+class MotorSummary:
+    """Per-window running totals for one motor, updated a chunk at a time"""
+
+    window: float
+    origin: float
+
+    def __init__(self, window: float, origin: float):
+        self.window = window
+        self.origin = origin
+        self.totals = {
+            name: np.zeros(0)
+            for name in (
+                "samples",
+                "torque_sq",
+                "peak_velocity",
+                "error_sq",
+                "error_samples",
+                "max_error",
+                "first_temperature",
+                "last_temperature",
+                "max_temperature",
+                "fault_episodes",
+                "fault_time",
+            )
+        }
+        self.command: Optional[float] = None
+        self.last_faults = 0
+        self.last_timestamp: Optional[float] = None
+        self.open_episode: Optional[list] = None
+        self.episodes: List[list] = []
+
+    def grow(self, count: int):
+        """Make room for `count` windows"""
+        for name, values in self.totals.items():
+            if len(values) < count:
+                fill = np.nan if name == "first_temperature" else 0
+                extra = np.full(count - len(values), fill)
+                self.totals[name] = np.concatenate((values, extra))
+
+    def add(self, feedback: np.ndarray, commands: Optional[np.ndarray]):
+        """Add a chunk of decoded feedback (and the position commands from the same chunk)"""
+        if not len(feedback):
+            if commands is not None and len(commands):
+                self.command = float(commands[-1, 1])
+            return
+        timestamps = feedback["timestamp"]
+        windows = np.maximum((timestamps - self.origin) // self.window, 0).astype(int)
+        count = int(windows.max()) + 1
+        self.grow(count)
+        totals = self.totals
+
+        def add_to(name: str, values: np.ndarray, rows=slice(None)):
+            totals[name][:count] += np.bincount(windows[rows], values, minlength=count)
+
+        add_to("samples", np.ones(len(feedback)))
+        add_to("torque_sq", feedback["torque"] ** 2)
+        maximum_by_window(
+            totals["peak_velocity"], windows, np.abs(feedback["velocity"])
+        )
+
+        # Temperature at the start and end of each window
+        temperature = feedback["temperature"]
+        maximum_by_window(totals["max_temperature"], windows, temperature)
+        ids, first = np.unique(windows, return_index=True)
+        unset = np.isnan(totals["first_temperature"][ids])
+        totals["first_temperature"][ids[unset]] = temperature[first[unset]]
+        _, last = np.unique(windows[::-1], return_index=True)
+        totals["last_temperature"][ids] = temperature[len(temperature) - 1 - last]
+
+        self.add_tracking_error(feedback, windows, commands, add_to)
+        self.add_faults(feedback, windows, add_to)
+        self.last_timestamp = float(timestamps[-1])
+
+    def add_tracking_error(self, feedback, windows, commands, add_to):
+        """Compare each position with the latest position command sent before it"""
+        times = np.empty(0)
+        positions = np.empty(0)
+        if self.command is not None:
+            times = np.array([-np.inf])
+            positions = np.array([self.command])
+        if commands is not None and len(commands):
+            times = np.concatenate((times, commands[:, 0]))
+            positions = np.concatenate((positions, commands[:, 1]))
+            self.command = float(commands[-1, 1])
+        if not len(times):
+            return
+
+        latest = np.searchsorted(times, feedback["timestamp"], side="right") - 1
+        rows = latest >= 0
+        error = feedback["position"][rows] - positions[latest[rows]]
+        add_to("error_sq", error**2, rows)
+        add_to("error_samples", np.ones(len(error)), rows)
+        maximum_by_window(self.totals["max_error"], windows[rows], np.abs(error))
+
+    def add_faults(self, feedback, windows, add_to):
+        """Find fault episodes (runs of samples with any fault flag set)"""
+        flags = feedback["faults"].astype(np.int64)
+        timestamps = feedback["timestamp"]
+        previous = np.concatenate(([self.last_faults], flags[:-1]))
+        starts = np.flatnonzero((flags != 0) & (previous == 0))
+        ends = np.flatnonzero((flags == 0) & (previous != 0))
+
+        # Time spent faulted, counted from each faulted sample to the next
+        last_timestamp = (
+            timestamps[0] if self.last_timestamp is None else self.last_timestamp
+        )
+        gaps = np.diff(timestamps, prepend=last_timestamp)
+        faulted = previous != 0
+        add_to("fault_time", gaps[faulted], faulted)
+        add_to("fault_episodes", np.ones(len(starts)), starts)
+
+        if self.open_episode is not None:
+            end = ends[0] if len(ends) else len(flags)
+            self.open_episode[2] |= int(np.bitwise_or.reduce(flags[:end], initial=0))
+            if len(ends):
+                self.open_episode[1] = float(timestamps[ends[0]])
+                self.episodes.append(self.open_episode)
+                self.open_episode = None
+                ends = ends[1:]
+
+        # Starts and ends now alternate, with maybe one start left open at the end
+        for i, start in enumerate(starts):
+            end = ends[i] if i < len(ends) else len(flags)
+            episode = [
+                float(timestamps[start]),
+                float(timestamps[end]) if end < len(flags) else None,
+                int(np.bitwise_or.reduce(flags[start:end])),
+            ]
+            if episode[1] is None:
+                self.open_episode = episode
+            else:
+                self.episodes.append(episode)
+        self.last_faults = int(flags[-1])
+
+    def rows(self) -> List[dict]:
+        """The summary for each window that has data"""
+        totals = self.totals
+        samples = totals["samples"]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rms_torque = np.sqrt(totals["torque_sq"] / samples)
+            rms_error = np.sqrt(totals["error_sq"] / totals["error_samples"])
+        has_error = totals["error_samples"] > 0
+
+        rows = []
+        for window in np.flatnonzero(samples):
+            rows.append(
+                {
+                    "window_start": window * self.window,
+                    "samples": int(samples[window]),
+                    "rms_torque": rms_torque[window],
+                    "peak_velocity": totals["peak_velocity"][window],
+                    "rms_tracking_error": (
+                        rms_error[window] if has_error[window] else None
+                    ),
+                    "max_tracking_error": (
+                        totals["max_error"][window] if has_error[window] else None
+                    ),
+                    "start_temperature": totals["first_temperature"][window],
+                    "temperature_rise": totals["last_temperature"][window]
+                    - totals["first_temperature"][window],
+                    "max_temperature": totals["max_temperature"][window],
+                    "fault_episodes": int(totals["fault_episodes"][window]),
+                    "fault_time": totals["fault_time"][window],
+                }
+            )
+        return rows
+
+    def all_episodes(self) -> List[list]:
+        episodes = list(self.episodes)
+        if self.open_episode is not None:
+            episodes.append(self.open_episode)
+        return episodes
+
+
+def summarize_file(path: str, window: float = DEFAULT_WINDOW) -> dict:
+    """Summarize one recorded session or CAN log, streamed a chunk at a time"""
+    motors: Dict[int, MotorSummary] = {}
+    origin = None
+    for frames in iter_frames(path):
+        if not len(frames):
+            continue
+        if origin is None:
+            origin = float(frames["timestamp"][0])
+
+        replies = frames[reply_mask(frames, Command.STATE.value)]
+        ids = sender_ids(replies)
+        commands = position_commands(frames)
+        for motor_id in np.unique(np.concatenate((ids, list(commands)))).astype(int):
+            summary = motors.get(motor_id)
+            if summary is None:
+                summary = motors[motor_id] = MotorSummary(window, origin)
+            summary.add(
+                decode_feedback(replies[ids == motor_id]), commands.get(motor_id)
+            )
+
+    rows = []
+    episodes = []
+    for motor_id in sorted(motors):
+        for row in motors[motor_id].rows():
+            rows.append({"file": path, "motor": motor_id, **row})
+        for start, end, flags in motors[motor_id].all_episodes():
+            episodes.append(
+                {
+                    "file": path,
+                    "motor": motor_id,
+                    "start": start - origin,
+                    "duration": None if end is None else end - start,
+                    "faults": FEEDBACK_FAULT_TEXT[flags & 0x3F],
+                }
+            )
+    return {"file": path, "origin": origin, "rows": rows, "episodes": episodes}
+
+
+def summarize_files(
+    paths: Iterable[str], window: float = DEFAULT_WINDOW, jobs: Optional[int] = None
+) -> List[dict]:
+    """Summarize several files in parallel, one worker process per file"""
+    paths = list(paths)
+    if len(paths) == 1 or jobs == 1:
+        return [summarize_file(path, window) for path in paths]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(summarize_file, paths, [window] * len(paths)))
+
+
+def format_value(value) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.3f}"
+    return str(value)
+
+
+def write_csv(results: List[dict], stream: TextIO):
+    writer = csv.DictWriter(stream, SUMMARY_COLUMNS)
+    writer.writeheader()
+    for result in results:
+        writer.writerows(result["rows"])
+
+
+def print_summary(results: List[dict], stream: TextIO = None):
+    """Print the summaries and fault episodes as text tables"""
+    stream = stream or sys.stdout
+    headers = (
+        ("motor", "Motor", 5),
+        ("window_start", "Start s", 9),
+        ("samples", "Samples", 8),
+        ("rms_torque", "RMS Nm", 8),
+        ("peak_velocity", "Peak rad/s", 10),
+        ("rms_tracking_error", "RMS err", 8),
+        ("max_tracking_error", "Max err", 8),
+        ("temperature_rise", "Temp rise", 9),
+        ("max_temperature", "Max temp", 8),
+        ("fault_episodes", "Faults", 6),
+        ("fault_time", "Fault s", 8),
+    )
+    for result in results:
+        print(f"{os.path.basename(result['file'])}", file=stream)
+        if not result["rows"]:
+            print("  No motor feedback", file=stream)
+            continue
+        print(" ".join(f"{title:>{width}}" for _, title, width in headers), file=stream)
+        for row in result["rows"]:
+            print(
+                " ".join(
+                    f"{format_value(row[name]):>{width}}" for name, _, width in headers
+                ),
+                file=stream,
+            )
+        for episode in result["episodes"]:
+            print(
+                f"  Motor {episode['motor']} fault at {episode['start']:.3f}s "
+                f"for {format_value(episode['duration'])}s: {episode['faults']}",
+                file=stream,
+            )
+        print(file=stream)
+
+
+def analyze(
+    paths: List[str],
+    window: float = DEFAULT_WINDOW,
+    jobs: Optional[int] = None,
+    csv_path: Optional[str] = None,
+):
+    """Summarize recorded sessions and print, or save, the results"""
+    results = summarize_files(paths, window, jobs)
+    if csv_path:
+        with open(csv_path, "w", newline="") as file:
+            write_csv(results, file)
+    else:
+        print_summary(results)
@@ -1,118 +1,431 @@
+import os
 import sys
-import can
-from PySide6.QtCore import Qt, QSettings, QPoint, QSize
-from PySide6.QtGui import QCloseEvent, QAction
+import threading
+from typing import Dict, List, Optional, Union
+from PySide6.QtCore import Qt, QSettings, QPoint, QSize, Signal
+from PySide6.QtGui import QCloseEvent, QAction, QKeySequence
 from PySide6.QtWidgets import (
     QApplication,
     QMainWindow,
     QWidget,
     QVBoxLayout,
-    QMessageBox,
+    QLabel,
+    QMenu,
+    QTabWidget,
+    QDockWidget,
+    QFileDialog,
+    QPushButton,
 )
 
-from CyberGearDriver import CyberGearMotor, CyberMotorMessage
+from CyberGearDriver import CyberGearMotor
 
 from CyberGearDashboard.constants import DEFAULT_CAN_BITRATE
+from CyberGearDashboard.analysis.session import SessionWriter, SESSION_EXTENSION
+from CyberGearDashboard.connection import BusConnection, ConnectionState
+from CyberGearDashboard.bus_process import ProcessBusConnection
+from CyberGearDashboard.dispatcher import MotorDispatcher
+from CyberGearDashboard.estop import EmergencyStop
+from CyberGearDashboard.fault_log import FaultLog
+from CyberGearDashboard.bus import DiscoveryDialog, BusStatisticsDock
+from CyberGearDashboard.automation import ScriptDock
 from CyberGearDashboard.parameters import ParametersTableDock
 from CyberGearDashboard.controller.controller_dock import MotorControllerDockWidget
+from CyberGearDashboard.controller.sync_move_dialog import SyncMoveDialog
 from CyberGearDashboard.status.motor_state import MotorStateWidget
+from CyberGearDashboard.status.overview import MotorOverviewDock
+from CyberGearDashboard.status.fault_timeline import FaultTimelineDock
 from CyberGearDashboard.watcher import MotorWatcher
-from CyberGearDashboard.charts import ChartLayout
+from CyberGearDashboard.charts import ChartLayout, ScopeDock, SpectrumDock
+from CyberGearDashboard.tuning import StepTuningDialog, FrequencyResponseDialog
+
+# Triggers the emergency stop from anywhere in the app
+ESTOP_SHORTCUT = "Ctrl+Space"
+
+# The fault events are kept in this file, next to the settings
+FAULT_LOG_FILE = "fault_log.csv"
 
 
 class AppWindow(QMainWindow):
-    bus: can.Bus = None
-    motor: CyberGearMotor = None
+    connection: BusConnection = None
+    dispatcher: MotorDispatcher
+    motors: Dict[int, CyberGearMotor]
     did_load: bool = False
-    bus_notifier: can.Notifier
-    watcher: MotorWatcher
+    verbose: bool
+    watcher: MotorWatcher = None
     settings: QSettings
-    charts: ChartLayout
+    chart_tabs: QTabWidget
+    view_menu: QMenu
+    overview_dock: MotorOverviewDock
+    stats_dock: BusStatisticsDock
+    script_dock: ScriptDock
+    fault_timeline_dock: FaultTimelineDock
+    controller_docks: Dict[int, MotorControllerDockWidget]
+    state_docks: Dict[int, MotorStateWidget]
+    parameter_docks: Dict[int, ParametersTableDock]
+    scope_docks: Dict[int, ScopeDock]
+    spectrum_docks: Dict[int, SpectrumDock]
+    connection_label: QLabel
+    recorder: Optional[SessionWriter] = None
+    record_action: QAction
+    estop: EmergencyStop
+    fault_log: FaultLog
+    reset_estop_action: QAction
+    discovery_dialog: Optional[DiscoveryDialog] = None
+    did_discover: bool = False
+
+    estop_triggered = Signal()
 
     def __init__(
         self,
         channel: str,
         interface: str,
-        motor_id: int,
+        motor_ids: List[int],
         verbose: bool = False,
         bitrate=DEFAULT_CAN_BITRATE,
+        bus_process: bool = False,
     ):
         super().__init__()
         self.settings = QSettings("jgillick", "CyberGearDriverDashboard")
+        self.verbose = verbose
+        self.motors = {}
+        self.controller_docks = {}
+        self.state_docks = {}
+        self.parameter_docks = {}
+        self.scope_docks = {}
+        self.spectrum_docks = {}
 
-        # Connect to motor
-        self.connect(channel, interface, motor_id, verbose, bitrate)
-        self.did_load = True
+        # The bus connects in the background, so the UI can show right away.
+        # Optionally, the bus I/O and polling run in their own process.
+        connection_class = ProcessBusConnection if bus_process else BusConnection
+        self.connection = connection_class(channel, interface, bitrate, parent=self)
+        self.connection.state_changed.connect(self.on_connection_state)
+        self.connection.add_connect_handler(self.on_bus_connected)
+
+        # All motors share one receive path and one poll scheduler. The bus process
+        # decodes the values itself, and passes them on in batches.
+        self.dispatcher = MotorDispatcher()
+        if bus_process:
+            self.connection.add_sample_receiver(self.dispatcher.samples_received)
+            self.connection.add_update_receiver(self.dispatcher.update_received)
+        else:
+            self.connection.add_receiver(self.dispatcher.message_received)
+        self.watcher = MotorWatcher(
+            scheduler=self.connection.set_poll_schedule if bus_process else None
+        )
+
+        # Fault edges are picked up straight from the receive path
+        self.fault_log = FaultLog(self.fault_log_path())
+        self.connection.add_update_receiver(self.fault_log.message_received)
+
+        # The e-stop runs on its own thread, so it doesn't wait behind the UI
+        self.estop = EmergencyStop(self.connection, self.motors)
+        self.estop.on_stopped.append(self.estop_triggered.emit)
+        self.estop_triggered.connect(self.on_estop)
+        self.estop.start()
 
         # UI
         self.restore_window_pos()
         self.setWindowTitle("CyberGear Dashboard")
         self.build_layout()
+        for motor_id in motor_ids:
+            self.add_motor(motor_id)
+        self.did_load = True
+
+        self.connection.open()
+        self.watcher.start()
 
     def build_layout(self):
         """Construct the layout"""
-        layout = QVBoxLayout()
+        self.chart_tabs = QTabWidget()
+        self.chart_tabs.setTabBarAutoHide(True)
+        self.setCentralWidget(self.chart_tabs)
+
+        self.overview_dock = MotorOverviewDock()
+        self.overview_dock.motor_selected.connect(self.select_motor)
+        self.overview_dock.setVisible(False)
+        self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, self.overview_dock)
 
-        charts = ChartLayout(self.motor, self.watcher)
-        state_dock = MotorStateWidget(self.motor, charts=charts)
-        parameter_dock = ParametersTableDock(self.motor)
-        controller_dock = MotorControllerDockWidget(self.motor)
+        self.stats_dock = BusStatisticsDock(self.connection)
+        self.stats_dock.setVisible(False)
+        self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.stats_dock)
 
-        self.addDockWidget(Qt.DockWidgetArea.LeftDockWidgetArea, controller_dock)
-        self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, state_dock)
-        self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, parameter_dock)
+        self.script_dock = ScriptDock(self.motors)
+        self.script_dock.setVisible(False)
+        self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.script_dock)
+
+        self.fault_timeline_dock = FaultTimelineDock(self.fault_log)
+        self.fault_timeline_dock.setVisible(False)
+        self.addDockWidget(
+            Qt.DockWidgetArea.BottomDockWidgetArea, self.fault_timeline_dock
+        )
 
         menu = self.menuBar()
-        view_menu = menu.addMenu("&View")
-        view_menu.addAction(controller_dock.toggleViewAction())
-        view_menu.addAction(state_dock.toggleViewAction())
-        view_menu.addAction(parameter_dock.toggleViewAction())
+        bus_menu = menu.addMenu("&Bus")
+        discover_action = bus_menu.addAction("Discover motors...")
+        discover_action.triggered.connect(self.open_discovery)
+        self.record_action = bus_menu.addAction("Record session...")
+        self.record_action.setCheckable(True)
+        self.record_action.triggered.connect(self.toggle_recording)
+        bus_menu.addSeparator()
+        estop_action = bus_menu.addAction("Emergency stop")
+        estop_action.setShortcut(QKeySequence(ESTOP_SHORTCUT))
+        estop_action.setShortcutContext(Qt.ShortcutContext.ApplicationShortcut)
+        estop_action.triggered.connect(self.estop.trigger)
+        self.reset_estop_action = bus_menu.addAction("Reset emergency stop")
+        self.reset_estop_action.setEnabled(False)
+        self.reset_estop_action.triggered.connect(self.reset_estop)
+
+        tools_menu = menu.addMenu("&Tools")
+        tuning_action = tools_menu.addAction("Step response tuning...")
+        tuning_action.triggered.connect(self.open_step_tuning)
+        bode_action = tools_menu.addAction("Frequency response...")
+        bode_action.triggered.connect(self.open_frequency_response)
+        sync_action = tools_menu.addAction("Synchronized move...")
+        sync_action.triggered.connect(self.open_sync_move)
+        tools_menu.addSeparator()
+        script_action = tools_menu.addAction("Run script...")
+        script_action.triggered.connect(self.open_scripts)
+
+        self.view_menu = menu.addMenu("&View")
+        self.view_menu.addAction(self.overview_dock.toggleViewAction())
+        self.view_menu.addAction(self.stats_dock.toggleViewAction())
+        self.view_menu.addAction(self.script_dock.toggleViewAction())
+        self.view_menu.addAction(self.fault_timeline_dock.toggleViewAction())
+        self.setFocus()
+
+        self.connection_label = QLabel()
+        self.statusBar().addWidget(self.connection_label)
+        estop_button = QPushButton(f"STOP ({ESTOP_SHORTCUT})")
+        estop_button.setStyleSheet("QPushButton { color: white; background: #c00; }")
+        estop_button.setToolTip("Stop all motors")
+        estop_button.clicked.connect(self.estop.trigger)
+        self.statusBar().addPermanentWidget(estop_button)
+        self.on_connection_state(self.connection.state)
+
+    def add_motor(self, motor_id: int) -> CyberGearMotor:
+        """Add a motor to the session, with its own set of views"""
+        if motor_id in self.motors:
+            return self.motors[motor_id]
+
+        motor = CyberGearMotor(
+            motor_id,
+            send_message=self.connection.send_motor_message,
+            verbose=self.verbose,
+        )
+        self.motors[motor_id] = motor
+        self.dispatcher.add_motor(motor)
+        self.watcher.add_motor(motor)
+        self.build_motor_layout(motor)
+
+        # Show the overview once there's more than one motor to compare
+        self.overview_dock.add_motor(motor)
+        if len(self.motors) == 2:
+            self.overview_dock.setVisible(True)
+
+        if self.connection.is_connected:
+            threading.Thread(target=self.init_motor, args=(motor,), daemon=True).start()
+        return motor
+
+    def build_motor_layout(self, motor: CyberGearMotor):
+        """Construct the charts and docks for a motor"""
+        motor_id = motor.motor_id
+        layout = QVBoxLayout()
+
+        tracker = self.dispatcher.get_tracker(motor_id)
+        charts = ChartLayout(
+            motor, self.watcher, self.dispatcher.get_store(motor_id), tracker
+        )
+        state_dock = MotorStateWidget(
+            motor,
+            charts=charts,
+            fault_log=self.fault_log,
+            tracker=tracker,
+            statistics=self.dispatcher.get_statistics(motor_id),
+        )
+        parameter_dock = ParametersTableDock(motor, tracker)
+        controller_dock = MotorControllerDockWidget(motor)
+        controller_dock.set_connected(
+            self.connection.is_connected and not self.estop.is_stopped
+        )
+
+        motor_menu = self.view_menu.addMenu(f"Motor {motor_id}")
+        self.add_motor_dock(
+            motor_id, controller_dock, self.controller_docks, motor_menu, left=True
+        )
+        self.add_motor_dock(motor_id, state_dock, self.state_docks, motor_menu)
+        self.add_motor_dock(motor_id, parameter_dock, self.parameter_docks, motor_menu)
+
+        # Triggered capture and the spectrum are opened from the View menu when needed
+        scope_dock = ScopeDock(motor, self.connection)
+        self.add_motor_dock(motor_id, scope_dock, self.scope_docks, motor_menu)
+        scope_dock.setVisible(False)
+        spectrum_dock = SpectrumDock(motor, self.dispatcher.get_store(motor_id))
+        self.add_motor_dock(motor_id, spectrum_dock, self.spectrum_docks, motor_menu)
+        spectrum_dock.setVisible(False)
 
         layout.addLayout(charts)
         widget = QWidget()
         widget.setLayout(layout)
-        self.setCentralWidget(widget)
-        self.setFocus()
+        self.chart_tabs.addTab(widget, f"Motor {motor_id}")
 
-    def send_bus_message(self, message: CyberMotorMessage):
-        """Send a CyberMotor message on the CAN bus"""
-        self.bus.send(
-            can.Message(
-                arbitration_id=message.arbitration_id,
-                data=message.data,
-                is_extended_id=message.is_extended_id,
+    def add_motor_dock(
+        self,
+        motor_id: int,
+        dock: QDockWidget,
+        dock_list: Dict[int, QDockWidget],
+        menu: QMenu,
+        left: bool = False,
+    ):
+        """Add a motor dock, tabbed together with the same dock for the other motors"""
+        dock.setWindowTitle(f"{dock.windowTitle()} ({motor_id})")
+        menu.addAction(dock.toggleViewAction())
+        if dock_list:
+            self.tabifyDockWidget(next(iter(dock_list.values())), dock)
+        else:
+            area = (
+                Qt.DockWidgetArea.LeftDockWidgetArea
+                if left
+                else Qt.DockWidgetArea.RightDockWidgetArea
             )
+            self.addDockWidget(area, dock)
+        dock_list[motor_id] = dock
+
+    def select_motor(self, motor_id: int):
+        """Bring the views for a motor to the front"""
+        motor_ids = list(self.motors.keys())
+        self.chart_tabs.setCurrentIndex(motor_ids.index(motor_id))
+        for docks in (self.controller_docks, self.state_docks, self.parameter_docks):
+            docks[motor_id].raise_()
+
+    def open_discovery(self):
+        """Open the dialog to scan the bus for motors (or raise it, if it's open)"""
+        if self.discovery_dialog is not None:
+            self.discovery_dialog.raise_()
+            self.discovery_dialog.activateWindow()
+            return
+        dialog = DiscoveryDialog(self.connection, self.motors.keys(), parent=self)
+        dialog.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        dialog.motors_selected.connect(self.add_motors)
+        dialog.finished.connect(self.discovery_closed)
+        self.discovery_dialog = dialog
+        dialog.show()
+        dialog.start_scan()
+
+    def discovery_closed(self):
+        self.discovery_dialog = None
+
+    def open_step_tuning(self):
+        """Open the dialog to sweep and rank position loop gains"""
+        dialog = StepTuningDialog(self.motors, self.connection, parent=self)
+        dialog.show()
+
+    def open_frequency_response(self):
+        """Open the dialog to measure a motor's frequency response"""
+        dialog = FrequencyResponseDialog(self.motors, self.connection, parent=self)
+        dialog.show()
+
+    def open_sync_move(self):
+        """Open the dialog to send setpoints to several motors at once"""
+        dialog = SyncMoveDialog(self.motors, self.connection, parent=self)
+        dialog.show()
+
+    def open_scripts(self):
+        """Show the scripts dock, and pick a script"""
+        self.script_dock.setVisible(True)
+        self.script_dock.raise_()
+        self.script_dock.choose_script()
+
+    def add_motors(self, motor_ids: List[int]):
+        """Add several motors to the session"""
+        for motor_id in motor_ids:
+            self.add_motor(motor_id)
+        if motor_ids:
+            self.select_motor(motor_ids[0])
+
+    def toggle_recording(self, record: bool):
+        """Start/stop recording all bus traffic to a session file"""
+        if not record:
+            self.stop_recording()
+            return
+
+        path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Record session",
+            f"session{SESSION_EXTENSION}",
+            f"Sessions (*{SESSION_EXTENSION})",
         )
+        if not path:
+            self.record_action.setChecked(False)
+            return
+        self.recorder = SessionWriter(path)
+        self.connection.add_receiver(self.recorder.message_received)
+        self.connection.add_transmit_listener(self.recorder.message_sent)
+        self.record_action.setText(f"Stop recording ({path})")
 
-    def connect(
-        self, channel: str, interface: str, motor_id: int, verbose: bool, bitrate: int
-    ) -> bool:
-        """Connect to the CAN bus and the motor controller"""
-        try:
-            self.bus = can.interface.Bus(
-                interface=interface,
-                channel=channel,
-                bitrate=bitrate,
-            )
+    def stop_recording(self):
+        if self.recorder is None:
+            return
+        self.connection.remove_receiver(self.recorder.message_received)
+        self.connection.remove_transmit_listener(self.recorder.message_sent)
+        self.recorder.close()
+        self.recorder = None
+        self.record_action.setChecked(False)
+        self.record_action.setText("Record session...")
+
+    def on_estop(self):
+        """The e-stop was triggered, lock the controls until it's reset"""
+        self.script_dock.stop_script()
+        for dock in self.controller_docks.values():
+            dock.stop_streaming()
+            dock.set_connected(False)
+        for dialog in self.findChildren(FrequencyResponseDialog):
+            dialog.abort()
+        for dialog in self.findChildren(StepTuningDialog):
+            dialog.cancel()
+        self.reset_estop_action.setEnabled(True)
+        self.on_connection_state(self.connection.state)
+
+    def reset_estop(self):
+        self.estop.reset()
+        self.reset_estop_action.setEnabled(False)
+        self.on_connection_state(self.connection.state)
+
+    def init_motor(self, motor: CyberGearMotor):
+        """Put the motor into a known state and load its parameters"""
+        motor.enable()
+        motor.stop()
+        self.parameter_docks[motor.motor_id].reload()
+
+    def on_bus_connected(self):
+        """The bus has (re)connected, initialize all motors (runs on the connection thread)"""
+        for motor in list(self.motors.values()):
+            self.init_motor(motor)
+
+    def on_connection_state(self, state: ConnectionState):
+        """Update the UI when the bus connection state changes"""
+        message = state.value
+        if self.connection.error and state != ConnectionState.CONNECTED:
+            message = f"{message}: {self.connection.error}"
+        if self.estop.is_stopped:
+            message = f"{message} - EMERGENCY STOP (reset from the Bus menu)"
+        self.connection_label.setText(message)
 
-            # Create the motor controller
-            self.motor = CyberGearMotor(
-                motor_id, send_message=self.send_bus_message, verbose=verbose
+        for dock in self.controller_docks.values():
+            dock.set_connected(
+                state == ConnectionState.CONNECTED and not self.estop.is_stopped
             )
-            self.bus_notifier = can.Notifier(self.bus, [self.motor.message_received])
 
-            self.motor.enable()
-            self.motor.stop()
+        # Without a motor ID, help find one (only on the first connect)
+        if state == ConnectionState.CONNECTED and not self.did_discover:
+            self.did_discover = True
+            if not self.motors:
+                self.open_discovery()
 
-            # Regularly poll the motor for updates
-            self.watcher = MotorWatcher(self.motor)
-            self.watcher.start()
-        except Exception as e:
-            alert = QMessageBox()
-            alert.setText(f"Could not connect to the motor\n{e}")
-            alert.exec()
-            self.close()
-        return True
+    def fault_log_path(self) -> str:
+        """The fault log file, in the settings folder"""
+        folder = os.path.dirname(self.settings.fileName())
+        os.makedirs(folder, exist_ok=True)
+        return os.path.join(folder, FAULT_LOG_FILE)
 
     def save_window_pos(self):
         """Save the window position and size to settings"""
@@ -133,23 +446,32 @@ class AppWindow(QMainWindow):
             self.save_window_pos()
         if self.watcher is not None:
             self.watcher.stop_watching()
-        if self.motor is not None:
-            self.motor.stop()
-        if self.bus_notifier is not None:
-            self.bus_notifier.stop()
-        if self.bus is not None:
-            self.bus.shutdown()
+        for scope_dock in self.scope_docks.values():
+            scope_dock.disarm()
+        for spectrum_dock in self.spectrum_docks.values():
+            spectrum_dock.stop()
+        self.script_dock.stop_script()
+        for motor in self.motors.values():
+            motor.stop()
+        if self.connection is not None:
+            self.connection.close()
+        self.stop_recording()
+        self.fault_log.close()
         event.accept()
 
 
 def openDashboard(
     channel: str,
     interface: str,
-    motor_id: int,
+    motor_ids: Union[int, List[int]],
     verbose: bool = False,
     bitrate=DEFAULT_CAN_BITRATE,
+    bus_process: bool = False,
 ):
+    if isinstance(motor_ids, int):
+        motor_ids = [motor_ids]
+    motor_ids = motor_ids or []
     app = QApplication(sys.argv)
-    window = AppWindow(channel, interface, motor_id, verbose, bitrate)
+    window = AppWindow(channel, interface, motor_ids, verbose, bitrate, bus_process)
     window.show()
     app.exec()
@@ -5,18 +5,13 @@ from typing import List
 import can
 
 from CyberGearDashboard.constants import DEFAULT_CAN_BITRATE
+from CyberGearDashboard.discovery import SCAN_TIMEOUT
+from CyberGearDashboard.analysis.summary import DEFAULT_WINDOW
+from CyberGearDashboard.estop import BENCHMARK_RUNS, BENCHMARK_LOAD_THREADS
 
 
-def parse_args(args: List[str]) -> argparse.Namespace:
-    """Parse command line arguments"""
-    parser = argparse.ArgumentParser(
-        description="Connect to the CyberGear motor and launch dashboard",
-    )
-
-    parser.add_argument(
-        "-m", "--motor-id", type=int, help="The ID of the motor on the CAN bus"
-    )
-
+def add_bus_arguments(parser: argparse.ArgumentParser):
+    """Add the CAN bus connection arguments to a parser"""
     parser.add_argument(
         "-c",
         "--channel",
@@ -44,6 +39,26 @@ def parse_args(args: List[str]) -> argparse.Namespace:
         type=int,
     )
 
+
+def parse_args(args: List[str]) -> argparse.Namespace:
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(
+        description="Connect to the CyberGear motor and launch dashboard",
+        epilog="Other commands: scan, replay, analyze, estop-benchmark (run '<command> --help' for details)",
+    )
+
+    parser.add_argument(
+        "-m",
+        "--motor-id",
+        dest="motor_ids",
+        type=int,
+        nargs="+",
+        help="The ID of the motor on the CAN bus (more than one ID for a multi-motor dashboard). "
+        "Leave it out to scan the bus for motors.",
+    )
+
+    add_bus_arguments(parser)
+
     parser.add_argument(
         "-v",
         "--verbose",
@@ -52,9 +67,130 @@ def parse_args(args: List[str]) -> argparse.Namespace:
         action=argparse.BooleanOptionalAction,
     )
 
+    parser.add_argument(
+        "--bus-process",
+        dest="bus_process",
+        help="""Run the bus I/O and polling in a separate process, so they don't compete with the UI""",
+        action="store_true",
+    )
+
     if not args:
         parser.print_help(sys.stderr)
         raise SystemExit(errno.EINVAL)
     parsed_args, unknown_args = parser.parse_known_args(args)
 
     return parsed_args
+
+
+def parse_scan_args(args: List[str]) -> argparse.Namespace:
+    """Parse command line arguments for the scan command"""
+    parser = argparse.ArgumentParser(
+        prog="python -m CyberGearDashboard scan",
+        description="Scan the CAN bus for motors",
+    )
+    add_bus_arguments(parser)
+
+    parser.add_argument(
+        "-t",
+        "--timeout",
+        dest="timeout",
+        help="""How long to wait for replies, in seconds""",
+        default=SCAN_TIMEOUT,
+        type=float,
+    )
+
+    if not args:
+        parser.print_help(sys.stderr)
+        raise SystemExit(errno.EINVAL)
+    return parser.parse_args(args)
+
+
+def parse_replay_args(args: List[str]) -> argparse.Namespace:
+    """Parse command line arguments for the replay command"""
+    parser = argparse.ArgumentParser(
+        prog="python -m CyberGearDashboard replay",
+        description="Browse a recorded session file",
+    )
+    parser.add_argument("session", help="The session file (.cgs)")
+
+    if not args:
+        parser.print_help(sys.stderr)
+        raise SystemExit(errno.EINVAL)
+    return parser.parse_args(args)
+
+
+def parse_analyze_args(args: List[str]) -> argparse.Namespace:
+    """Parse command line arguments for the analyze command"""
+    parser = argparse.ArgumentParser(
+        prog="python -m CyberGearDashboard analyze",
+        description="Summarize recorded sessions (or CAN logs) per motor and time window",
+    )
+    parser.add_argument(
+        "files",
+        nargs="+",
+        help="Session files (.cgs), candump logs, or any log format python-can can read",
+    )
+    parser.add_argument(
+        "-w",
+        "--window",
+        dest="window",
+        help="""The summary window, in seconds""",
+        default=DEFAULT_WINDOW,
+        type=float,
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        dest="jobs",
+        help="""How many files to analyze in parallel (default: one per CPU)""",
+        type=int,
+    )
+    parser.add_argument(
+        "--csv",
+        dest="csv",
+        help="""Save the summary to a CSV file, instead of printing it""",
+    )
+
+    if not args:
+        parser.print_help(sys.stderr)
+        raise SystemExit(errno.EINVAL)
+    return parser.parse_args(args)
+
+
+def parse_estop_benchmark_args(args: List[str]) -> argparse.Namespace:
+    """Parse command line arguments for the estop-benchmark command"""
+    parser = argparse.ArgumentParser(
+        prog="python -m CyberGearDashboard estop-benchmark",
+        description="Measure the emergency stop latency under load, and check it against the bound",
+    )
+    add_bus_arguments(parser)
+    parser.add_argument(
+        "-m",
+        "--motor-id",
+        dest="motor_ids",
+        type=int,
+        nargs="+",
+        default=[127],
+        help="The motor IDs to send stop frames to",
+    )
+    parser.add_argument(
+        "-r",
+        "--runs",
+        dest="runs",
+        help="""How many times to trigger the e-stop""",
+        default=BENCHMARK_RUNS,
+        type=int,
+    )
+    parser.add_argument(
+        "-l",
+        "--load-threads",
+        dest="load_threads",
+        help="""How many busy threads to run alongside, to load the process""",
+        default=BENCHMARK_LOAD_THREADS,
+        type=int,
+    )
+
+    if not args:
+        parser.print_help(sys.stderr)
+        raise SystemExit(errno.EINVAL)
+    return parser.parse_args(args)
@@ -0,0 +1 @@
+from .script_dock import ScriptDock
@@ -0,0 +1,140 @@
+import os
+from typing import Dict, Optional
+from PySide6.QtCore import QTimer, Signal
+from PySide6.QtWidgets import (
+    QWidget,
+    QDockWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QLabel,
+    QPushButton,
+    QProgressBar,
+    QPlainTextEdit,
+    QFileDialog,
+)
+
+from CyberGearDriver import CyberGearMotor
+
+from CyberGearDashboard.scripting import ScriptRunner
+
+# How often to refresh the progress and log (in milliseconds)
+REFRESH_RATE_MS = 200
+
+# The most lines kept in the log view
+MAX_LOG_VIEW_LINES = 5000
+
+
+class ScriptDock(QDockWidget):
+    """Run automation scripts against the motors, and follow their progress"""
+
+    motors: Dict[int, CyberGearMotor]
+    path: Optional[str]
+    runner: Optional[ScriptRunner]
+    timer: QTimer
+
+    script_finished = Signal()
+
+    def __init__(self, motors: Dict[int, CyberGearMotor], *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.motors = motors
+        self.path = None
+        self.runner = None
+
+        # The script finishes on its own thread
+        self.script_finished.connect(self.on_finished)
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.build_layout()
+
+    def choose_script(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Open script", "", "Python scripts (*.py)"
+        )
+        if path:
+            self.path = path
+            self.path_label.setText(os.path.basename(path))
+            self.update_buttons()
+
+    def run_script(self):
+        """Run the script in a worker thread"""
+        if self.path is None or not self.motors:
+            return
+        try:
+            self.runner = ScriptRunner(
+                self.path, self.motors, on_finished=self.script_finished.emit
+            )
+        except OSError as e:
+            self.status.setText(f"Could not open the script: {e}")
+            return
+        self.progress.setValue(0)
+        self.status.setText("Running")
+        self.runner.start()
+        self.timer.start(REFRESH_RATE_MS)
+        self.update_buttons()
+
+    def stop_script(self):
+        if self.runner is not None:
+            self.runner.cancel()
+
+    def refresh(self):
+        """Show the script's latest progress and log lines"""
+        if self.runner is None:
+            return
+        context = self.runner.context
+        self.progress.setValue(round(context.progress * 100))
+        if context.status:
+            self.status.setText(context.status)
+        lines = self.runner.take_log()
+        if lines:
+            self.log.appendPlainText("\n".join(lines))
+
+    def on_finished(self):
+        self.refresh()
+        runner = self.runner
+        self.runner = None
+        self.timer.stop()
+        if runner.error is not None:
+            self.status.setText("Failed")
+        elif runner.cancelled:
+            self.status.setText("Stopped")
+        else:
+            self.status.setText("Finished")
+        self.update_buttons()
+
+    def update_buttons(self):
+        running = self.runner is not None
+        self.open_button.setEnabled(not running)
+        self.run_button.setEnabled(not running and self.path is not None)
+        self.stop_button.setEnabled(running)
+
+    def build_layout(self):
+        self.setWindowTitle("Scripts")
+
+        self.open_button = QPushButton("Open...")
+        self.open_button.clicked.connect(self.choose_script)
+        self.path_label = QLabel("No script")
+        self.run_button = QPushButton("Run")
+        self.run_button.clicked.connect(self.run_script)
+        self.stop_button = QPushButton("Stop")
+        self.stop_button.clicked.connect(self.stop_script)
+        buttons = QHBoxLayout()
+        buttons.addWidget(self.open_button)
+        buttons.addWidget(self.path_label, 1)
+        buttons.addWidget(self.run_button)
+        buttons.addWidget(self.stop_button)
+
+        self.progress = QProgressBar()
+        self.status = QLabel()
+        self.log = QPlainTextEdit()
+        self.log.setReadOnly(True)
+        self.log.setMaximumBlockCount(MAX_LOG_VIEW_LINES)
+
+        root = QWidget()
+        layout = QVBoxLayout()
+        layout.addLayout(buttons)
+        layout.addWidget(self.progress)
+        layout.addWidget(self.status)
+        layout.addWidget(self.log, 1)
+        root.setLayout(layout)
+        self.setWidget(root)
+        self.update_buttons()
@@ -0,0 +1,89 @@
+import math
+from typing import Dict, List, Optional, Tuple
+
+import can
+
+from CyberGearDriver import CyberGearMotor
+
+from CyberGearDashboard.connection import BusConnection
+from CyberGearDashboard.protocol import control_message
+
+# A motor's operation control setpoint: (position, velocity, torque, kp, kd)
+Setpoint = Tuple[float, float, float, float, float]
+
+
+class Burst:
+    """Operation control frames for a set of motors, built up front to be sent as one burst"""
+
+    motor_ids: List[int]
+    messages: List[can.Message]
+
+    def __init__(self, setpoints: Dict[CyberGearMotor, Setpoint]):
+        self.motor_ids = []
+        self.messages = []
+        for motor, setpoint in setpoints.items():
+            message = control_message(motor, *setpoint)
+            self.motor_ids.append(motor.motor_id)
+            self.messages.append(
+                can.Message(
+                    arbitration_id=message.arbitration_id,
+                    data=message.data,
+                    is_extended_id=True,
+                )
+            )
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+
+class SyncBroadcaster:
+    """
+    Sends setpoints to several motors at once, with the least skew between them.
+
+    Frames are built ahead of time (see `prepare`), so sending a burst is only the sends,
+    back to back. The skew of each burst is measured from the TX timestamps: the time
+    from the first frame to the last being handed to the adapter.
+    """
+
+    connection: BusConnection
+    count: int
+    last_skew: float
+    max_skew: float
+    total_skew: float
+    offsets: Dict[int, float]
+
+    def __init__(self, connection: BusConnection):
+        self.connection = connection
+        self.reset_statistics()
+
+    @property
+    def mean_skew(self) -> float:
+        return self.total_skew / self.count if self.count else math.nan
+
+    def prepare(self, setpoints: Dict[CyberGearMotor, Setpoint]) -> Burst:
+        return Burst(setpoints)
+
+    def send(self, burst: Burst) -> Optional[float]:
+        """Send a burst, and return its skew in seconds (None if it wasn't all sent)"""
+        sent_times = self.connection.send_burst(burst.messages)
+        if len(sent_times) < len(burst) or not sent_times:
+            return None
+
+        first = sent_times[0]
+        self.offsets = {
+            motor_id: sent_at - first
+            for motor_id, sent_at in zip(burst.motor_ids, sent_times)
+        }
+        skew = sent_times[-1] - first
+        self.count += 1
+        self.last_skew = skew
+        self.max_skew = max(self.max_skew, skew)
+        self.total_skew += skew
+        return skew
+
+    def reset_statistics(self):
+        self.count = 0
+        self.last_skew = math.nan
+        self.max_skew = 0.0
+        self.total_skew = 0.0
+        self.offsets = {}
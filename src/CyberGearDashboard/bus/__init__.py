@@ -0,0 +1,2 @@
+from .discovery_dialog import DiscoveryDialog
+from .stats_dock import BusStatisticsDock
@@ -0,0 +1,151 @@
+import time
+import threading
+from typing import Dict, Iterable, List, Set
+from PySide6.QtCore import Qt, Signal
+from PySide6.QtWidgets import (
+    QDialog,
+    QVBoxLayout,
+    QHBoxLayout,
+    QLabel,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QAbstractItemView,
+    QHeaderView,
+    QDialogButtonBox,
+)
+
+from CyberGearDashboard.connection import BusConnection
+from CyberGearDashboard.discovery import MotorScanner, DiscoveredMotor
+
+
+class DiscoveryDialog(QDialog):
+    """Scan the bus for motors and pick the ones to add to the dashboard"""
+
+    connection: BusConnection
+    scanner: MotorScanner
+    known_ids: Set[int]
+    rows: Dict[int, int]
+    table: QTableWidget
+    status: QLabel
+    scan_button: QPushButton
+
+    headers = ("ID", "Unique ID", "Reply (ms)", "Status")
+
+    motor_found = Signal(DiscoveredMotor)
+    scan_finished = Signal(float)
+    motors_selected = Signal(list)
+
+    def __init__(
+        self, connection: BusConnection, known_ids: Iterable[int], *args, **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+        self.connection = connection
+        self.known_ids = set(known_ids)
+        self.rows = {}
+
+        # Signals move the scanner callbacks from the bus threads to the UI thread
+        self.motor_found.connect(self.show_motor)
+        self.scan_finished.connect(self.on_scan_finished)
+
+        # Listen passively for as long as the dialog is open
+        self.scanner = MotorScanner(
+            send=self.connection.send, on_found=self.motor_found.emit
+        )
+        self.connection.add_receiver(self.scanner.message_received)
+
+        self.build_layout()
+
+    def start_scan(self):
+        """Probe all motor IDs in the background"""
+        if not self.connection.is_connected:
+            self.status.setText("The CAN bus is not connected")
+            return
+        self.scan_button.setEnabled(False)
+        self.status.setText("Scanning...")
+        threading.Thread(target=self.run_scan, daemon=True).start()
+
+    def run_scan(self):
+        start = time.perf_counter()
+        self.scanner.scan()
+        self.scan_finished.emit(time.perf_counter() - start)
+
+    def on_scan_finished(self, elapsed: float):
+        count = len(self.scanner.found)
+        self.status.setText(f"Found {count} motor(s) in {elapsed:.3f}s")
+        self.scan_button.setEnabled(True)
+
+    def show_motor(self, motor: DiscoveredMotor):
+        """Add or update the row for a motor that was found"""
+        row = self.rows.get(motor.motor_id)
+        if row is None:
+            row = self.table.rowCount()
+            self.table.insertRow(row)
+            self.rows[motor.motor_id] = row
+
+        in_session = motor.motor_id in self.known_ids
+        reply = (
+            f"{motor.response_time * 1000:.1f}"
+            if motor.response_time is not None
+            else "passive"
+        )
+        values = (
+            str(motor.motor_id),
+            motor.unique_id_hex,
+            reply,
+            "In dashboard" if in_session else "",
+        )
+        for col, value in enumerate(values):
+            item = QTableWidgetItem(value)
+            item.setData(Qt.ItemDataRole.UserRole, motor.motor_id)
+            if in_session:
+                item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsSelectable)
+            self.table.setItem(row, col, item)
+
+    def selected_ids(self) -> List[int]:
+        rows = {index.row() for index in self.table.selectionModel().selectedRows()}
+        return sorted(
+            self.table.item(row, 0).data(Qt.ItemDataRole.UserRole) for row in rows
+        )
+
+    def accept(self):
+        self.motors_selected.emit(self.selected_ids())
+        super().accept()
+
+    def done(self, result: int):
+        self.connection.remove_receiver(self.scanner.message_received)
+        super().done(result)
+
+    def build_layout(self):
+        self.setWindowTitle("Discover motors")
+        self.resize(420, 360)
+
+        self.scan_button = QPushButton("Scan")
+        self.scan_button.clicked.connect(self.start_scan)
+        self.status = QLabel("Select the motors to add to the dashboard")
+
+        self.table = QTableWidget(0, len(self.headers))
+        self.table.setHorizontalHeaderLabels(self.headers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(
+            QHeaderView.ResizeMode.ResizeToContents
+        )
+
+        buttons = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel
+        )
+        buttons.button(QDialogButtonBox.StandardButton.Ok).setText("Add selected")
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+
+        toolbar = QHBoxLayout()
+        toolbar.addWidget(self.scan_button)
+        toolbar.addWidget(self.status, stretch=1)
+
+        layout = QVBoxLayout()
+        layout.addLayout(toolbar)
+        layout.addWidget(self.table)
+        layout.addWidget(buttons)
+        self.setLayout(layout)
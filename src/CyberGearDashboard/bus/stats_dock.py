@@ -0,0 +1,162 @@
+import time
+from typing import List
+from PySide6.QtCore import QTimer
+from PySide6.QtGui import QHideEvent, QIcon, QShowEvent
+from PySide6.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QLabel,
+    QPushButton,
+    QSizePolicy,
+    QDockWidget,
+    QTableWidget,
+    QTableWidgetItem,
+    QAbstractItemView,
+    QHeaderView,
+)
+
+import pyqtgraph as pg
+
+from CyberGearDashboard.bus_stats import BusStatistics, JITTER_BINS_MS
+from CyberGearDashboard.connection import BusConnection
+
+REFRESH_RATE_MS = 500
+
+
+class BusStatisticsDock(QDockWidget):
+    """
+    Bus load, frame rates per motor and message type, and inter-arrival jitter.
+    Frames are only counted while the dock is shown.
+    """
+
+    stats: BusStatistics
+    connection: BusConnection
+    summary: QLabel
+    table: QTableWidget
+    histogram: pg.BarGraphItem
+
+    headers = ("Motor", "Type", "Frames/s", "Interval (ms)", "Jitter (ms)")
+
+    def __init__(self, connection: BusConnection, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.connection = connection
+        self.stats = BusStatistics(connection.bitrate)
+        self.build_layout()
+
+        timer = QTimer(self)
+        timer.timeout.connect(self.update_view)
+        timer.start(REFRESH_RATE_MS)
+
+    def set_counting(self, counting: bool):
+        """
+        Start or stop taking every frame (which costs the UI thread's time, when the bus
+        runs in its own process)
+        """
+        self.connection.remove_receiver(self.stats.message_received)
+        self.connection.remove_transmit_listener(self.stats.message_sent)
+        if counting:
+            self.connection.add_receiver(self.stats.message_received)
+            self.connection.add_transmit_listener(self.stats.message_sent)
+
+    def showEvent(self, event: QShowEvent):
+        self.set_counting(True)
+        super().showEvent(event)
+
+    def hideEvent(self, event: QHideEvent):
+        self.set_counting(False)
+        super().hideEvent(event)
+
+    def reset(self):
+        """Start counting from zero"""
+        self.stats.reset()
+        self.connection.tx_errors = 0
+        self.table.setRowCount(0)
+        self.update_view()
+
+    def update_view(self):
+        """Refresh the statistics, when visible"""
+        if not self.isVisible():
+            return
+        stats = self.stats
+        now = time.time()
+        self.summary.setText(
+            f"Load: {stats.load(now):.1f}%   Frames/s: {stats.frame_rate(now):.0f}   "
+            f"RX: {stats.rx_count}   TX: {stats.tx_count}\n"
+            f"Error frames: {stats.error_frames}   RX overflow: {stats.rx_overflows}   "
+            f"TX overflow: {stats.tx_overflows}   TX errors: {self.connection.tx_errors}"
+        )
+
+        streams = stats.sorted_streams()
+        self.table.setRowCount(len(streams))
+        for row, stream in enumerate(streams):
+            values = (
+                str(stream.motor_id),
+                stream.name,
+                f"{stream.counter.rate(now):.1f}",
+                f"{stream.mean:.2f}",
+                f"{stream.jitter:.2f}",
+            )
+            for col, value in enumerate(values):
+                item = self.table.item(row, col)
+                if item is None:
+                    self.table.setItem(row, col, QTableWidgetItem(value))
+                else:
+                    item.setText(value)
+
+        # Histogram of the selected stream
+        selected = self.table.selectionModel().selectedRows()
+        if selected and selected[0].row() < len(streams):
+            self.histogram.setOpts(height=streams[selected[0].row()].histogram)
+        else:
+            self.histogram.setOpts(height=[0] * (len(JITTER_BINS_MS) + 1))
+
+    def histogram_labels(self) -> List[str]:
+        labels = [f"<{edge:g}" for edge in JITTER_BINS_MS]
+        labels.append(f">{JITTER_BINS_MS[-1]:g}")
+        return labels
+
+    def build_layout(self):
+        self.setWindowTitle("Bus statistics")
+
+        self.summary = QLabel()
+
+        reset = QPushButton()
+        reset.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
+        reset.setIcon(QIcon.fromTheme(QIcon.ThemeIcon.EditClear))
+        reset.setToolTip("Reset counters")
+        reset.clicked.connect(self.reset)
+
+        self.table = QTableWidget(0, len(self.headers))
+        self.table.setHorizontalHeaderLabels(self.headers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(
+            QHeaderView.ResizeMode.ResizeToContents
+        )
+
+        # Inter-arrival time histogram
+        graph = pg.PlotWidget()
+        graph.setTitle("Interval (ms) of selected row")
+        graph.setMinimumHeight(150)
+        labels = self.histogram_labels()
+        graph.getAxis("bottom").setTicks([list(enumerate(labels))])
+        self.histogram = pg.BarGraphItem(
+            x=list(range(len(labels))), height=[0] * len(labels), width=0.8
+        )
+        graph.addItem(self.histogram)
+
+        toolbar = QHBoxLayout()
+        toolbar.addWidget(self.summary, stretch=1)
+        toolbar.addWidget(reset)
+
+        layout = QVBoxLayout()
+        layout.addLayout(toolbar)
+        layout.addWidget(self.table)
+        layout.addWidget(graph)
+
+        root = QWidget()
+        root.setLayout(layout)
+        self.setWidget(root)
@@ -0,0 +1,685 @@
+import time
+import struct
+import threading
+import itertools
+import multiprocessing
+from multiprocessing import shared_memory
+from multiprocessing.connection import Connection, wait
+from typing import Callable, Dict, List, Optional, Tuple
+
+import can
+import numpy as np
+from PySide6.QtCore import Qt
+
+from CyberGearDriver.constants import Command
+
+from CyberGearDashboard.constants import DEFAULT_CAN_BITRATE
+from CyberGearDashboard.analysis.frames import (
+    FRAME_DTYPE,
+    FLAG_EXTENDED,
+    FLAG_ERROR,
+    FLAG_TX,
+)
+from CyberGearDashboard.analysis.session import RECORD_STRUCT
+from CyberGearDashboard.connection import (
+    RECONNECT_DELAY_MAX,
+    BusConnection,
+    ConnectionState,
+    call_receivers,
+)
+from CyberGearDashboard.protocol import (
+    DATA_SHIFT,
+    FEEDBACK_FAULT_SHIFT,
+    FEEDBACK_FAULT_MASK,
+    MODE_SHIFT,
+    MODE_MASK,
+)
+from CyberGearDashboard.samples import (
+    SAMPLE_DTYPE,
+    SAMPLE_KEYS,
+    SAMPLE_STRUCT,
+    message_values,
+)
+from CyberGearDashboard.watcher import MotorWatcher, PollFrame
+
+# How many frames the shared ring buffer holds (about a second of a full 1 Mbit/s bus),
+# and how many decoded samples (state feedback has 4 values per frame)
+RING_CAPACITY = 8192
+SAMPLE_CAPACITY = RING_CAPACITY * 4
+
+# Ring buffer header: the number of records written so far, then for the frame ring,
+# the TX error count, and the halt flag (set by the dashboard, so it's seen before the
+# commands queued ahead of it)
+HEADER_STRUCT = struct.Struct("<qq")
+COUNTER_STRUCT = struct.Struct("<q")
+WRITTEN_OFFSET = 0
+TX_ERRORS_OFFSET = 8
+HALTED_OFFSET = 16
+HEADER_SIZE = 64
+
+# How often the dashboard drains the frame ring buffer (in seconds). The motors get their
+# latest state feedback from each batch, which is about as often as scripts request it,
+# and the captures go by the frames' own timestamps.
+DRAIN_INTERVAL = 0.01
+
+# How often it takes the decoded samples (in seconds). They only feed the charts and the
+# value views, which refresh slower than this, and each batch costs about the same
+# however many samples it has.
+SAMPLE_DRAIN_INTERVAL = 0.05
+
+# How often the bus process publishes its TX error count (in seconds)
+STATUS_INTERVAL = 0.1
+
+# How long the bus process gets to close the bus, before it's terminated (in seconds)
+EXIT_TIMEOUT = 2.0
+
+# How long to wait for the bus process to report a burst's send times (in seconds)
+BURST_TIMEOUT = 0.5
+
+# Commands, from the dashboard to the bus process
+SEND = "send"
+HALT = "halt"
+SCHEDULE = "schedule"
+CLOSE = "close"
+
+# Status updates, from the bus process to the dashboard
+STATE = "state"
+SENT = "sent"
+
+
+def message_frame(msg: can.Message) -> PollFrame:
+    return (msg.arbitration_id, bytes(msg.data), msg.is_extended_id)
+
+
+def frame_message(frame: PollFrame) -> can.Message:
+    arbitration_id, data, is_extended_id = frame
+    return can.Message(
+        arbitration_id=arbitration_id, data=data, is_extended_id=is_extended_id
+    )
+
+
+def record_messages(frames: np.ndarray) -> List[can.Message]:
+    """The messages of FRAME_DTYPE records"""
+    return [
+        can.Message(
+            timestamp=timestamp,
+            arbitration_id=arbitration_id,
+            is_extended_id=bool(flags & FLAG_EXTENDED),
+            is_error_frame=bool(flags & FLAG_ERROR),
+            dlc=dlc,
+            data=bytes(data[:dlc]),
+        )
+        for timestamp, arbitration_id, dlc, flags, _, data in frames.tolist()
+    ]
+
+
+def state_updates(frames: np.ndarray, last_faults: Dict[int, int]) -> np.ndarray:
+    """
+    Which of the frames can change a motor's state: every received frame, except the
+    state feedback that only updates the values (which come as samples). Of each
+    motor's feedback, the latest is kept, and every one where the fault flags change.
+    `last_faults` holds each motor's fault flags as of the frames before, and is updated.
+    """
+    ids = frames["arbitration_id"].astype(np.int64)
+    received = (frames["flags"] & (FLAG_TX | FLAG_ERROR)) == 0
+    feedback = received & (((ids >> MODE_SHIFT) & MODE_MASK) == Command.STATE.value)
+    keep = received & ~feedback
+
+    rows = np.nonzero(feedback)[0]
+    if len(rows):
+        senders = (ids[rows] >> DATA_SHIFT) & 0xFF
+        order = np.argsort(senders, kind="stable")
+        rows = rows[order]
+        senders = senders[order]
+        faults = (ids[rows] >> FEEDBACK_FAULT_SHIFT) & FEEDBACK_FAULT_MASK
+        first = np.ones(len(rows), dtype=bool)
+        first[1:] = senders[1:] != senders[:-1]
+        last = np.ones(len(rows), dtype=bool)
+        last[:-1] = first[1:]
+
+        previous = np.empty(len(rows), dtype=np.int64)
+        previous[1:] = faults[:-1]
+        starts = np.nonzero(first)[0]
+        previous[starts] = [
+            last_faults.get(sender, -1) for sender in senders[starts].tolist()
+        ]
+        for sender, flags in zip(senders[last].tolist(), faults[last].tolist()):
+            last_faults[sender] = flags
+        keep[rows[last | (faults != previous)]] = True
+    return keep
+
+
+class SharedRing:
+    """
+    Fixed size records in a shared memory ring buffer, written by the bus process and
+    read by the dashboard without locks.
+
+    The writer fills in a record, then bumps the record counter in the header. The reader
+    copies everything written since its last read, then checks the counter again and
+    drops the records that were overwritten while it was copying.
+    """
+
+    record: struct.Struct
+    dtype: np.dtype
+    capacity: int
+    owner: bool
+
+    def __init__(self, capacity: int, name: Optional[str] = None):
+        self.capacity = capacity
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(
+            name=name,
+            create=self.owner,
+            size=HEADER_SIZE + capacity * self.dtype.itemsize,
+        )
+        self.records = np.ndarray(
+            capacity, dtype=self.dtype, buffer=self.shm.buf, offset=HEADER_SIZE
+        )
+        if self.owner:
+            self.shm.buf[:HEADER_SIZE] = bytes(HEADER_SIZE)
+
+        # Only used by the writer, which sends and receives from different threads
+        self.lock = threading.Lock()
+        self.written = 0
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def count(self) -> int:
+        """The number of records written so far"""
+        return COUNTER_STRUCT.unpack_from(self.shm.buf, WRITTEN_OFFSET)[0]
+
+    def write_record(self, *fields):
+        """Write a record (call with the lock)"""
+        slot = self.written % self.capacity
+        self.record.pack_into(
+            self.shm.buf, HEADER_SIZE + slot * self.record.size, *fields
+        )
+        self.written += 1
+        COUNTER_STRUCT.pack_into(self.shm.buf, WRITTEN_OFFSET, self.written)
+
+    def read(self, start: int) -> Tuple[np.ndarray, int, int]:
+        """
+        A copy of the records written since record number `start`. Returns the records,
+        the number to read from next, and how many records were lost to overwriting.
+        """
+        # The slot after the newest record holds the oldest one, until the writer starts
+        # on it, so it's never read
+        end = self.count()
+        first = max(start, end - self.capacity + 1)
+        records = self.copy(first, end)
+
+        # The writer may have lapped the oldest of these while they were copied
+        overwritten = self.count() - self.capacity + 1
+        if overwritten > first:
+            records = records[overwritten - first :]
+            first = min(overwritten, end)
+        return records, end, first - start
+
+    def copy(self, first: int, end: int) -> np.ndarray:
+        count = end - first
+        start = first % self.capacity
+        if start + count <= self.capacity:
+            return self.records[start : start + count].copy()
+        wrapped = count - (self.capacity - start)
+        return np.concatenate((self.records[start:], self.records[:wrapped]))
+
+    def close(self):
+        # The views have to go before the shared memory can be closed
+        self.records = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class FrameRing(SharedRing):
+    """
+    Every CAN frame received or sent by the bus process, for the dashboard's receivers
+    and transmit listeners. The records are the same as in session files. The header also
+    holds the bus process' TX error count, and the dashboard's halt flag.
+    """
+
+    record = RECORD_STRUCT
+    dtype = FRAME_DTYPE
+
+    def __init__(self, capacity: int = RING_CAPACITY, name: Optional[str] = None):
+        super().__init__(capacity, name)
+
+    def header(self) -> Tuple[int, int]:
+        """The number of frames written so far, and the bus process' TX error count"""
+        return HEADER_STRUCT.unpack_from(self.shm.buf, 0)
+
+    def write(self, msg: can.Message, flags: int = 0):
+        if msg.is_extended_id:
+            flags |= FLAG_EXTENDED
+        if msg.is_error_frame:
+            flags |= FLAG_ERROR
+        timestamp = msg.timestamp or time.time()
+        data = bytes(msg.data[:8])
+        with self.lock:
+            self.write_record(timestamp, msg.arbitration_id, msg.dlc, flags, data)
+
+    def write_sent(self, msg: can.Message):
+        self.write(msg, FLAG_TX)
+
+    def set_tx_errors(self, count: int):
+        COUNTER_STRUCT.pack_into(self.shm.buf, TX_ERRORS_OFFSET, count)
+
+    @property
+    def halted(self) -> bool:
+        return COUNTER_STRUCT.unpack_from(self.shm.buf, HALTED_OFFSET)[0] != 0
+
+    @halted.setter
+    def halted(self, halted: bool):
+        COUNTER_STRUCT.pack_into(self.shm.buf, HALTED_OFFSET, int(halted))
+
+
+class SampleRing(SharedRing):
+    """
+    The values the bus process decodes from the received frames (state feedback and
+    parameter replies), one SAMPLE_DTYPE record per value, so the dashboard only has
+    to copy them into its sample stores.
+    """
+
+    record = SAMPLE_STRUCT
+    dtype = SAMPLE_DTYPE
+
+    def __init__(self, capacity: int = SAMPLE_CAPACITY, name: Optional[str] = None):
+        super().__init__(capacity, name)
+
+    def message_received(self, msg: can.Message):
+        if not msg.is_extended_id or msg.is_error_frame:
+            return
+        values = message_values(msg)
+        if not values:
+            return
+        received = time.monotonic()
+        timestamp = msg.timestamp or time.time()
+        motor_id = (msg.arbitration_id >> DATA_SHIFT) & 0xFF
+        with self.lock:
+            for name, value in values:
+                self.write_record(
+                    received, timestamp, value, SAMPLE_KEYS[name], motor_id
+                )
+
+
+class PollSender(MotorWatcher):
+    """Sends the dashboard's poll requests from the bus process, paced like the watcher"""
+
+    connection: BusConnection
+    queues: List[List[PollFrame]]
+
+    def __init__(self, connection: BusConnection):
+        super().__init__()
+        self.connection = connection
+        self.queues = []
+
+    def request_queues(self):
+        return [[(self, frame) for frame in queue] for queue in self.queues]
+
+    def send_message(self, frame: PollFrame):
+        self.connection.send(frame_message(frame))
+
+
+class RingBusConnection(BusConnection):
+    """
+    The bus process' connection. It's halted while the flag in the ring buffer header is
+    set, which the dashboard sets right away, so sends that were already waiting in the
+    command pipe are blocked too.
+    """
+
+    ring: FrameRing
+
+    def __init__(self, ring: FrameRing, *args, **kwargs):
+        self.ring = ring
+        super().__init__(*args, **kwargs)
+
+    @property
+    def halted(self) -> bool:
+        return self.ring.halted
+
+    @halted.setter
+    def halted(self, halted: bool):
+        # Only the dashboard sets the flag, so its latest halt or resume always wins
+        pass
+
+
+def run_bus_process(
+    channel: str,
+    interface: str,
+    bitrate: int,
+    ring_name: str,
+    capacity: int,
+    samples_name: str,
+    sample_capacity: int,
+    commands: Connection,
+    status: Connection,
+):
+    """
+    The bus process: keeps the bus connected, sends the poll requests and the frames it's
+    handed, publishes every frame received or sent to the frame ring buffer, and the
+    values decoded from them to the sample ring buffer
+    """
+    ring = FrameRing(capacity, ring_name)
+    samples = SampleRing(sample_capacity, samples_name)
+    connection = RingBusConnection(ring, channel, interface, bitrate)
+    connection.add_receiver(ring.write)
+    connection.add_receiver(samples.message_received)
+    connection.add_transmit_listener(ring.write_sent)
+
+    status_lock = threading.Lock()
+
+    def report(*update):
+        with status_lock:
+            try:
+                status.send(update)
+            except (OSError, ValueError):
+                # The dashboard is gone
+                pass
+
+    def report_state(state: ConnectionState):
+        report(STATE, state.value, connection.error)
+
+    # There's no event loop in this process, so the state is reported straight away
+    connection.state_changed.connect(report_state, Qt.ConnectionType.DirectConnection)
+    poller = PollSender(connection)
+    poller.start()
+    connection.open()
+    try:
+        while True:
+            ring.set_tx_errors(connection.tx_errors)
+            if not commands.poll(STATUS_INTERVAL):
+                continue
+            command, *args = commands.recv()
+            if command == SEND:
+                frames, burst = args
+                sent_times = connection.send_burst(
+                    [frame_message(frame) for frame in frames]
+                )
+                if burst is not None:
+                    report(SENT, burst, sent_times)
+            elif command == HALT:
+                connection.halt()
+            elif command == SCHEDULE:
+                poller.queues = args[0]
+            elif command == CLOSE:
+                break
+    except (EOFError, OSError, KeyboardInterrupt):
+        # The dashboard is gone
+        pass
+    finally:
+        poller.stop_watching()
+        connection.close()
+        ring.close()
+        samples.close()
+
+
+class ProcessBusConnection(BusConnection):
+    """
+    A bus connection that does the bus I/O, polling and decoding in a child process, so
+    they don't compete with the UI for the GIL.
+
+    The values the bus process decodes come back through a shared memory ring buffer,
+    which a thread here drains to the sample receivers, in batches. The update receivers
+    only get the frames that can change a motor's state (see `state_updates`). Every
+    frame received and sent comes back through a second ring buffer, but it's only
+    turned into messages while there are receivers or transmit listeners (the recorder,
+    the bus statistics, the captures).
+
+    Frames to send go to the bus process over a pipe. Halt and resume set a flag in the
+    ring buffer header, which the bus process checks before every frame, so a halt also
+    holds back the frames still waiting in the pipe.
+    """
+
+    capacity: int
+    sample_capacity: int
+    ring: Optional[FrameRing]
+    samples: Optional[SampleRing]
+    sample_receivers: List[Callable[[np.ndarray], None]]
+    process: Optional[multiprocessing.Process]
+    rx_lost: int
+    samples_lost: int
+    feedback_faults: Dict[int, int]
+
+    def __init__(
+        self,
+        channel: str,
+        interface: str,
+        bitrate: int = DEFAULT_CAN_BITRATE,
+        capacity: int = RING_CAPACITY,
+        sample_capacity: int = SAMPLE_CAPACITY,
+        *args,
+        **kwargs,
+    ):
+        super().__init__(channel, interface, bitrate, *args, **kwargs)
+        self.capacity = capacity
+        self.sample_capacity = sample_capacity
+        self.ring = None
+        self.samples = None
+        self.sample_receivers = []
+        self.process = None
+        # Frames and samples that were overwritten before they could be read
+        self.rx_lost = 0
+        self.samples_lost = 0
+        # Each motor's fault flags in the latest state feedback
+        self.feedback_faults = {}
+        self.process_tx_errors = 0
+        self._commands = None
+        self._status = None
+        self._send_lock = threading.Lock()
+        self._burst_ids = itertools.count()
+        self._bursts: Dict[int, Tuple[threading.Event, List[float]]] = {}
+
+    def add_sample_receiver(self, callback: Callable[[np.ndarray], None]):
+        """Add a callback that is called with batches of decoded samples (SAMPLE_DTYPE)"""
+        self.sample_receivers = self.sample_receivers + [callback]
+
+    def remove_sample_receiver(self, callback: Callable[[np.ndarray], None]):
+        """Remove a sample callback"""
+        self.sample_receivers = [cb for cb in self.sample_receivers if cb != callback]
+
+    def open(self):
+        """Start the bus process, which connects in the background"""
+        self.ring = FrameRing(self.capacity)
+        self.samples = SampleRing(self.sample_capacity)
+        context = multiprocessing.get_context("spawn")
+        command_reader, self._commands = context.Pipe(duplex=False)
+        self._status, status_writer = context.Pipe(duplex=False)
+        self.process = context.Process(
+            target=run_bus_process,
+            args=(
+                self.channel,
+                self.interface,
+                self.bitrate,
+                self.ring.name,
+                self.capacity,
+                self.samples.name,
+                self.sample_capacity,
+                command_reader,
+                status_writer,
+            ),
+            name="CyberGear bus",
+            daemon=True,
+        )
+        self.process.start()
+        command_reader.close()
+        status_writer.close()
+        self._thread.start()
+
+    def close(self):
+        """Stop the bus process, and with it the bus"""
+        self._closing.set()
+        self.command(CLOSE)
+        if self.process is not None:
+            self.process.join(EXIT_TIMEOUT)
+            if self.process.is_alive():
+                self.process.terminate()
+        if self._thread.is_alive():
+            self._thread.join(timeout=RECONNECT_DELAY_MAX)
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+        if self.samples is not None:
+            self.samples.close()
+            self.samples = None
+
+    def command(self, *command):
+        """Hand a command to the bus process"""
+        if self._commands is None:
+            return
+        with self._send_lock:
+            try:
+                self._commands.send(command)
+            except (OSError, ValueError):
+                # The bus process is gone
+                pass
+
+    def send(self, msg: can.Message):
+        """Send a message on the bus. The transmit listeners are called once it was sent."""
+        if not self.is_connected:
+            return
+        # Checked here too, so blocked frames are counted where the stats are shown
+        with self.send_lock:
+            if not self.is_blocked(msg):
+                self.command(SEND, [message_frame(msg)], None)
+
+    def send_burst(self, messages: List[can.Message]) -> List[float]:
+        """
+        Hand several messages to the bus process, which sends them back to back, and
+        wait for it to report when each was handed to the adapter (`time.perf_counter`,
+        which is the system's monotonic clock, the same in both processes).
+        Returns no times if the bus process didn't report them in time.
+        """
+        if not self.is_connected:
+            return []
+        burst = next(self._burst_ids)
+        sent = threading.Event()
+        sent_times: List[float] = []
+        with self.send_lock:
+            frames = []
+            for msg in messages:
+                if self.is_blocked(msg):
+                    break
+                frames.append(message_frame(msg))
+            if not frames:
+                return []
+            self._bursts[burst] = (sent, sent_times)
+            self.command(SEND, frames, burst)
+        sent.wait(BURST_TIMEOUT)
+        self._bursts.pop(burst, None)
+        return sent_times
+
+    def halt(self):
+        with self.send_lock:
+            self.halted = True
+            # The bus process checks the flag before every frame it sends, so the frames
+            # still waiting in the pipe are held back too. The command flushes the adapter.
+            if self.ring is not None:
+                self.ring.halted = True
+            self.command(HALT)
+
+    def resume(self):
+        with self.send_lock:
+            self.halted = False
+            if self.ring is not None:
+                self.ring.halted = False
+
+    def set_poll_schedule(self, queues: List[List[PollFrame]]):
+        """The poll requests for the bus process to send, per motor"""
+        self.command(SCHEDULE, queues)
+
+    def run(self):
+        """Drain the ring buffers, and follow the bus process' connection state"""
+        position = 0
+        sample_position = 0
+        next_samples = 0.0
+        while not self._closing.is_set():
+            ready = wait([self._status, self.process.sentinel], DRAIN_INTERVAL)
+            running = self.read_status() if ready else True
+
+            now = time.monotonic()
+            if now >= next_samples:
+                next_samples = now + SAMPLE_DRAIN_INTERVAL
+                samples, sample_position, lost = self.samples.read(sample_position)
+                self.samples_lost += lost
+                self.dispatch_samples(samples)
+
+            frames, position, lost = self.ring.read(position)
+            self.rx_lost += lost
+            self.dispatch(frames)
+
+            # TX errors are counted in the bus process
+            _, tx_errors = self.ring.header()
+            self.tx_errors += tx_errors - self.process_tx_errors
+            self.process_tx_errors = tx_errors
+
+            if not running:
+                if not self._closing.is_set():
+                    self.error = f"The bus process exited ({self.process.exitcode})"
+                break
+        self._status.close()
+        self.set_state(ConnectionState.DISCONNECTED)
+
+    def read_status(self) -> bool:
+        """Take the connection state updates (returns False once the bus process exited)"""
+        try:
+            while self._status.poll():
+                update, *args = self._status.recv()
+                if update == STATE:
+                    self.state_received(*args)
+                elif update == SENT:
+                    self.burst_sent(*args)
+        except (EOFError, OSError):
+            return False
+        return True
+
+    def state_received(self, state: str, error: Optional[str]):
+        self.error = error
+        self.set_state(ConnectionState(state))
+        if self.is_connected:
+            # The handlers may wait for replies, which arrive on this thread
+            threading.Thread(target=self.connected, daemon=True).start()
+
+    def burst_sent(self, burst: int, sent_times: List[float]):
+        waiting = self._bursts.get(burst)
+        if waiting is not None:
+            sent, times = waiting
+            times.extend(sent_times)
+            sent.set()
+
+    def connected(self):
+        for callback in self.on_connect:
+            callback()
+
+    def dispatch_samples(self, samples: np.ndarray):
+        """
+        Pass the samples from the ring buffer to the sample receivers. A failing callback
+        is reported, so it doesn't stop the drain thread.
+        """
+        if len(samples):
+            call_receivers(self.sample_receivers, samples)
+
+    def dispatch(self, frames: np.ndarray):
+        """
+        Pass the frames from the ring buffer on: those that can change a motor's state
+        to the update receivers, and every frame to the receivers and transmit listeners,
+        if there are any. A failing callback is reported, so it doesn't stop the drain
+        thread.
+        """
+        if not len(frames):
+            return
+
+        # Tracked even without update receivers, so none are missed when one is added
+        updates = state_updates(frames, self.feedback_faults)
+        update_receivers = self.update_receivers
+        if update_receivers:
+            for msg in record_messages(frames[updates]):
+                call_receivers(update_receivers, msg)
+
+        receivers = self.receivers
+        transmit_listeners = self.transmit_listeners
+        if receivers or transmit_listeners:
+            sent = ((frames["flags"] & FLAG_TX) != 0).tolist()
+            for msg, is_sent in zip(record_messages(frames), sent):
+                call_receivers(transmit_listeners if is_sent else receivers, msg)
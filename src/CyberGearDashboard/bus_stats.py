@@ -0,0 +1,209 @@
+import time
+import math
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+
+import can
+
+from CyberGearDashboard.constants import DEFAULT_CAN_BITRATE
+from CyberGearDashboard.protocol import (
+    COMMAND_NAMES,
+    MODE_SHIFT,
+    MODE_MASK,
+    motor_id_of,
+)
+
+# Nominal bits on the wire for a frame without data, including the interframe space.
+# Bit stuffing adds up to ~20% on top of this, so the load is a lower bound.
+EXTENDED_FRAME_BITS = 67
+STANDARD_FRAME_BITS = 47
+
+# Rates are counted over a sliding window, in buckets
+RATE_WINDOW = 1.0
+RATE_BUCKETS = 10
+
+# Inter-arrival histogram bin edges, in milliseconds
+JITTER_BINS_MS = (0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+# SocketCAN error frame flags (linux/can/error.h)
+CAN_ERR_CRTL = 0x00000004
+CAN_ERR_CRTL_RX_OVERFLOW = 0x01
+CAN_ERR_CRTL_TX_OVERFLOW = 0x02
+
+
+class WindowCounter:
+    """Counts events over a sliding time window, in O(1) per event"""
+
+    __slots__ = ("bucket_width", "buckets", "slot")
+
+    def __init__(self, window: float = RATE_WINDOW, buckets: int = RATE_BUCKETS):
+        self.bucket_width = window / buckets
+        self.buckets = [0] * buckets
+        self.slot = 0
+
+    def advance(self, now: float):
+        """Move the window forward, clearing the buckets that have fallen out of it"""
+        slot = int(now / self.bucket_width)
+        skipped = slot - self.slot
+        if skipped > 0:
+            count = len(self.buckets)
+            for i in range(1, min(skipped, count) + 1):
+                self.buckets[(self.slot + i) % count] = 0
+            self.slot = slot
+
+    def add(self, now: float, amount: int = 1):
+        self.advance(now)
+        self.buckets[self.slot % len(self.buckets)] += amount
+
+    def rate(self, now: float) -> float:
+        """The amount per second over the window"""
+        self.advance(now)
+        return sum(self.buckets) / (self.bucket_width * len(self.buckets))
+
+
+class StreamStatistics:
+    """Frame rate and inter-arrival time statistics for one motor ID and message type"""
+
+    __slots__ = (
+        "motor_id",
+        "mode",
+        "count",
+        "last_timestamp",
+        "mean",
+        "m2",
+        "histogram",
+        "counter",
+    )
+
+    def __init__(self, motor_id: int, mode: int):
+        self.motor_id = motor_id
+        self.mode = mode
+        self.count = 0
+        self.last_timestamp = None
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.histogram = [0] * (len(JITTER_BINS_MS) + 1)
+        self.counter = WindowCounter()
+
+    @property
+    def name(self) -> str:
+        return COMMAND_NAMES[self.mode]
+
+    @property
+    def jitter(self) -> float:
+        """Standard deviation of the inter-arrival time, in ms"""
+        intervals = self.count - 1
+        return math.sqrt(self.m2 / intervals) if intervals > 1 else 0.0
+
+    def add(self, timestamp: float, now: float):
+        self.count += 1
+        self.counter.add(now)
+        if self.last_timestamp is not None:
+            # Running mean/variance of the interval (Welford)
+            interval = (timestamp - self.last_timestamp) * 1000
+            intervals = self.count - 1
+            delta = interval - self.mean
+            self.mean += delta / intervals
+            self.m2 += delta * (interval - self.mean)
+            self.histogram[bisect_right(JITTER_BINS_MS, interval)] += 1
+        self.last_timestamp = timestamp
+
+    def reset_histogram(self):
+        self.histogram = [0] * (len(JITTER_BINS_MS) + 1)
+
+
+class BusStatistics:
+    """
+    Live bus load, frame rates and inter-arrival jitter per motor ID and message type.
+    Everything is updated incrementally, in O(1) per frame.
+    """
+
+    bitrate: int
+    streams: Dict[Tuple[int, int], StreamStatistics]
+    frames: WindowCounter
+    bits: WindowCounter
+    rx_count: int
+    tx_count: int
+    error_frames: int
+    rx_overflows: int
+    tx_overflows: int
+
+    def __init__(self, bitrate: int = DEFAULT_CAN_BITRATE):
+        self.bitrate = bitrate
+        self.reset()
+
+    def reset(self):
+        self.streams = {}
+        self.frames = WindowCounter()
+        self.bits = WindowCounter()
+        self.rx_count = 0
+        self.tx_count = 0
+        self.error_frames = 0
+        self.rx_overflows = 0
+        self.tx_overflows = 0
+
+    def frame_bits(self, msg: can.Message) -> int:
+        overhead = EXTENDED_FRAME_BITS if msg.is_extended_id else STANDARD_FRAME_BITS
+        return overhead + 8 * msg.dlc
+
+    def message_received(self, msg: can.Message):
+        """Count a received frame"""
+        now = time.time()
+        self.frames.add(now)
+        self.bits.add(now, self.frame_bits(msg))
+        if msg.is_error_frame:
+            self.error_received(msg)
+            return
+
+        self.rx_count += 1
+        arbitration_id = msg.arbitration_id
+        key = (motor_id_of(arbitration_id), (arbitration_id >> MODE_SHIFT) & MODE_MASK)
+        stream = self.streams.get(key)
+        if stream is None:
+            stream = self.streams[key] = StreamStatistics(*key)
+        stream.add(msg.timestamp, now)
+
+    def message_sent(self, msg: can.Message):
+        """Count a frame we sent (most adapters don't echo them back)"""
+        now = time.time()
+        self.tx_count += 1
+        self.frames.add(now)
+        self.bits.add(now, self.frame_bits(msg))
+
+    def error_received(self, msg: can.Message):
+        self.error_frames += 1
+        if msg.arbitration_id & CAN_ERR_CRTL and len(msg.data) > 1:
+            if msg.data[1] & CAN_ERR_CRTL_RX_OVERFLOW:
+                self.rx_overflows += 1
+            if msg.data[1] & CAN_ERR_CRTL_TX_OVERFLOW:
+                self.tx_overflows += 1
+
+    def load(self, now: Optional[float] = None) -> float:
+        """Bus load in percent"""
+        now = time.time() if now is None else now
+        return 100 * self.bits.rate(now) / self.bitrate
+
+    def frame_rate(self, now: Optional[float] = None) -> float:
+        now = time.time() if now is None else now
+        return self.frames.rate(now)
+
+    def sorted_streams(self) -> List[StreamStatistics]:
+        return [self.streams[key] for key in sorted(list(self.streams))]
+
+
+def format_statistics(stats: BusStatistics) -> str:
+    """Format the statistics as a text table"""
+    now = time.time()
+    lines = [
+        f"Bus load: {stats.load(now):5.1f}%  frames/s: {stats.frame_rate(now):7.1f}  "
+        f"rx: {stats.rx_count}  tx: {stats.tx_count}  error frames: {stats.error_frames}  "
+        f"rx overflow: {stats.rx_overflows}  tx overflow: {stats.tx_overflows}",
+        f"{'Motor':>5}  {'Type':<17} {'Frames':>8} {'Frames/s':>9} "
+        f"{'Interval ms':>11} {'Jitter ms':>9}",
+    ]
+    for stream in stats.sorted_streams():
+        lines.append(
+            f"{stream.motor_id:>5}  {stream.name:<17} {stream.count:>8} "
+            f"{stream.counter.rate(now):>9.1f} {stream.mean:>11.2f} {stream.jitter:>9.2f}"
+        )
+    return "\n".join(lines)
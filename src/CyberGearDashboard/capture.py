@@ -0,0 +1,106 @@
+import time
+import threading
+from typing import List, Optional, Tuple
+
+import can
+import numpy as np
+
+from CyberGearDriver import CyberGearMotor, CyberMotorMessage
+from CyberGearDriver.constants import Command
+
+from CyberGearDashboard.analysis.frames import FEEDBACK_DTYPE
+from CyberGearDashboard.protocol import (
+    FEEDBACK_FAULT_SHIFT,
+    FEEDBACK_FAULT_MASK,
+    MODE_SHIFT,
+    MODE_MASK,
+    MODE_STATUS_SHIFT,
+    MODE_STATUS_MASK,
+    decode_feedback,
+    is_reply,
+    sender_id,
+    state_request,
+)
+
+# How often to request the motor state while capturing (in Hz)
+CAPTURE_RATE = 500
+
+
+def feedback_row(msg: can.Message, motor_id: int) -> Optional[Tuple]:
+    """A FEEDBACK_DTYPE row, if the message is a state reply from the motor"""
+    arbitration_id = msg.arbitration_id
+    if (
+        not msg.is_extended_id
+        or (arbitration_id >> MODE_SHIFT) & MODE_MASK != Command.STATE.value
+        or not is_reply(arbitration_id)
+        or sender_id(arbitration_id) != motor_id
+    ):
+        return None
+    return (
+        msg.timestamp,
+        *decode_feedback(msg.data),
+        (arbitration_id >> FEEDBACK_FAULT_SHIFT) & FEEDBACK_FAULT_MASK,
+        (arbitration_id >> MODE_STATUS_SHIFT) & MODE_STATUS_MASK,
+    )
+
+
+class FeedbackCapture:
+    """
+    Collects a motor's feedback, with the CAN timestamps, straight from the receive path.
+    Add `message_received` as a bus receiver while capturing.
+    """
+
+    motor_id: int
+    rows: List[Tuple]
+
+    def __init__(self, motor_id: int):
+        self.motor_id = motor_id
+        self.rows = []
+        self.lock = threading.Lock()
+
+    def message_received(self, msg: can.Message):
+        row = feedback_row(msg, self.motor_id)
+        if row is not None:
+            with self.lock:
+                self.rows.append(row)
+
+    def clear(self):
+        with self.lock:
+            self.rows = []
+
+    def samples(self) -> np.ndarray:
+        """Everything captured so far, as a FEEDBACK_DTYPE array"""
+        with self.lock:
+            rows = self.rows[:]
+        return np.array(rows, dtype=FEEDBACK_DTYPE)
+
+
+def poll_state(
+    motor: CyberGearMotor,
+    duration: float,
+    rate: float = CAPTURE_RATE,
+    stop: Optional[threading.Event] = None,
+    message: Optional[CyberMotorMessage] = None,
+) -> bool:
+    """
+    Request the motor state (or send another request `message`) at a fixed rate for a
+    while (blocking). Returns False if `stop` was set before the time was up.
+    """
+    stop = stop or threading.Event()
+    message = message or state_request(motor)
+    period = 1.0 / rate
+    start = time.perf_counter()
+    index = 0
+    while True:
+        deadline = start + index * period
+        if deadline - start >= duration:
+            return True
+        remaining = deadline - time.perf_counter()
+        if remaining > 0 and stop.wait(remaining):
+            return False
+        if stop.is_set():
+            return False
+        motor.send_message(message)
+
+        # Skip the requests we're too late for, instead of sending a burst
+        index = max(index + 1, int((time.perf_counter() - start) / period))
@@ -1 +1,5 @@
 from .layout import ChartLayout
+from .bode import BodeChart
+from .scope import ScopeDock
+from .spectrum import SpectrumDock
+from .xy_chart import XYChart
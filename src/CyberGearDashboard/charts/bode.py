@@ -0,0 +1,74 @@
+from typing import Optional
+from PySide6.QtWidgets import QWidget, QVBoxLayout
+
+import numpy as np
+import pyqtgraph as pg
+
+from CyberGearDashboard.analysis.frequency_response import (
+    FrequencyResponse,
+    MIN_COHERENCE,
+)
+
+
+class BodeChart(QWidget):
+    """Bode diagram of a frequency response: magnitude, phase and coherence against frequency"""
+
+    magnitude: pg.PlotDataItem
+    phase: pg.PlotDataItem
+    coherence: pg.PlotDataItem
+    response: Optional[FrequencyResponse]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.response = None
+        self.build_layout()
+
+    def set_response(
+        self, response: FrequencyResponse, min_coherence: float = MIN_COHERENCE
+    ):
+        """Show a response, leaving gaps where the coherence is too low to trust"""
+        self.response = response
+        shown = response.frequency > 0
+        frequency = response.frequency[shown]
+        valid = response.valid(min_coherence)[shown]
+        self.magnitude.setData(
+            frequency, np.where(valid, response.magnitude_db[shown], np.nan)
+        )
+        self.phase.setData(
+            frequency, np.where(valid, response.phase_deg[shown], np.nan)
+        )
+        self.coherence.setData(frequency, response.coherence[shown])
+
+    def clear(self):
+        self.response = None
+        for plot in (self.magnitude, self.phase, self.coherence):
+            plot.setData([], [])
+
+    def build_layout(self):
+        graphs = pg.GraphicsLayoutWidget()
+
+        magnitude = graphs.addPlot(row=0, col=0)
+        magnitude.setLabel("left", "Magnitude (dB)")
+        phase = graphs.addPlot(row=1, col=0)
+        phase.setLabel("left", "Phase (°)")
+        coherence = graphs.addPlot(row=2, col=0)
+        coherence.setLabel("left", "Coherence")
+        coherence.setLabel("bottom", "Frequency (Hz)")
+        coherence.setYRange(0, 1)
+        graphs.ci.layout.setRowStretchFactor(0, 3)
+        graphs.ci.layout.setRowStretchFactor(1, 3)
+        graphs.ci.layout.setRowStretchFactor(2, 1)
+
+        for plot in (magnitude, phase, coherence):
+            plot.setLogMode(x=True, y=False)
+            plot.showGrid(x=True, y=True, alpha=0.3)
+            if plot is not magnitude:
+                plot.setXLink(magnitude)
+
+        self.magnitude = magnitude.plot(connect="finite", pen=pg.mkPen("y", width=2))
+        self.phase = phase.plot(connect="finite", pen=pg.mkPen("c", width=2))
+        self.coherence = coherence.plot(pen=pg.mkPen("#888"))
+
+        layout = QVBoxLayout()
+        layout.addWidget(graphs)
+        self.setLayout(layout)
@@ -1,68 +1,239 @@
-import math
-from typing import List
-from PySide6.QtCore import QTimer
-from PySide6.QtWidgets import QWidget, QVBoxLayout
-
+import time
+from typing import Dict, List, Optional, Union
+from PySide6.QtCore import QTimer, Signal
+from PySide6.QtGui import QIcon
+from PySide6.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QToolButton,
+    QMenu,
+)
+
+import numpy as np
 import pyqtgraph as pg
 
-from CyberGearDriver import CyberGearMotor, StateName
+from CyberGearDriver import CyberGearMotor, StateName, ParameterName
+from CyberGearDriver.parameters import parameter_names
+
+from CyberGearDashboard.freshness import (
+    STATE_NAMES,
+    ValueTracker,
+    format_age,
+    format_rate,
+)
+from CyberGearDashboard.samples import SampleStore
+
+from .prepare import DataPreparer, DoubleBuffer, PreparedSeries, decimate_into
 
-MAX_DATA_POINTS = 100
 UPDATE_RATE_MS = 100
 
+# How much history the live charts show (in seconds)
+CHART_SPAN = 10.0
+
+STALE_TITLE_COLOR = "#ffaa50"
+
+ValueName = Union[StateName, ParameterName]
+
+
+class RelativeTimeAxis(pg.AxisItem):
+    """A time axis labeled in seconds relative to `origin`, so the data can stay as is"""
+
+    origin: float = 0.0
+
+    def tickStrings(self, values, scale, spacing):
+        return [f"{value - self.origin:.0f}" for value in values]
+
+
+def series_menu(parent: QWidget, on_selected) -> QMenu:
+    """A menu of every value that can be plotted"""
+    menu = QMenu(parent)
+    for title, names in (
+        ("State", STATE_NAMES),
+        ("Parameters", sorted(parameter_names, key=str.lower)),
+    ):
+        submenu = menu.addMenu(title)
+        for name in names:
+            submenu.addAction(name, lambda name=name: on_selected(name))
+    return menu
+
+
+def header_button(icon: QIcon.ThemeIcon, tooltip: str) -> QToolButton:
+    button = QToolButton()
+    button.setIcon(QIcon.fromTheme(icon))
+    button.setToolTip(tooltip)
+    button.setAutoRaise(True)
+    return button
+
 
 class Chart(QWidget):
-    motor: CyberGearMotor
+    """
+    A time chart of one or more values, overlaid on the same time axis.
+
+    Live charts draw from the motor's shared `SampleStore`. The samples are decimated
+    on the thread pool into the chart's own double-buffered arrays, so the UI thread
+    only hands the finished arrays to the curves.
+    """
+
+    motor: Optional[CyberGearMotor]
+    tracker: Optional[ValueTracker]
+    store: Optional[SampleStore]
+    graph: pg.PlotWidget
     plot: pg.PlotDataItem
-    data_name: StateName
-    x: List[int]
-    y: List[float]
-
-    def __init__(self, motor: CyberGearMotor, data_name: StateName, *args, **kwargs):
+    series: Dict[ValueName, pg.PlotDataItem]
+    buffers: Dict[ValueName, DoubleBuffer]
+    preparer: DataPreparer
+    data_name: ValueName
+    title: str
+    removable: bool
+
+    remove_requested = Signal()
+    series_added = Signal(str)
+
+    def __init__(
+        self,
+        motor: Optional[CyberGearMotor],
+        data_name: ValueName,
+        tracker: Optional[ValueTracker] = None,
+        removable: bool = False,
+        store: Optional[SampleStore] = None,
+        *args,
+        **kwargs,
+    ):
         super().__init__(*args, **kwargs)
         self.motor = motor
         self.data_name = data_name
-        self.x = list(range(MAX_DATA_POINTS))
-        self.y = [math.nan] * MAX_DATA_POINTS
-
+        self.tracker = tracker
+        self.store = store
+        self.removable = removable
+        self.title = data_name
+        self.series = {}
+        self.buffers = {}
+
+        self.preparer = DataPreparer(self)
+        self.preparer.ready.connect(self.show_prepared)
         self.build_layout()
 
-        self.timer = QTimer()
+        self.timer = QTimer(self)
         self.timer.timeout.connect(self.update_data)
         self.start()
 
+    @property
+    def is_live(self) -> bool:
+        return self.store is not None
+
+    @property
+    def series_names(self) -> List[ValueName]:
+        return list(self.series.keys())
+
     def start(self):
         """Start/resume displaying data in the chart"""
-        self.timer.start(UPDATE_RATE_MS)
+        if self.is_live:
+            self.timer.start(UPDATE_RATE_MS)
 
     def pause(self):
         """Pause sending new data to the chart"""
         self.timer.stop()
 
     def clear(self):
-        """Clear the chart data"""
-        self.y = [math.nan] * MAX_DATA_POINTS
-        self.plot.setData(self.y)
+        """Clear the chart"""
+        for curve in self.series.values():
+            curve.setData([], [])
 
-    def update_data(self):
-        value = self.motor.state.get(self.data_name)
-        if value is None:
+    def add_series(self, name: ValueName):
+        """Overlay another value on the chart"""
+        if name in self.series:
             return
+        color = pg.intColor(len(self.series), hues=8)
+        curve = self.graph.plot(name=name, pen=color, connect="finite")
+        curve.setClipToView(True)
+        self.series[name] = curve
+        self.buffers[name] = DoubleBuffer()
+        if len(self.series) > 1:
+            self.set_title(" / ".join(self.series.keys()))
+        self.series_added.emit(name)
 
-        # Shift the data over
-        self.y[1:] = self.y[:-1]
-        self.y[0] = value
-
-        # Plot
-        self.plot.setData(self.y)
+    def update_data(self):
+        """Prepare the next frame on the thread pool, unless the last isn't shown yet"""
+        store = self.store
+        names = self.series_names
+        buffers = [self.buffers[name] for name in names]
+        start = time.monotonic() - CHART_SPAN
+
+        def prepare(back: int) -> PreparedSeries:
+            prepared = []
+            for name, buffer in zip(names, buffers):
+                out_x, out_y = buffer.get(back)
+                times, values = store.channel(name).since(start)
+                count = decimate_into(times, values, out_x, out_y)
+                prepared.append((name, out_x[:count], out_y[:count]))
+            return prepared
+
+        self.preparer.request(prepare)
+
+    def show_prepared(self, prepared: Optional[PreparedSeries]):
+        shown = prepared is not None and self.timer.isActive()
+        if shown:
+            for name, x, y in prepared:
+                curve = self.series.get(name)
+                if curve is not None:
+                    curve.setData(x, y)
+            now = time.monotonic()
+            self.time_axis.origin = now
+            self.graph.setXRange(now - CHART_SPAN, now, padding=0)
+            self.update_title()
+        self.preparer.done(shown)
+
+    def update_title(self):
+        """The freshness of a single series is shown in the title"""
+        if len(self.series) == 1 and self.tracker is not None:
+            stamp = self.tracker.get(self.data_name)
+            if stamp is None:
+                pass
+            elif stamp.is_stale():
+                self.set_title(
+                    f"{self.data_name} (stale, {format_age(stamp.age())})",
+                    STALE_TITLE_COLOR,
+                )
+            else:
+                self.set_title(f"{self.data_name} ({format_rate(stamp.rate())})")
+
+    def set_title(self, title: str, color: Optional[str] = None):
+        if title != self.title:
+            self.title = title
+            self.graph.setTitle(title, color=color)
+
+    def show_window(self, x: np.ndarray, y: np.ndarray):
+        """Show a window of recorded data, instead of the live motor state"""
+        self.pause()
+        self.plot.setData(x, y)
 
     def build_layout(self):
-        graph = pg.PlotWidget()
+        axis_items = {}
+        if self.is_live:
+            self.time_axis = RelativeTimeAxis("bottom")
+            axis_items["bottom"] = self.time_axis
+        graph = pg.PlotWidget(axisItems=axis_items)
         graph.setTitle(self.data_name)
+        graph.addLegend(offset=(-10, 10))
+        graph.enableAutoRange(x=False, y=True)
+        graph.setAutoVisible(y=True)
+        self.graph = graph
 
-        self.plot = graph.plot(self.x, self.y, connect="finite")
-        self.plot.setClipToView(True)
+        self.add_series(self.data_name)
+        self.plot = self.series[self.data_name]
 
         layout = QVBoxLayout()
+        if self.removable:
+            add = header_button(QIcon.ThemeIcon.ListAdd, "Overlay another value")
+            add.setPopupMode(QToolButton.ToolButtonPopupMode.InstantPopup)
+            add.setMenu(series_menu(self, self.add_series))
+            remove = header_button(QIcon.ThemeIcon.WindowClose, "Remove chart")
+            remove.clicked.connect(self.remove_requested.emit)
+            header = QHBoxLayout()
+            header.addStretch()
+            header.addWidget(add)
+            header.addWidget(remove)
+            layout.addLayout(header)
         layout.addWidget(graph)
         self.setLayout(layout)
@@ -1,4 +1,5 @@
-from typing import List, Literal
+from collections import Counter
+from typing import List, Literal, Optional, Union
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QIcon
 from PySide6.QtWidgets import (
@@ -7,27 +8,51 @@ from PySide6.QtWidgets import (
     QSpacerItem,
     QSizePolicy,
     QPushButton,
+    QComboBox,
+    QInputDialog,
 )
 
 from CyberGearDriver import CyberGearMotor
+from CyberGearDriver.parameters import parameter_names
 from CyberGearDashboard.watcher import MotorWatcher
+from CyberGearDashboard.freshness import STATE_NAMES, ValueTracker
+from CyberGearDashboard.samples import SampleStore
 
 from .chart import Chart
+from .xy_chart import XYChart
 
+# The charts shown by default
 CHART_STATE = ["position", "velocity", "torque"]
 
+# Everything that can be charted: state values, then parameters
+CHART_CHOICES = list(STATE_NAMES) + sorted(parameter_names, key=str.lower)
+
 
 class ChartLayout(QVBoxLayout):
     motor: CyberGearMotor
     watcher: MotorWatcher
+    tracker: Optional[ValueTracker]
+    store: SampleStore
     data_list: List[str]
-    charts: List[Chart]
+    charts: List[Union[Chart, XYChart]]
+    watched: Counter
     state: Literal["running", "paused"]
 
-    def __init__(self, motor: CyberGearMotor, watcher: MotorWatcher, *args, **kwargs):
+    def __init__(
+        self,
+        motor: CyberGearMotor,
+        watcher: MotorWatcher,
+        store: SampleStore,
+        tracker: Optional[ValueTracker] = None,
+        *args,
+        **kwargs,
+    ):
         super().__init__(*args, **kwargs)
         self.motor = motor
         self.watcher = watcher
+        self.store = store
+        self.tracker = tracker
+        self.watched = Counter()
         self.state = "running"
         self.build_layout()
 
@@ -48,9 +73,79 @@ class ChartLayout(QVBoxLayout):
 
     def clear_charts(self):
         """Clear all chart data"""
+        self.store.clear()
         for chart in self.charts:
             chart.clear()
 
+    def watch(self, name: str):
+        """Poll a parameter while at least one chart plots it"""
+        if name in STATE_NAMES:
+            return
+        self.watched[name] += 1
+        if self.watched[name] == 1:
+            self.watcher.watch_param(name, self.motor.motor_id)
+
+    def unwatch(self, name: str):
+        if name in STATE_NAMES or not self.watched[name]:
+            return
+        self.watched[name] -= 1
+        if not self.watched[name]:
+            self.watcher.unwatch_param(name, self.motor.motor_id)
+
+    def add_chart(self, name: str) -> Chart:
+        """
+        Chart a state value or parameter. Parameters are polled by the watcher only
+        while they're charted.
+        """
+        for chart in self.charts:
+            if isinstance(chart, Chart) and chart.series_names == [name]:
+                return chart
+
+        chart = Chart(self.motor, name, self.tracker, removable=True, store=self.store)
+        self.watch(name)
+        chart.series_added.connect(self.watch)
+        self.insert_chart(chart)
+        return chart
+
+    def add_xy_chart(self, x_name: str, y_name: str) -> XYChart:
+        """Plot one value against another"""
+        chart = XYChart(self.store, x_name, y_name)
+        for name in chart.series_names:
+            self.watch(name)
+        self.insert_chart(chart)
+        return chart
+
+    def choose_xy_chart(self):
+        """Plot the selected value against one picked from a list"""
+        y_name = self.chart_choice.currentText()
+        x_name, ok = QInputDialog.getItem(
+            self.parentWidget(),
+            "XY plot",
+            f"Plot {y_name} against:",
+            CHART_CHOICES,
+            editable=False,
+        )
+        if ok:
+            self.add_xy_chart(x_name, y_name)
+
+    def insert_chart(self, chart: Union[Chart, XYChart]):
+        chart.remove_requested.connect(lambda: self.remove_chart(chart))
+        if self.state == "paused":
+            chart.pause()
+        self.charts.append(chart)
+        self.chart_list.addWidget(chart)
+
+    def remove_chart(self, chart: Union[Chart, XYChart]):
+        """Remove a chart, and stop polling its parameters"""
+        if chart not in self.charts:
+            return
+        chart.pause()
+        for name in chart.series_names:
+            self.unwatch(name)
+        self.charts.remove(chart)
+        self.chart_list.removeWidget(chart)
+        chart.deleteLater()
+
     def build_layout(self):
         # Toolbar
         self.toggle = QPushButton()
@@ -63,6 +158,18 @@ class ChartLayout(QVBoxLayout):
         clear.setIcon(QIcon.fromTheme(QIcon.ThemeIcon.EditClear))
         clear.clicked.connect(self.clear_charts)
 
+        self.chart_choice = QComboBox()
+        self.chart_choice.addItems(CHART_CHOICES)
+        add = QPushButton()
+        add.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
+        add.setIcon(QIcon.fromTheme(QIcon.ThemeIcon.ListAdd))
+        add.setToolTip("Add a chart")
+        add.clicked.connect(lambda: self.add_chart(self.chart_choice.currentText()))
+        xy = QPushButton("XY")
+        xy.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
+        xy.setToolTip("Plot the selected value against another")
+        xy.clicked.connect(self.choose_xy_chart)
+
         hspacer = QSpacerItem(
             20, 40, QSizePolicy.Policy.Minimum, QSizePolicy.Policy.Expanding
         )
@@ -71,15 +178,18 @@ class ChartLayout(QVBoxLayout):
         toolbar.setAlignment(Qt.AlignmentFlag.AlignCenter)
         toolbar.addWidget(self.toggle)
         toolbar.addItem(hspacer)
+        toolbar.addWidget(self.chart_choice)
+        toolbar.addWidget(add)
+        toolbar.addWidget(xy)
         toolbar.addWidget(clear)
         self.addLayout(toolbar)
 
         # Charts
         self.charts = []
+        self.chart_list = QVBoxLayout()
+        self.addLayout(self.chart_list)
         for data in CHART_STATE:
-            chart = Chart(self.motor, data)
-            self.charts.append(chart)
-            self.addWidget(chart)
+            self.add_chart(data)
 
         vspacer = QSpacerItem(
             20, 40, QSizePolicy.Policy.Minimum, QSizePolicy.Policy.Expanding
@@ -0,0 +1,114 @@
+import traceback
+from typing import Callable, List, Tuple
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+import numpy as np
+
+# The most points handed to a curve. Longer histories are decimated to the min and max
+# of each bucket, which keeps the peaks visible.
+MAX_PLOT_POINTS = 2000
+
+# Render-ready (name, x, y) arrays, one set per series
+PreparedSeries = List[Tuple[str, np.ndarray, np.ndarray]]
+
+
+class DoubleBuffer:
+    """
+    Two sets of (x, y) output arrays. The worker fills one while the curve shows the
+    other, so the arrays can be handed to the curve as is.
+    """
+
+    def __init__(self, size: int = MAX_PLOT_POINTS):
+        self.buffers = (
+            (np.empty(size), np.empty(size)),
+            (np.empty(size), np.empty(size)),
+        )
+
+    def get(self, index: int) -> Tuple[np.ndarray, np.ndarray]:
+        return self.buffers[index]
+
+
+def decimate_into(
+    x: np.ndarray, y: np.ndarray, out_x: np.ndarray, out_y: np.ndarray
+) -> int:
+    """
+    Copy the samples into the output arrays, decimated to the min and max of each
+    bucket (in time order) if there are more than fit. Returns the number of points.
+    """
+    count = len(y)
+    size = len(out_y)
+    if count <= size:
+        out_x[:count] = x
+        out_y[:count] = y
+        return count
+
+    # Drop the oldest samples that don't fill a whole bucket
+    buckets = size // 2
+    per_bucket = count // buckets
+    start = count - buckets * per_bucket
+    y = y[start:].reshape(buckets, per_bucket)
+    x = x[start:].reshape(buckets, per_bucket)
+    rows = np.arange(buckets)
+    low = y.argmin(axis=1)
+    high = y.argmax(axis=1)
+    first = np.minimum(low, high)
+    second = np.maximum(low, high)
+    out_x[0 : buckets * 2 : 2] = x[rows, first]
+    out_x[1 : buckets * 2 : 2] = x[rows, second]
+    out_y[0 : buckets * 2 : 2] = y[rows, first]
+    out_y[1 : buckets * 2 : 2] = y[rows, second]
+    return buckets * 2
+
+
+class DataPreparer(QObject):
+    """
+    Runs a chart's data preparation on the global thread pool, one job at a time.
+
+    The job gets the index of the back buffer to fill, and returns views of it. The
+    result (or None, if the job failed) arrives on the UI thread with `ready`. The chart
+    then calls `done()`, which swaps the buffers if it showed the result, and allows
+    the next job. Until then, new requests are dropped, so a slow frame skips updates
+    instead of queuing them.
+    """
+
+    back: int
+    busy: bool
+
+    ready = Signal(object)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.back = 0
+        self.busy = False
+
+    def request(self, job: Callable[[int], PreparedSeries]) -> bool:
+        """Start preparing the next frame (returns False if one is still pending)"""
+        if self.busy:
+            return False
+        self.busy = True
+        back = self.back
+        ready = self.ready
+
+        def run():
+            try:
+                result = job(back)
+            except Exception:
+                traceback.print_exc()
+                result = None
+            try:
+                ready.emit(result)
+            except RuntimeError:
+                # The chart was removed in the meantime
+                pass
+
+        QThreadPool.globalInstance().start(QRunnable.create(run))
+        return True
+
+    def done(self, shown: bool):
+        """
+        Allow the next job. If the result was shown, the buffers are swapped, otherwise
+        the next job fills the same back buffer again.
+        """
+        if shown:
+            self.back ^= 1
+        self.busy = False
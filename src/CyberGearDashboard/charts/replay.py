@@ -0,0 +1,132 @@
+from typing import List
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtWidgets import (
+    QVBoxLayout,
+    QHBoxLayout,
+    QLabel,
+    QComboBox,
+    QDoubleSpinBox,
+    QScrollBar,
+)
+
+from CyberGearDashboard.analysis.session import SessionFile
+
+from .chart import Chart
+from .layout import CHART_STATE
+
+# Selectable window lengths, in seconds
+WINDOW_SPANS = (
+    ("1 s", 1.0),
+    ("10 s", 10.0),
+    ("1 min", 60.0),
+    ("10 min", 600.0),
+    ("1 h", 3600.0),
+)
+DEFAULT_SPAN = 10.0
+
+# Wait for panning/zooming to settle before paging in the new window
+RELOAD_DELAY_MS = 30
+
+# Scroll bar positions per second
+SCROLL_STEPS = 10
+
+
+class ReplayChartLayout(QVBoxLayout):
+    """
+    Charts for one motor from a recorded session. Only the time window being viewed is
+    read from the session (and decoded), every time the view is panned, zoomed or jumped.
+    """
+
+    session: SessionFile
+    motor_id: int
+    charts: List[Chart]
+    span: float
+
+    def __init__(self, session: SessionFile, motor_id: int, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.session = session
+        self.motor_id = motor_id
+        self.span = min(DEFAULT_SPAN, max(session.duration, 1.0))
+
+        self.reload_timer = QTimer()
+        self.reload_timer.setSingleShot(True)
+        self.reload_timer.timeout.connect(self.load_view)
+
+        self.build_layout()
+        self.go_to(0)
+
+    def go_to(self, offset: float):
+        """Jump to a time, in seconds from the start of the session"""
+        self.charts[0].graph.setXRange(offset, offset + self.span, padding=0)
+
+    def set_span(self, index: int):
+        """Change the length of the window being viewed"""
+        self.span = self.span_input.itemData(index)
+        self.go_to(self.position_input.value())
+
+    def on_range_changed(self):
+        self.reload_timer.start(RELOAD_DELAY_MS)
+
+    def load_view(self):
+        """Page in and show the data for the current view"""
+        start, end = self.charts[0].graph.viewRange()[0]
+        t0 = self.session.start_time
+        samples = self.session.feedback(self.motor_id, t0 + start, t0 + end)
+        x = samples["timestamp"] - t0
+        for chart in self.charts:
+            chart.show_window(x, samples[chart.data_name])
+
+        # Keep the controls in sync, without jumping back
+        self.span = end - start
+        for input, value in (
+            (self.position_input, start),
+            (self.scroll, int(start * SCROLL_STEPS)),
+        ):
+            input.blockSignals(True)
+            input.setValue(value)
+            input.blockSignals(False)
+
+    def build_layout(self):
+        duration = self.session.duration
+
+        # Toolbar
+        self.position_input = QDoubleSpinBox()
+        self.position_input.setRange(0, duration)
+        self.position_input.setDecimals(3)
+        self.position_input.setSuffix(" s")
+        self.position_input.editingFinished.connect(
+            lambda: self.go_to(self.position_input.value())
+        )
+
+        self.span_input = QComboBox()
+        for label, span in WINDOW_SPANS:
+            self.span_input.addItem(label, span)
+        self.span_input.setCurrentIndex(
+            [span for _, span in WINDOW_SPANS].index(DEFAULT_SPAN)
+        )
+        self.span_input.currentIndexChanged.connect(self.set_span)
+
+        toolbar = QHBoxLayout()
+        toolbar.addWidget(QLabel("Go to:"))
+        toolbar.addWidget(self.position_input)
+        toolbar.addWidget(QLabel("Window:"))
+        toolbar.addWidget(self.span_input)
+        toolbar.addStretch()
+        toolbar.addWidget(QLabel(f"{len(self.session):,} frames, {duration:.1f} s"))
+        self.addLayout(toolbar)
+
+        # Charts, all following the time axis of the first
+        self.charts = []
+        for data in CHART_STATE:
+            chart = Chart(None, data)
+            chart.graph.enableAutoRange(x=False, y=True)
+            if self.charts:
+                chart.graph.setXLink(self.charts[0].graph)
+            self.charts.append(chart)
+            self.addWidget(chart)
+        self.charts[0].graph.sigXRangeChanged.connect(self.on_range_changed)
+
+        self.scroll = QScrollBar(Qt.Orientation.Horizontal)
+        self.scroll.setRange(0, int(duration * SCROLL_STEPS))
+        self.scroll.valueChanged.connect(lambda value: self.go_to(value / SCROLL_STEPS))
+        self.addWidget(self.scroll)
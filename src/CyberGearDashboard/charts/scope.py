@@ -0,0 +1,198 @@
+from typing import Dict, Optional
+from PySide6.QtCore import Qt, QTimer, Signal
+from PySide6.QtWidgets import (
+    QWidget,
+    QDockWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QFormLayout,
+    QLabel,
+    QComboBox,
+    QDoubleSpinBox,
+    QPushButton,
+    QFileDialog,
+)
+
+import pyqtgraph as pg
+
+from CyberGearDriver import CyberGearMotor
+
+from CyberGearDashboard.connection import BusConnection
+from CyberGearDashboard.trigger import (
+    TRIGGER_SOURCES,
+    TRIGGER_EDGES,
+    DEFAULT_PRE_TRIGGER,
+    DEFAULT_POST_TRIGGER,
+    Trigger,
+    TriggeredCapture,
+    TriggerState,
+    write_csv,
+)
+
+# The feedback values to plot
+SCOPE_VALUES = ("position", "velocity", "torque")
+
+# How often to refresh the trigger state (in milliseconds)
+REFRESH_RATE_MS = 200
+
+
+class ScopeDock(QDockWidget):
+    """Oscilloscope style triggered capture of a motor's feedback"""
+
+    motor: CyberGearMotor
+    connection: BusConnection
+    capture: Optional[TriggeredCapture]
+    plots: Dict[str, pg.PlotDataItem]
+    timer: QTimer
+
+    captured = Signal()
+
+    def __init__(
+        self, motor: CyberGearMotor, connection: BusConnection, *args, **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+        self.motor = motor
+        self.connection = connection
+        self.capture = None
+
+        # The capture freezes on the receive thread
+        self.captured.connect(self.show_capture)
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.update_state)
+        self.build_layout()
+
+    def arm(self):
+        """Wait for the trigger"""
+        self.disarm()
+        self.capture = TriggeredCapture(
+            self.motor,
+            Trigger(
+                self.source_input.currentText(),
+                self.level_input.value(),
+                self.edge_input.currentText(),
+            ),
+            pre_trigger=self.pre_input.value() / 1000,
+            post_trigger=self.post_input.value() / 1000,
+            on_frozen=self.captured.emit,
+        )
+        self.connection.add_receiver(self.capture.message_received)
+        self.capture.arm()
+        self.timer.start(REFRESH_RATE_MS)
+        self.update_state()
+
+    def disarm(self):
+        if self.capture is None:
+            return
+        self.capture.disarm()
+        self.connection.remove_receiver(self.capture.message_received)
+        self.timer.stop()
+        self.update_state()
+
+    def force(self):
+        if self.capture is not None:
+            self.capture.force()
+
+    def show_capture(self):
+        """Show the frozen capture, with the time relative to the trigger"""
+        self.disarm()
+        samples = self.capture.frozen
+        t = (samples["timestamp"] - self.capture.trigger_time) * 1000
+        for name, plot in self.plots.items():
+            plot.setData(t, samples[name])
+
+    def export(self):
+        if self.capture is None or self.capture.frozen is None:
+            return
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export capture", "capture.csv", "CSV (*.csv)"
+        )
+        if path:
+            write_csv(path, self.capture.frozen, self.capture.trigger_time)
+
+    def update_state(self):
+        state = TriggerState.IDLE if self.capture is None else self.capture.state
+        text = state.value
+        if state == TriggerState.FROZEN:
+            text = f"{text} {len(self.capture.frozen)} samples"
+        self.state_label.setText(text)
+        self.force_button.setEnabled(state == TriggerState.ARMED)
+        self.export_button.setEnabled(state == TriggerState.FROZEN)
+
+    def update_level_input(self, source: str):
+        self.level_input.setEnabled(source != "faults")
+        self.edge_input.setEnabled(source != "faults")
+
+    def closeEvent(self, event):
+        self.disarm()
+        super().closeEvent(event)
+
+    def build_layout(self):
+        self.setWindowTitle("Trigger capture")
+
+        self.source_input = QComboBox()
+        self.source_input.addItems(TRIGGER_SOURCES)
+        self.source_input.currentTextChanged.connect(self.update_level_input)
+        self.edge_input = QComboBox()
+        self.edge_input.addItems(TRIGGER_EDGES)
+        self.level_input = QDoubleSpinBox()
+        self.level_input.setDecimals(3)
+        self.level_input.setRange(-1000, 1000)
+
+        def milliseconds(value: float) -> QDoubleSpinBox:
+            field = QDoubleSpinBox()
+            field.setDecimals(0)
+            field.setRange(0, 10000)
+            field.setValue(value * 1000)
+            field.setSuffix(" ms")
+            return field
+
+        self.pre_input = milliseconds(DEFAULT_PRE_TRIGGER)
+        self.post_input = milliseconds(DEFAULT_POST_TRIGGER)
+
+        form = QFormLayout()
+        form.addRow("Trigger on", self.source_input)
+        form.addRow("Edge", self.edge_input)
+        form.addRow("Level", self.level_input)
+        form.addRow("Before trigger", self.pre_input)
+        form.addRow("After trigger", self.post_input)
+
+        arm_button = QPushButton("Arm")
+        arm_button.clicked.connect(self.arm)
+        self.force_button = QPushButton("Force")
+        self.force_button.clicked.connect(self.force)
+        stop_button = QPushButton("Stop")
+        stop_button.clicked.connect(self.disarm)
+        self.export_button = QPushButton("Export...")
+        self.export_button.clicked.connect(self.export)
+        self.state_label = QLabel()
+        buttons = QHBoxLayout()
+        buttons.addWidget(arm_button)
+        buttons.addWidget(self.force_button)
+        buttons.addWidget(stop_button)
+        buttons.addWidget(self.state_label)
+        buttons.addStretch()
+        buttons.addWidget(self.export_button)
+
+        graphs = pg.GraphicsLayoutWidget()
+        self.plots = {}
+        first = None
+        for row, name in enumerate(SCOPE_VALUES):
+            graph = graphs.addPlot(row=row, col=0)
+            graph.setLabel("left", name)
+            graph.showGrid(x=True, y=True, alpha=0.3)
+            graph.addLine(x=0, pen=pg.mkPen("r", style=Qt.PenStyle.DashLine))
+            if first is None:
+                first = graph
+            else:
+                graph.setXLink(first)
+            self.plots[name] = graph.plot(pen=pg.mkPen("y"))
+        graph.setLabel("bottom", "Time from trigger (ms)")
+
+        root = QWidget()
+        layout = QVBoxLayout()
+        layout.addLayout(form)
+        layout.addLayout(buttons)
+        layout.addWidget(graphs, 1)
+        root.setLayout(layout)
+        self.setWidget(root)
+        self.update_state()
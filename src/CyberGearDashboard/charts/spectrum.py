@@ -0,0 +1,169 @@
+import threading
+from typing import Optional
+from PySide6.QtCore import Signal
+from PySide6.QtWidgets import (
+    QWidget,
+    QDockWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QFormLayout,
+    QLabel,
+    QComboBox,
+    QSpinBox,
+    QPushButton,
+)
+
+import numpy as np
+import pyqtgraph as pg
+
+from CyberGearDriver import CyberGearMotor
+
+from CyberGearDashboard.analysis.spectrum import WINDOWS
+from CyberGearDashboard.samples import SampleStore
+from CyberGearDashboard.spectrum import (
+    SPECTRUM_SOURCES,
+    FFT_SIZES,
+    DEFAULT_FFT_SIZE,
+    DEFAULT_OVERLAP,
+    DEFAULT_POLL_RATE,
+    SpectrumAnalyzer,
+    poll_value,
+)
+
+
+class SpectrumDock(QDockWidget):
+    """Live spectrum (FFT) of a motor value, computed off the UI thread"""
+
+    motor: CyberGearMotor
+    store: SampleStore
+    analyzer: Optional[SpectrumAnalyzer]
+    poll_stop: Optional[threading.Event]
+    plot: pg.PlotDataItem
+
+    spectrum_ready = Signal(object, object)
+
+    def __init__(self, motor: CyberGearMotor, store: SampleStore, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.motor = motor
+        self.store = store
+        self.analyzer = None
+        self.poll_stop = None
+
+        # The spectra are computed on the analyzer's thread
+        self.spectrum_ready.connect(self.show_spectrum)
+        self.build_layout()
+
+    @property
+    def is_running(self) -> bool:
+        return self.analyzer is not None
+
+    def start(self):
+        self.stop()
+        name = self.source_input.currentText()
+        self.analyzer = SpectrumAnalyzer(
+            self.store,
+            name,
+            size=self.size_input.currentData(),
+            overlap=self.overlap_input.value() / 100,
+            window=self.window_input.currentText(),
+            on_spectrum=self.spectrum_ready.emit,
+        )
+        self.analyzer.start()
+
+        poll_rate = self.poll_input.value()
+        if poll_rate:
+            self.poll_stop = threading.Event()
+            threading.Thread(
+                target=poll_value,
+                args=(self.motor, name, poll_rate, self.poll_stop),
+                daemon=True,
+            ).start()
+        self.plot.setData([], [])
+        self.graph.setTitle(name)
+        self.status.setText("Waiting for samples...")
+        self.update_buttons()
+
+    def stop(self):
+        if self.poll_stop is not None:
+            self.poll_stop.set()
+            self.poll_stop = None
+        if self.analyzer is not None:
+            self.analyzer.on_spectrum = None
+            self.analyzer.stop()
+            self.analyzer = None
+        self.update_buttons()
+
+    def show_spectrum(self, frequencies: np.ndarray, magnitude: np.ndarray):
+        analyzer = self.analyzer
+        if analyzer is None:
+            return
+        self.plot.setData(frequencies, magnitude)
+
+        # The strongest component, other than DC
+        peak = int(np.argmax(magnitude[1:])) + 1 if len(magnitude) > 1 else 0
+        self.status.setText(
+            f"{analyzer.rate:.0f} Hz sample rate, "
+            f"{analyzer.rate / analyzer.size:.2f} Hz resolution, "
+            f"{analyzer.count} windows. "
+            f"Peak: {frequencies[peak]:.1f} Hz ({magnitude[peak]:.1f} dB)"
+        )
+
+    def update_buttons(self):
+        self.start_button.setEnabled(not self.is_running)
+        self.stop_button.setEnabled(self.is_running)
+
+    def build_layout(self):
+        self.setWindowTitle("Spectrum")
+
+        self.source_input = QComboBox()
+        self.source_input.addItems(SPECTRUM_SOURCES)
+        self.size_input = QComboBox()
+        for size in FFT_SIZES:
+            self.size_input.addItem(str(size), size)
+        self.size_input.setCurrentIndex(FFT_SIZES.index(DEFAULT_FFT_SIZE))
+        self.window_input = QComboBox()
+        self.window_input.addItems(WINDOWS.keys())
+        self.overlap_input = QSpinBox()
+        self.overlap_input.setRange(0, 95)
+        self.overlap_input.setSuffix(" %")
+        self.overlap_input.setValue(round(DEFAULT_OVERLAP * 100))
+        self.poll_input = QSpinBox()
+        self.poll_input.setRange(0, 2000)
+        self.poll_input.setSuffix(" Hz")
+        self.poll_input.setSpecialValueText("Off")
+        self.poll_input.setValue(DEFAULT_POLL_RATE)
+        self.poll_input.setToolTip(
+            "Request the value at this rate while the spectrum runs"
+        )
+
+        form = QFormLayout()
+        form.addRow("Value", self.source_input)
+        form.addRow("FFT size", self.size_input)
+        form.addRow("Window", self.window_input)
+        form.addRow("Overlap", self.overlap_input)
+        form.addRow("Poll at", self.poll_input)
+
+        self.start_button = QPushButton("Start")
+        self.start_button.clicked.connect(self.start)
+        self.stop_button = QPushButton("Stop")
+        self.stop_button.clicked.connect(self.stop)
+        buttons = QHBoxLayout()
+        buttons.addWidget(self.start_button)
+        buttons.addWidget(self.stop_button)
+
+        self.graph = pg.PlotWidget()
+        self.graph.setLabel("bottom", "Frequency", units="Hz")
+        self.graph.setLabel("left", "Magnitude (dB)")
+        self.graph.showGrid(x=True, y=True)
+        self.plot = self.graph.plot()
+        self.status = QLabel()
+
+        root = QWidget()
+        layout = QVBoxLayout()
+        layout.addLayout(form)
+        layout.addLayout(buttons)
+        layout.addWidget(self.graph, 1)
+        layout.addWidget(self.status)
+        root.setLayout(layout)
+        self.setWidget(root)
+        self.update_buttons()
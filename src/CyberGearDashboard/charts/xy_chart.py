@@ -0,0 +1,126 @@
+import time
+from typing import List, Optional
+from PySide6.QtCore import QTimer, Signal
+from PySide6.QtGui import QIcon
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout
+
+import numpy as np
+import pyqtgraph as pg
+
+from CyberGearDashboard.samples import SampleStore
+
+from .chart import UPDATE_RATE_MS, CHART_SPAN, ValueName, header_button
+from .prepare import DataPreparer, DoubleBuffer, PreparedSeries
+
+
+class XYChart(QWidget):
+    """
+    A phase plot of one value against another (i.e. torque vs velocity), over the last
+    CHART_SPAN seconds of the shared sample store.
+    Values from the same feedback frame pair up exactly, anything else is interpolated
+    to the Y value's sample times, on the thread pool.
+    """
+
+    store: SampleStore
+    x_name: ValueName
+    y_name: ValueName
+    graph: pg.PlotWidget
+    plot: pg.PlotDataItem
+    buffer: DoubleBuffer
+    preparer: DataPreparer
+
+    remove_requested = Signal()
+
+    def __init__(
+        self,
+        store: SampleStore,
+        x_name: ValueName,
+        y_name: ValueName,
+        *args,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.store = store
+        self.x_name = x_name
+        self.y_name = y_name
+        # Every pair is plotted, so the buffers fit the whole store
+        self.buffer = DoubleBuffer(store.capacity)
+        self.preparer = DataPreparer(self)
+        self.preparer.ready.connect(self.show_prepared)
+        self.build_layout()
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.update_data)
+        self.start()
+
+    @property
+    def series_names(self) -> List[ValueName]:
+        return [self.x_name, self.y_name]
+
+    def start(self):
+        self.timer.start(UPDATE_RATE_MS)
+
+    def pause(self):
+        self.timer.stop()
+
+    def clear(self):
+        self.plot.setData([], [])
+
+    def update_data(self):
+        store = self.store
+        x_name, y_name = self.x_name, self.y_name
+        buffer = self.buffer
+        start = time.monotonic() - CHART_SPAN
+
+        def prepare(back: int) -> PreparedSeries:
+            y_times, y = store.channel(y_name).since(start)
+            x_times, x = store.channel(x_name).since(start)
+            if not len(x) or not len(y):
+                return []
+            count = len(y)
+            out_x, out_y = buffer.get(back)
+            if (
+                len(x) != count
+                or x_times[0] != y_times[0]
+                or x_times[-1] != y_times[-1]
+            ):
+                out_x[:count] = np.interp(y_times, x_times, x)
+            else:
+                out_x[:count] = x
+            out_y[:count] = y
+            return [(y_name, out_x[:count], out_y[:count])]
+
+        self.preparer.request(prepare)
+
+    def show_prepared(self, prepared: Optional[PreparedSeries]):
+        shown = bool(prepared) and self.timer.isActive()
+        if shown:
+            _, x, y = prepared[0]
+            self.plot.setData(x, y)
+        self.preparer.done(shown)
+
+    def build_layout(self):
+        graph = pg.PlotWidget()
+        graph.setTitle(f"{self.y_name} vs {self.x_name}")
+        graph.setLabel("bottom", self.x_name)
+        graph.setLabel("left", self.y_name)
+        graph.showGrid(x=True, y=True)
+        self.graph = graph
+        self.plot = graph.plot(
+            pen=pg.mkPen(width=1),
+            symbol="o",
+            symbolSize=3,
+            symbolPen=None,
+            symbolBrush=pg.intColor(0, hues=8),
+        )
+
+        remove = header_button(QIcon.ThemeIcon.WindowClose, "Remove chart")
+        remove.clicked.connect(self.remove_requested.emit)
+        header = QHBoxLayout()
+        header.addStretch()
+        header.addWidget(remove)
+
+        layout = QVBoxLayout()
+        layout.addLayout(header)
+        layout.addWidget(graph)
+        self.setLayout(layout)
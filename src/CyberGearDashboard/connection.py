@@ -0,0 +1,317 @@
+import time
+import threading
+import traceback
+from enum import Enum
+from typing import Callable, List, Optional
+
+import can
+from PySide6.QtCore import QObject, Signal
+
+from CyberGearDriver import CyberMotorMessage
+
+from CyberGearDashboard.constants import DEFAULT_CAN_BITRATE
+from CyberGearDashboard.protocol import MODE_SHIFT, MODE_MASK, SAFE_COMMANDS
+
+# Reconnect backoff (in seconds), doubled after every failed attempt
+RECONNECT_DELAY_MIN = 0.5
+RECONNECT_DELAY_MAX = 10.0
+
+# How long the notifier waits on each receive call (in seconds)
+RECEIVE_TIMEOUT = 0.5
+
+
+class ConnectionState(Enum):
+    DISCONNECTED = "Disconnected"
+    CONNECTING = "Connecting"
+    CONNECTED = "Connected"
+    LOST = "Connection lost"
+    RECONNECTING = "Reconnecting"
+
+
+def call_receivers(callbacks: List[Callable[..., None]], *args):
+    """
+    Call every callback with the message (or whatever was received). A callback that
+    fails is reported, and doesn't keep the message from the others.
+    """
+    for callback in callbacks:
+        try:
+            callback(*args)
+        except Exception:
+            traceback.print_exc()
+
+
+class BusListener(can.Listener):
+    """Forwards received CAN messages to the connection and reports receive errors"""
+
+    def __init__(self, connection: "BusConnection"):
+        self.connection = connection
+
+    def on_message_received(self, msg: can.Message):
+        call_receivers(self.connection.receivers, msg)
+        call_receivers(self.connection.update_receivers, msg)
+
+    def on_error(self, exc: Exception):
+        # The receivers don't raise, so this is the bus itself failing
+        self.connection.connection_lost(exc)
+
+
+class BusConnection(QObject):
+    """
+    Opens the CAN bus in a background thread and keeps it open.
+
+    The connection moves through the states: connecting -> connected -> lost -> reconnecting,
+    backing off a little more after each failed attempt, until `close()` is called.
+    """
+
+    interface: str
+    channel: str
+    bitrate: int
+    bus: Optional[can.BusABC]
+    state: ConnectionState
+    error: Optional[str]
+    receivers: List[Callable[[can.Message], None]]
+    update_receivers: List[Callable[[can.Message], None]]
+    transmit_listeners: List[Callable[[can.Message], None]]
+    on_connect: List[Callable[[], None]]
+    tx_errors: int
+    halted: bool
+    tx_blocked: int
+
+    state_changed = Signal(ConnectionState)
+
+    def __init__(
+        self,
+        channel: str,
+        interface: str,
+        bitrate: int = DEFAULT_CAN_BITRATE,
+        *args,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.channel = channel
+        self.interface = interface
+        self.bitrate = bitrate
+        self.bus = None
+        self.error = None
+        self.state = ConnectionState.DISCONNECTED
+        self.receivers = []
+        self.update_receivers = []
+        self.transmit_listeners = []
+        self.on_connect = []
+        self.tx_errors = 0
+        self.halted = False
+        self.tx_blocked = 0
+        # Held from the halt check until the frame is sent, so nothing that was let
+        # through before `halt()` can go out after it
+        self.send_lock = threading.Lock()
+
+        self._lost = threading.Event()
+        self._closing = threading.Event()
+        self._thread = threading.Thread(target=self.run, daemon=True)
+
+    @property
+    def is_connected(self) -> bool:
+        return self.state == ConnectionState.CONNECTED
+
+    def add_receiver(self, callback: Callable[[can.Message], None]):
+        """Add a callback that is called with every message received on the bus"""
+        # Copy on write, so the receive thread never iterates over a changing list
+        self.receivers = self.receivers + [callback]
+
+    def remove_receiver(self, callback: Callable[[can.Message], None]):
+        """Remove a receive callback"""
+        self.receivers = [cb for cb in self.receivers if cb != callback]
+
+    def add_update_receiver(self, callback: Callable[[can.Message], None]):
+        """
+        Add a callback for the messages that can change a motor's state. Here, that's
+        every message, but when the bus runs in another process, the state feedback in
+        between that only updates the values is left out (see `ProcessBusConnection`).
+        """
+        self.update_receivers = self.update_receivers + [callback]
+
+    def remove_update_receiver(self, callback: Callable[[can.Message], None]):
+        """Remove an update callback"""
+        self.update_receivers = [cb for cb in self.update_receivers if cb != callback]
+
+    def add_transmit_listener(self, callback: Callable[[can.Message], None]):
+        """Add a callback that is called with every message that was sent"""
+        self.transmit_listeners = self.transmit_listeners + [callback]
+
+    def remove_transmit_listener(self, callback: Callable[[can.Message], None]):
+        """Remove a transmit callback"""
+        self.transmit_listeners = [
+            cb for cb in self.transmit_listeners if cb != callback
+        ]
+
+    def add_connect_handler(self, callback: Callable[[], None]):
+        """Add a callback that is run (from the connection thread) every time the bus connects"""
+        self.on_connect.append(callback)
+
+    def open(self):
+        """Start connecting in the background"""
+        self._thread.start()
+
+    def close(self):
+        """Close the bus and stop reconnecting"""
+        self._closing.set()
+        self._lost.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=RECONNECT_DELAY_MAX)
+
+    def send(self, msg: can.Message):
+        """Send a message on the bus. Messages are dropped while the bus is not connected."""
+        bus = self.bus
+        if bus is None or not self.is_connected:
+            return
+        if not self.transmit(bus, msg):
+            return
+        for callback in self.transmit_listeners:
+            callback(msg)
+
+    def send_burst(self, messages: List[can.Message]) -> List[float]:
+        """
+        Send several messages back to back, as tightly packed as the adapter allows.
+        Returns the time each message was handed to the adapter (`time.perf_counter`),
+        for the messages that were sent.
+        """
+        bus = self.bus
+        if bus is None or not self.is_connected:
+            return []
+        sent_times = []
+        for msg in messages:
+            if not self.transmit(bus, msg):
+                break
+            sent_times.append(time.perf_counter())
+
+        # Listeners run after the burst, so they don't add delay between messages
+        for msg in messages[: len(sent_times)]:
+            for callback in self.transmit_listeners:
+                callback(msg)
+        return sent_times
+
+    def halt(self):
+        """
+        Block every message that could move a motor (everything but stops and reads),
+        and drop what's still waiting in the adapter's TX buffer.
+        """
+        with self.send_lock:
+            self.halted = True
+            bus = self.bus
+            if bus is not None:
+                try:
+                    bus.flush_tx_buffer()
+                except Exception:
+                    # Not every interface has a TX buffer that can be flushed
+                    pass
+
+    def resume(self):
+        """Allow all messages again, after `halt()`"""
+        with self.send_lock:
+            self.halted = False
+
+    def is_blocked(self, msg: can.Message) -> bool:
+        """Whether the message is held back by `halt()` (it's counted as blocked)"""
+        if (
+            self.halted
+            and (msg.arbitration_id >> MODE_SHIFT) & MODE_MASK not in SAFE_COMMANDS
+        ):
+            self.tx_blocked += 1
+            return True
+        return False
+
+    def transmit(self, bus: can.BusABC, msg: can.Message) -> bool:
+        """Send on the bus, and handle the errors (returns False if it wasn't sent)"""
+        try:
+            with self.send_lock:
+                if self.is_blocked(msg):
+                    return False
+                bus.send(msg)
+        except can.CanOperationError as e:
+            # A full TX buffer is not fatal, but anything else means the adapter went away
+            self.tx_errors += 1
+            if "buffer" not in str(e).lower():
+                self.connection_lost(e)
+            return False
+        except (can.CanError, OSError) as e:
+            self.tx_errors += 1
+            self.connection_lost(e)
+            return False
+        return True
+
+    def send_motor_message(self, message: CyberMotorMessage):
+        """Send a CyberMotor message on the CAN bus"""
+        self.send(
+            can.Message(
+                arbitration_id=message.arbitration_id,
+                data=message.data,
+                is_extended_id=message.is_extended_id,
+            )
+        )
+
+    def connection_lost(self, error: Exception):
+        """Flag the bus as lost, so the connection thread reconnects"""
+        if self.is_connected:
+            self.error = str(error)
+            self._lost.set()
+
+    def set_state(self, state: ConnectionState):
+        self.state = state
+        self.state_changed.emit(state)
+
+    def run(self):
+        attempt = 0
+        while not self._closing.is_set():
+            self.set_state(
+                ConnectionState.CONNECTING
+                if attempt == 0
+                else ConnectionState.RECONNECTING
+            )
+            notifier = None
+            did_connect = False
+            self._lost.clear()
+            try:
+                self.bus = can.interface.Bus(
+                    interface=self.interface,
+                    channel=self.channel,
+                    bitrate=self.bitrate,
+                )
+                notifier = can.Notifier(
+                    self.bus, [BusListener(self)], timeout=RECEIVE_TIMEOUT
+                )
+                self.error = None
+                self.set_state(ConnectionState.CONNECTED)
+                did_connect = True
+                attempt = 0
+                for callback in self.on_connect:
+                    callback()
+
+                # Hold the connection until it drops or we're closing
+                self._lost.wait()
+            except Exception as e:
+                self.error = str(e)
+            finally:
+                self.shutdown_bus(notifier)
+
+            if self._closing.is_set():
+                break
+            if did_connect:
+                self.set_state(ConnectionState.LOST)
+
+            delay = min(RECONNECT_DELAY_MIN * 2**attempt, RECONNECT_DELAY_MAX)
+            attempt += 1
+            self._closing.wait(delay)
+
+        self.set_state(ConnectionState.DISCONNECTED)
+
+    def shutdown_bus(self, notifier: Optional[can.Notifier]):
+        """Stop receiving and release the bus"""
+        bus = self.bus
+        self.bus = None
+        if notifier is not None:
+            notifier.stop()
+        if bus is not None:
+            try:
+                bus.shutdown()
+            except Exception:
+                pass
@@ -19,6 +19,7 @@ from .operation_control_panel import OperationControlPanel
 from .position_control_panel import PositionControlPanel
 from .velocity_control_panel import VelocityControlPanel
 from .torque_control_panel import TorqueControlPanel
+from .trajectory_control_panel import TrajectoryControlPanel
 
 options = (
     ("Stopped", IdleControlPanel),
@@ -26,6 +27,7 @@ options = (
     ("Position", PositionControlPanel),
     ("Velocity", VelocityControlPanel),
     ("Torque", TorqueControlPanel),
+    ("Trajectory", TrajectoryControlPanel),
 )
 
 
@@ -56,10 +58,21 @@ class MotorControllerDockWidget(QDockWidget):
         # Load it in
         self.screens[index].load()
 
+    def stop_streaming(self):
+        """Stop anything that keeps sending to the motor (live mode, trajectories)"""
+        for screen in self.screens:
+            screen.unload()
+
     def show_screen(self, index: int):
         """Show a particular screen in the stack"""
         self.stack.setCurrentIndex(index)
 
+    def set_connected(self, is_connected: bool):
+        """Disable the controls while the bus is not connected"""
+        if not is_connected:
+            self.enable_checkbox.setChecked(False)
+        self.widget().setEnabled(is_connected)
+
     def enable_motor(self, state: Qt.CheckState):
         is_enabled = True if state == Qt.CheckState.Checked else False
         if is_enabled:
@@ -0,0 +1,90 @@
+from typing import Hashable, Optional
+from PySide6.QtCore import Qt, Signal
+from PySide6.QtWidgets import QWidget, QHBoxLayout, QCheckBox, QSpinBox
+
+from CyberGearDriver import CyberGearMotor, CyberMotorMessage
+
+from CyberGearDashboard.live_sender import (
+    LiveSender,
+    DEFAULT_LIVE_RATE,
+    MIN_LIVE_RATE,
+    MAX_LIVE_RATE,
+)
+
+from .slider_input_widgets import SliderMotorInputWidget
+
+
+class LiveModeWidget(QWidget):
+    """A live mode toggle. While it's on, value changes are streamed to the motor as you drag."""
+
+    motor: CyberGearMotor
+    sender: Optional[LiveSender]
+    checkbox: QCheckBox
+    rate: QSpinBox
+
+    live_changed = Signal(bool)
+
+    def __init__(self, motor: CyberGearMotor, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.motor = motor
+        self.sender = None
+        self.build_layout()
+        self.set_available(False)
+
+    @property
+    def is_live(self) -> bool:
+        return self.sender is not None
+
+    def set_available(self, is_available: bool):
+        """Live mode can only be turned on while the motor is enabled"""
+        if not is_available:
+            self.checkbox.setChecked(False)
+        self.checkbox.setEnabled(is_available)
+
+    def watch(self, slider: SliderMotorInputWidget):
+        """Stream changes to a motor parameter slider while live"""
+        slider.value_changed.connect(
+            lambda _: self.update(slider.param_name, slider.write_message())
+        )
+
+    def update(self, key: Hashable, message: CyberMotorMessage):
+        """Send a value, if live (coalesced with any other unsent value for the same key)"""
+        if self.sender is not None:
+            self.sender.update(key, message)
+
+    def stop(self):
+        self.checkbox.setChecked(False)
+
+    def on_toggle(self, state: Qt.CheckState):
+        is_live = state == Qt.CheckState.Checked
+        if is_live and self.sender is None:
+            self.sender = LiveSender(self.motor.send_message, self.rate.value())
+            self.sender.start()
+        elif not is_live and self.sender is not None:
+            self.sender.stop()
+            self.sender = None
+        self.live_changed.emit(is_live)
+
+    def on_rate_change(self, rate: int):
+        if self.sender is not None:
+            self.sender.max_rate = rate
+
+    def build_layout(self):
+        self.checkbox = QCheckBox("Live")
+        self.checkbox.setToolTip("Send changes while you drag")
+        self.checkbox.checkStateChanged.connect(self.on_toggle)
+
+        self.rate = QSpinBox()
+        self.rate.setRange(MIN_LIVE_RATE, MAX_LIVE_RATE)
+        self.rate.setValue(DEFAULT_LIVE_RATE)
+        self.rate.setPrefix("max ")
+        self.rate.setSuffix(" Hz")
+        self.rate.setToolTip("The most sends per second, for each value")
+        self.rate.valueChanged.connect(self.on_rate_change)
+
+        layout = QHBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.checkbox)
+        layout.addWidget(self.rate)
+        layout.addStretch()
+        self.setLayout(layout)
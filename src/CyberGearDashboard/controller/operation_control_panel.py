@@ -22,8 +22,11 @@ from CyberGearDriver import (
     T_MAX,
 )
 
+from CyberGearDashboard.protocol import control_message
+
 from .abstract_classes import AbstractControlPanel
 from .slider_input_widgets import SliderInputWidget
+from .live_mode import LiveModeWidget
 
 
 class OperationControlPanel(QWidget, metaclass=AbstractControlPanel):
@@ -36,6 +39,7 @@ class OperationControlPanel(QWidget, metaclass=AbstractControlPanel):
     velocity: SliderInputWidget
     kp: SliderInputWidget
     kd: SliderInputWidget
+    live: LiveModeWidget
 
     def __init__(self, motor: CyberGearMotor, parent=QDockWidget, *args, **kwargs):
         super().__init__(parent=parent, *args, **kwargs)
@@ -51,7 +55,7 @@ class OperationControlPanel(QWidget, metaclass=AbstractControlPanel):
 
     def unload(self):
         """The control panel is closing, stop the motor"""
-        pass
+        self.live.stop()
 
     def execute(self):
         """Send the values to the motor"""
@@ -64,9 +68,29 @@ class OperationControlPanel(QWidget, metaclass=AbstractControlPanel):
             self.kd.value,
         )
 
+    def send_live(self):
+        """Stream the values to the motor, while live"""
+        self.live.update(
+            "control",
+            control_message(
+                self.motor,
+                self.position.value,
+                self.velocity.value,
+                self.torque.value,
+                self.kp.value,
+                self.kd.value,
+            ),
+        )
+
+    def on_live_changed(self, is_live: bool):
+        """Put the motor in operation control mode and send the values, when going live"""
+        if is_live:
+            self.execute()
+
     def motor_is_enabled(self, is_enabled: bool):
         """Enable the send button when the motor is enabled"""
         self.send_button.setEnabled(is_enabled)
+        self.live.set_available(is_enabled)
 
     def build_layout(self):
         self.position = SliderInputWidget(
@@ -85,6 +109,11 @@ class OperationControlPanel(QWidget, metaclass=AbstractControlPanel):
             label="Kd", value=0.1, range=(KD_MIN, KD_MAX), decimals=3
         )
 
+        self.live = LiveModeWidget(self.motor)
+        self.live.live_changed.connect(self.on_live_changed)
+        for slider in (self.position, self.torque, self.velocity, self.kp, self.kd):
+            slider.value_changed.connect(self.send_live)
+
         self.send_button = QPushButton("Send")
         self.send_button.setEnabled(False)
         self.send_button.clicked.connect(self.execute)
@@ -99,6 +128,7 @@ class OperationControlPanel(QWidget, metaclass=AbstractControlPanel):
         form_layout.addWidget(self.velocity)
         form_layout.addWidget(self.kp)
         form_layout.addWidget(self.kd)
+        form_layout.addWidget(self.live)
         form_layout.addWidget(self.send_button)
 
         self.form = QWidget()
@@ -1,5 +1,5 @@
 from typing import List, Tuple, Union
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, Signal
 from PySide6.QtWidgets import (
     QWidget,
     QVBoxLayout,
@@ -9,9 +9,11 @@ from PySide6.QtWidgets import (
     QDoubleSpinBox,
 )
 
-from CyberGearDriver import CyberGearMotor
+from CyberGearDriver import CyberGearMotor, CyberMotorMessage
 from CyberGearDriver.parameters import ParameterName, DataType, get_parameter_by_name
 
+from CyberGearDashboard.protocol import parameter_write
+
 RageValue = Tuple[Union[int, float], Union[int, float]]
 
 
@@ -29,6 +31,8 @@ class SliderInputWidget(QWidget):
     input: QDoubleSpinBox
     slider: QSlider
 
+    value_changed = Signal(float)
+
     def __init__(
         self,
         label: str,
@@ -62,6 +66,7 @@ class SliderInputWidget(QWidget):
             if self.type == DataType.FLOAT:
                 slider_value = value * self.float_multiplier
             self.slider.setValue(round(slider_value))
+        self.value_changed.emit(value)
 
     def set_value(self, value: Union[int, float]):
         """Set the value of the input"""
@@ -147,3 +152,7 @@ class SliderMotorInputWidget(SliderInputWidget):
     def send_to_motor(self):
         """Send the value to the motor"""
         self.motor.set_parameter(self.param_name, self.value)
+
+    def write_message(self) -> CyberMotorMessage:
+        """The message that sends the value to the motor"""
+        return parameter_write(self.motor, self.param_name, self.value)
@@ -0,0 +1,170 @@
+import threading
+from typing import Dict, List, Tuple
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import (
+    QDialog,
+    QVBoxLayout,
+    QHBoxLayout,
+    QLabel,
+    QCheckBox,
+    QDoubleSpinBox,
+    QPushButton,
+    QTableWidget,
+    QHeaderView,
+)
+
+from CyberGearDriver import (
+    CyberGearMotor,
+    RunMode,
+    P_MIN,
+    P_MAX,
+    V_MIN,
+    V_MAX,
+    KP_MIN,
+    KP_MAX,
+    KD_MIN,
+    KD_MAX,
+    T_MIN,
+    T_MAX,
+)
+
+from CyberGearDashboard.broadcast import Setpoint, SyncBroadcaster
+from CyberGearDashboard.connection import BusConnection
+
+# Setpoint columns: (title, default, range, decimals), in `Setpoint` order
+SETPOINT_COLUMNS: Tuple[Tuple[str, float, Tuple[float, float], int], ...] = (
+    ("Position (rad)", 0.0, (P_MIN, P_MAX), 2),
+    ("Velocity (rad/s)", 0.0, (V_MIN, V_MAX), 2),
+    ("Torque (Nm)", 0.0, (T_MIN, T_MAX), 2),
+    ("Kp", 1.0, (KP_MIN, KP_MAX), 3),
+    ("Kd", 0.1, (KD_MIN, KD_MAX), 3),
+)
+
+
+class SyncMoveDialog(QDialog):
+    """Send operation control setpoints to several motors at the same time"""
+
+    motors: Dict[int, CyberGearMotor]
+    broadcaster: SyncBroadcaster
+    include: Dict[int, QCheckBox]
+    inputs: Dict[int, List[QDoubleSpinBox]]
+    table: QTableWidget
+    stats: QLabel
+
+    def __init__(
+        self,
+        motors: Dict[int, CyberGearMotor],
+        connection: BusConnection,
+        *args,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.motors = motors
+        self.broadcaster = SyncBroadcaster(connection)
+        self.include = {}
+        self.inputs = {}
+        self.build_layout()
+
+    def selected_motors(self) -> List[CyberGearMotor]:
+        return [
+            self.motors[motor_id]
+            for motor_id, checkbox in self.include.items()
+            if checkbox.isChecked()
+        ]
+
+    def setpoints(self) -> Dict[CyberGearMotor, Setpoint]:
+        return {
+            motor: tuple(field.value() for field in self.inputs[motor.motor_id])
+            for motor in self.selected_motors()
+        }
+
+    def enable_motors(self):
+        """Put the selected motors in operation control mode (in the background, the driver is slow)"""
+
+        def enable(motors: List[CyberGearMotor]):
+            for motor in motors:
+                motor.mode(RunMode.OPERATION_CONTROL)
+                motor.enable()
+
+        threading.Thread(
+            target=enable, args=(self.selected_motors(),), daemon=True
+        ).start()
+
+    def stop_motors(self):
+        for motor in self.selected_motors():
+            motor.stop()
+
+    def send(self):
+        """Send all setpoints in one burst"""
+        setpoints = self.setpoints()
+        if not setpoints:
+            return
+        burst = self.broadcaster.prepare(setpoints)
+        skew = self.broadcaster.send(burst)
+        self.update_stats(measured=skew is not None)
+
+    def update_stats(self, measured: bool = True):
+        broadcaster = self.broadcaster
+        if not broadcaster.count:
+            self.stats.setText("Not sent or not measured (is the bus connected?)")
+            return
+        offsets = ", ".join(
+            f"{motor_id}: +{offset * 1e6:.0f}"
+            for motor_id, offset in broadcaster.offsets.items()
+        )
+        last = "" if measured else "Last burst not sent or not measured. Before that: "
+        self.stats.setText(
+            f"{last}Skew {broadcaster.last_skew * 1e6:.0f} µs "
+            f"(mean {broadcaster.mean_skew * 1e6:.0f}, max {broadcaster.max_skew * 1e6:.0f} "
+            f"over {broadcaster.count} bursts)\n"
+            f"Offsets (µs): {offsets}"
+        )
+
+    def build_layout(self):
+        self.setWindowTitle("Synchronized move")
+        self.resize(640, 320)
+
+        headers = ["Motor", *(title for title, _, _, _ in SETPOINT_COLUMNS)]
+        self.table = QTableWidget(len(self.motors), len(headers))
+        self.table.setHorizontalHeaderLabels(headers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(
+            QHeaderView.ResizeMode.Stretch
+        )
+        for row, motor_id in enumerate(self.motors):
+            checkbox = QCheckBox(str(motor_id))
+            checkbox.setChecked(True)
+            self.include[motor_id] = checkbox
+            self.table.setCellWidget(row, 0, checkbox)
+
+            self.inputs[motor_id] = []
+            for col, (_, value, range, decimals) in enumerate(SETPOINT_COLUMNS):
+                field = QDoubleSpinBox()
+                field.setDecimals(decimals)
+                field.setRange(*range)
+                field.setValue(value)
+                self.inputs[motor_id].append(field)
+                self.table.setCellWidget(row, col + 1, field)
+
+        enable_button = QPushButton("Enable")
+        enable_button.setToolTip("Put the motors in operation control mode")
+        enable_button.clicked.connect(self.enable_motors)
+        send_button = QPushButton("Send")
+        send_button.setDefault(True)
+        send_button.clicked.connect(self.send)
+        stop_button = QPushButton("Stop")
+        stop_button.clicked.connect(self.stop_motors)
+        buttons = QHBoxLayout()
+        buttons.addWidget(enable_button)
+        buttons.addStretch()
+        buttons.addWidget(stop_button)
+        buttons.addWidget(send_button)
+
+        self.stats = QLabel()
+        self.stats.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+
+        layout = QVBoxLayout()
+        layout.addWidget(self.table)
+        layout.addLayout(buttons)
+        layout.addWidget(self.stats)
+        self.setLayout(layout)
@@ -12,12 +12,14 @@ from CyberGearDriver import CyberGearMotor, RunMode
 
 from .abstract_classes import AbstractControlPanel
 from .slider_input_widgets import SliderMotorInputWidget
+from .live_mode import LiveModeWidget
 
 
 class TorqueControlPanel(QWidget, metaclass=AbstractControlPanel):
     motor: CyberGearMotor
     form: QWidget
     send_button: QPushButton
+    live: LiveModeWidget
     current: SliderMotorInputWidget
     current_kp: SliderMotorInputWidget
     current_ki: SliderMotorInputWidget
@@ -38,7 +40,7 @@ class TorqueControlPanel(QWidget, metaclass=AbstractControlPanel):
 
     def unload(self):
         """The control panel is closing"""
-        pass
+        self.live.stop()
 
     def execute(self):
         """Send the values to the motor"""
@@ -51,6 +53,12 @@ class TorqueControlPanel(QWidget, metaclass=AbstractControlPanel):
     def motor_is_enabled(self, is_enabled: bool):
         """Enable the send button when the motor is enabled"""
         self.send_button.setEnabled(is_enabled)
+        self.live.set_available(is_enabled)
+
+    def on_live_changed(self, is_live: bool):
+        """Send all the values (and the mode) once, when going live"""
+        if is_live:
+            self.execute()
 
     def build_layout(self):
         self.current = SliderMotorInputWidget(
@@ -66,6 +74,13 @@ class TorqueControlPanel(QWidget, metaclass=AbstractControlPanel):
             motor=self.motor, label="Current filter gain", param_name="cur_filt_gain"
         )
 
+        self.live = LiveModeWidget(self.motor)
+        self.live.live_changed.connect(self.on_live_changed)
+        self.live.watch(self.current)
+        self.live.watch(self.current_kp)
+        self.live.watch(self.current_ki)
+        self.live.watch(self.current_filter_gain)
+
         self.send_button = QPushButton("Send")
         self.send_button.setEnabled(False)
         self.send_button.clicked.connect(self.execute)
@@ -79,6 +94,7 @@ class TorqueControlPanel(QWidget, metaclass=AbstractControlPanel):
         form_layout.addWidget(self.current_kp)
         form_layout.addWidget(self.current_ki)
         form_layout.addWidget(self.current_filter_gain)
+        form_layout.addWidget(self.live)
         form_layout.addWidget(self.send_button)
 
         self.form = QWidget()
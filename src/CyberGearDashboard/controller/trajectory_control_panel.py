@@ -0,0 +1,298 @@
+import os
+from typing import Dict, Optional
+from PySide6.QtCore import QTimer, Signal
+from PySide6.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QFormLayout,
+    QSpacerItem,
+    QSizePolicy,
+    QPushButton,
+    QDockWidget,
+    QComboBox,
+    QDoubleSpinBox,
+    QSpinBox,
+    QLabel,
+    QFileDialog,
+    QProgressBar,
+)
+
+from CyberGearDriver import (
+    CyberGearMotor,
+    RunMode,
+    P_MIN,
+    P_MAX,
+    KP_MIN,
+    KP_MAX,
+    KD_MIN,
+    KD_MAX,
+)
+
+from CyberGearDashboard.trajectory import (
+    Trajectory,
+    TrajectoryStreamer,
+    WAVEFORMS,
+    MIN_RATE,
+    MAX_RATE,
+    DEFAULT_RATE,
+    step,
+    ramp,
+    sine,
+    chirp,
+    load_csv,
+)
+
+from .abstract_classes import AbstractControlPanel
+from .slider_input_widgets import SliderInputWidget
+
+REFRESH_RATE_MS = 200
+
+# The form fields used by each waveform
+WAVEFORM_FIELDS = {
+    "Step": ("start", "end", "delay", "duration"),
+    "Ramp": ("start", "end", "duration"),
+    "Sine": ("offset", "amplitude", "frequency", "duration"),
+    "Chirp": ("offset", "amplitude", "frequency", "end_frequency", "duration"),
+    "CSV": ("csv",),
+}
+
+
+class TrajectoryControlPanel(QWidget, metaclass=AbstractControlPanel):
+    """Stream a setpoint trajectory to the motor in operation control mode"""
+
+    motor: CyberGearMotor
+    streamer: Optional[TrajectoryStreamer]
+    csv_path: Optional[str]
+
+    form: QFormLayout
+    fields: Dict[str, QWidget]
+    waveform: QComboBox
+    rate: QSpinBox
+    kp: SliderInputWidget
+    kd: SliderInputWidget
+    start_button: QPushButton
+    abort_button: QPushButton
+    progress: QProgressBar
+    stats_label: QLabel
+
+    finished = Signal()
+
+    def __init__(self, motor: CyberGearMotor, parent=QDockWidget, *args, **kwargs):
+        super().__init__(parent=parent, *args, **kwargs)
+        self.motor = motor
+        self.streamer = None
+        self.csv_path = None
+        self.motor_enabled = False
+        self.build_layout()
+        parent.motor_enabled.connect(self.motor_is_enabled)
+        self.finished.connect(self.on_finished)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.update_stats)
+
+    def load(self):
+        """Reset the screen"""
+        self.on_waveform_change()
+
+    def unload(self):
+        """The control panel is closing, stop streaming"""
+        self.abort()
+
+    def build_trajectory(self) -> Trajectory:
+        """Build the trajectory from the form values"""
+        values = {
+            name: field.value()
+            for name, field in self.fields.items()
+            if isinstance(field, QDoubleSpinBox)
+        }
+        rate = self.rate.value()
+        waveform = self.waveform.currentText()
+        if waveform == "Step":
+            return step(
+                rate,
+                values["duration"],
+                values["start"],
+                values["end"],
+                values["delay"],
+            )
+        if waveform == "Ramp":
+            return ramp(rate, values["duration"], values["start"], values["end"])
+        if waveform == "Sine":
+            return sine(
+                rate,
+                values["duration"],
+                values["offset"],
+                values["amplitude"],
+                values["frequency"],
+            )
+        if waveform == "Chirp":
+            return chirp(
+                rate,
+                values["duration"],
+                values["offset"],
+                values["amplitude"],
+                values["frequency"],
+                values["end_frequency"],
+            )
+        return load_csv(self.csv_path, rate)
+
+    def execute(self):
+        """Start streaming the trajectory"""
+        if self.streamer is not None:
+            return
+        try:
+            trajectory = self.build_trajectory()
+        except (ValueError, OSError, TypeError) as e:
+            self.stats_label.setText(f"Could not build the trajectory: {e}")
+            return
+
+        self.motor.mode(RunMode.OPERATION_CONTROL)
+        self.streamer = TrajectoryStreamer(
+            self.motor,
+            trajectory,
+            self.kp.value,
+            self.kd.value,
+            on_finished=self.finished.emit,
+        )
+        self.streamer.start()
+        self.timer.start(REFRESH_RATE_MS)
+        self.update_buttons()
+
+    def abort(self):
+        """Stop streaming immediately (this also stops the motor)"""
+        if self.streamer is not None:
+            self.streamer.abort()
+
+    def on_finished(self):
+        self.timer.stop()
+        self.update_stats()
+        self.streamer = None
+        self.update_buttons()
+
+    def update_stats(self):
+        """Show the actual send period, jitter and missed deadlines"""
+        streamer = self.streamer
+        if streamer is None:
+            return
+        stats = streamer.stats
+        self.progress.setValue(round(streamer.progress * 100))
+        status = "Aborted. " if streamer.aborted else ""
+        self.stats_label.setText(
+            f"{status}Sent {streamer.sent} of {len(streamer.frames)}, "
+            f"missed {streamer.missed}\n"
+            f"Period {stats.mean:.3f} ms (target {streamer.period * 1000:.3f}), "
+            f"jitter {stats.jitter:.3f} ms, max late {streamer.max_late * 1000:.2f} ms"
+        )
+
+    def motor_is_enabled(self, is_enabled: bool):
+        """Only stream to an enabled motor"""
+        self.motor_enabled = is_enabled
+        if not is_enabled:
+            self.abort()
+        self.update_buttons()
+
+    def update_buttons(self):
+        running = self.streamer is not None
+        self.start_button.setEnabled(self.motor_enabled and not running)
+        self.abort_button.setEnabled(running)
+
+    def on_waveform_change(self):
+        """Show only the fields for the selected waveform"""
+        visible = WAVEFORM_FIELDS[self.waveform.currentText()]
+        for name, field in self.fields.items():
+            self.form.setRowVisible(field, name in visible)
+
+    def choose_csv(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Load trajectory", "", "CSV files (*.csv)"
+        )
+        if path:
+            self.csv_path = path
+            self.fields["csv"].setText(os.path.basename(path))
+
+    def build_layout(self):
+        self.waveform = QComboBox()
+        self.waveform.addItems(WAVEFORMS)
+        self.waveform.currentIndexChanged.connect(self.on_waveform_change)
+
+        self.rate = QSpinBox()
+        self.rate.setRange(MIN_RATE, MAX_RATE)
+        self.rate.setValue(DEFAULT_RATE)
+        self.rate.setSuffix(" Hz")
+
+        def number(value: float, range, suffix: str) -> QDoubleSpinBox:
+            field = QDoubleSpinBox()
+            field.setDecimals(3)
+            field.setRange(*range)
+            field.setValue(value)
+            field.setSuffix(suffix)
+            return field
+
+        csv_button = QPushButton("Choose file...")
+        csv_button.clicked.connect(self.choose_csv)
+
+        self.fields = {
+            "start": number(0.0, (P_MIN, P_MAX), " rad"),
+            "end": number(1.0, (P_MIN, P_MAX), " rad"),
+            "offset": number(0.0, (P_MIN, P_MAX), " rad"),
+            "amplitude": number(1.0, (0, P_MAX), " rad"),
+            "frequency": number(1.0, (0.01, 100), " Hz"),
+            "end_frequency": number(20.0, (0.01, 100), " Hz"),
+            "delay": number(0.5, (0, 3600), " s"),
+            "duration": number(5.0, (0.01, 3600), " s"),
+            "csv": QLabel("No file"),
+        }
+        labels = {
+            "start": "Start",
+            "end": "End",
+            "offset": "Offset",
+            "amplitude": "Amplitude",
+            "frequency": "Frequency",
+            "end_frequency": "End frequency",
+            "delay": "Step after",
+            "duration": "Duration",
+            "csv": csv_button,
+        }
+
+        self.form = QFormLayout()
+        self.form.addRow("Waveform", self.waveform)
+        self.form.addRow("Rate", self.rate)
+        for name, field in self.fields.items():
+            self.form.addRow(labels[name], field)
+
+        self.kp = SliderInputWidget(
+            label="Kp", value=10, range=(KP_MIN, KP_MAX), decimals=3
+        )
+        self.kd = SliderInputWidget(
+            label="Kd", value=1, range=(KD_MIN, KD_MAX), decimals=3
+        )
+
+        self.start_button = QPushButton("Start")
+        self.start_button.setEnabled(False)
+        self.start_button.clicked.connect(self.execute)
+        self.abort_button = QPushButton("Abort")
+        self.abort_button.setEnabled(False)
+        self.abort_button.clicked.connect(self.abort)
+        buttons = QHBoxLayout()
+        buttons.addWidget(self.start_button)
+        buttons.addWidget(self.abort_button)
+
+        self.progress = QProgressBar()
+        self.stats_label = QLabel()
+        self.stats_label.setWordWrap(True)
+
+        spacer = QSpacerItem(
+            20, 40, QSizePolicy.Policy.Minimum, QSizePolicy.Policy.Expanding
+        )
+
+        layout = QVBoxLayout()
+        layout.addLayout(self.form)
+        layout.addWidget(self.kp)
+        layout.addWidget(self.kd)
+        layout.addLayout(buttons)
+        layout.addWidget(self.progress)
+        layout.addWidget(self.stats_label)
+        layout.addItem(spacer)
+        self.setLayout(layout)
+        self.on_waveform_change()
@@ -12,6 +12,7 @@ from CyberGearDriver import CyberGearMotor, RunMode
 
 from .abstract_classes import AbstractControlPanel
 from .slider_input_widgets import SliderMotorInputWidget
+from .live_mode import LiveModeWidget
 
 
 class VelocityControlPanel(QWidget, metaclass=AbstractControlPanel):
@@ -22,6 +23,7 @@ class VelocityControlPanel(QWidget, metaclass=AbstractControlPanel):
     max_current: SliderMotorInputWidget
     form: QWidget
     send_button: QPushButton
+    live: LiveModeWidget
 
     def __init__(self, motor: CyberGearMotor, parent=QDockWidget, *args, **kwargs):
         super().__init__(parent=parent, *args, **kwargs)
@@ -38,7 +40,7 @@ class VelocityControlPanel(QWidget, metaclass=AbstractControlPanel):
 
     def unload(self):
         """The control panel is closing"""
-        pass
+        self.live.stop()
 
     def execute(self):
         """Send the values to the motor"""
@@ -51,6 +53,12 @@ class VelocityControlPanel(QWidget, metaclass=AbstractControlPanel):
     def motor_is_enabled(self, is_enabled: bool):
         """Enable the send button when the motor is enabled"""
         self.send_button.setEnabled(is_enabled)
+        self.live.set_available(is_enabled)
+
+    def on_live_changed(self, is_live: bool):
+        """Send all the values (and the mode) once, when going live"""
+        if is_live:
+            self.execute()
 
     def build_layout(self):
         self.velocity = SliderMotorInputWidget(
@@ -66,6 +74,13 @@ class VelocityControlPanel(QWidget, metaclass=AbstractControlPanel):
             motor=self.motor, label="Max current (A)", param_name="limit_cur"
         )
 
+        self.live = LiveModeWidget(self.motor)
+        self.live.live_changed.connect(self.on_live_changed)
+        self.live.watch(self.velocity)
+        self.live.watch(self.velocity_kp)
+        self.live.watch(self.velocity_ki)
+        self.live.watch(self.max_current)
+
         self.send_button = QPushButton("Send")
         self.send_button.setEnabled(False)
         self.send_button.clicked.connect(self.execute)
@@ -79,6 +94,7 @@ class VelocityControlPanel(QWidget, metaclass=AbstractControlPanel):
         form_layout.addWidget(self.velocity_kp)
         form_layout.addWidget(self.velocity_ki)
         form_layout.addWidget(self.max_current)
+        form_layout.addWidget(self.live)
         form_layout.addWidget(self.send_button)
 
         self.form = QWidget()
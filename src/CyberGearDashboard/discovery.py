@@ -0,0 +1,170 @@
+import time
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+
+import can
+
+from CyberGearDriver.constants import Command, DEFAULT_HOST_CAN_ID
+
+from CyberGearDashboard.constants import DEFAULT_CAN_BITRATE
+from CyberGearDashboard.protocol import (
+    arbitration_id,
+    sender_id,
+    DEVICE_ID_REPLY,
+    MOTOR_ID_MASK,
+    MODE_SHIFT,
+    MODE_MASK,
+)
+
+# All valid motor IDs
+SCAN_IDS = range(1, 128)
+
+# How long to wait for replies after the last probe (in seconds)
+SCAN_TIMEOUT = 0.15
+
+
+class DiscoveredMotor:
+    """A motor that was found on the bus"""
+
+    motor_id: int
+    unique_id: Optional[int]
+    response_time: Optional[float]
+    passive: bool
+
+    def __init__(self, motor_id: int):
+        self.motor_id = motor_id
+        self.unique_id = None
+        self.response_time = None
+        self.passive = True
+
+    @property
+    def unique_id_hex(self) -> str:
+        if self.unique_id is None:
+            return ""
+        return f"{self.unique_id:016X}"
+
+
+class MotorScanner:
+    """
+    Finds motors by sending a device ID request to every motor ID, back to back, and
+    collecting the replies. Any other traffic from a motor is picked up passively as well.
+
+    Feed all received bus messages to `message_received` while scanning.
+    """
+
+    send: Callable[[can.Message], None]
+    host_id: int
+    found: Dict[int, DiscoveredMotor]
+    on_found: Optional[Callable[[DiscoveredMotor], None]]
+
+    def __init__(
+        self,
+        send: Callable[[can.Message], None],
+        host_id: int = DEFAULT_HOST_CAN_ID,
+        on_found: Optional[Callable[[DiscoveredMotor], None]] = None,
+    ):
+        self.send = send
+        self.host_id = host_id
+        self.on_found = on_found
+        self.found = {}
+        self.probe_time = time.perf_counter()
+        self.lock = threading.Lock()
+
+    def probe(self, motor_ids: Iterable[int]):
+        """Send a device ID request to each motor ID, without waiting for replies"""
+        self.probe_time = time.perf_counter()
+        for motor_id in motor_ids:
+            self.send(
+                can.Message(
+                    arbitration_id=arbitration_id(
+                        Command.GET_DEVICE_ID, motor_id, self.host_id
+                    ),
+                    data=bytes(8),
+                    is_extended_id=True,
+                )
+            )
+
+    def scan(
+        self, motor_ids: Iterable[int] = SCAN_IDS, timeout: float = SCAN_TIMEOUT
+    ) -> List[DiscoveredMotor]:
+        """Probe all motor IDs and return the motors that replied (blocks for about `timeout`)"""
+        motor_ids = list(motor_ids)
+        self.probe(motor_ids)
+        time.sleep(timeout / 2)
+
+        # Probe again for any that didn't reply, in case a request was dropped by the adapter
+        missing = [id for id in motor_ids if id not in self.found]
+        self.probe(missing)
+        time.sleep(timeout / 2)
+        return self.results()
+
+    def results(self) -> List[DiscoveredMotor]:
+        """All motors found so far, sorted by ID"""
+        with self.lock:
+            return [self.found[id] for id in sorted(self.found)]
+
+    def message_received(self, msg: can.Message):
+        """Check a received message for a motor reply"""
+        if not msg.is_extended_id or msg.is_error_frame:
+            return
+        mode = (msg.arbitration_id >> MODE_SHIFT) & MODE_MASK
+        destination = msg.arbitration_id & MOTOR_ID_MASK
+        motor_id = sender_id(msg.arbitration_id)
+        if motor_id == self.host_id:
+            return
+
+        if mode == Command.GET_DEVICE_ID.value and destination == DEVICE_ID_REPLY:
+            self.add(motor_id, unique_id=int.from_bytes(msg.data[0:8], "little"))
+        elif destination == self.host_id:
+            self.add(motor_id)
+
+    def add(self, motor_id: int, unique_id: Optional[int] = None):
+        """Record a motor sighting"""
+        with self.lock:
+            is_new = motor_id not in self.found
+            motor = self.found.setdefault(motor_id, DiscoveredMotor(motor_id))
+            is_new_identity = unique_id is not None and motor.unique_id is None
+            if is_new_identity:
+                motor.unique_id = unique_id
+                motor.passive = False
+                motor.response_time = time.perf_counter() - self.probe_time
+        if (is_new or is_new_identity) and self.on_found is not None:
+            self.on_found(motor)
+
+
+def scan_bus(
+    interface: str,
+    channel: str,
+    bitrate: int = DEFAULT_CAN_BITRATE,
+    motor_ids: Iterable[int] = SCAN_IDS,
+    timeout: float = SCAN_TIMEOUT,
+) -> List[DiscoveredMotor]:
+    """Open the bus and scan it for motors"""
+    bus = can.interface.Bus(interface=interface, channel=channel, bitrate=bitrate)
+    try:
+        scanner = MotorScanner(send=bus.send)
+        notifier = can.Notifier(bus, [scanner.message_received], timeout=0.05)
+        try:
+            return scanner.scan(motor_ids, timeout)
+        finally:
+            notifier.stop()
+    finally:
+        bus.shutdown()
+
+
+def print_scan(interface: str, channel: str, bitrate: int, timeout: float):
+    """Scan the bus and print the motors that were found"""
+    start = time.perf_counter()
+    motors = scan_bus(interface, channel, bitrate, timeout=timeout)
+    elapsed = time.perf_counter() - start
+
+    print(f"Found {len(motors)} motor(s) in {elapsed:.3f}s")
+    if motors:
+        print(f"{'ID':>4}  {'Unique ID':<16}  {'Reply (ms)':>10}")
+    for motor in motors:
+        reply = (
+            f"{motor.response_time * 1000:.1f}"
+            if motor.response_time is not None
+            else "passive"
+        )
+        print(f"{motor.motor_id:>4}  {motor.unique_id_hex:<16}  {reply:>10}")
@@ -0,0 +1,96 @@
+from typing import Dict, Optional
+
+import can
+import numpy as np
+
+from CyberGearDriver import CyberGearMotor
+
+from CyberGearDashboard.protocol import DATA_SHIFT
+from CyberGearDashboard.freshness import STATE_NAMES, ValueTracker
+from CyberGearDashboard.rolling_stats import StateStatistics
+from CyberGearDashboard.samples import SAMPLE_NAMES, SampleStore
+
+
+class MotorDispatcher:
+    """
+    The single receive path for all motors on the bus.
+    Messages are routed to their motor by the sender ID, with a dict lookup.
+    Each motor's value tracker, statistics and samples are updated on the way.
+
+    When the bus process decodes the messages, the samples come in batches instead, and
+    the motors only get the messages that change their state.
+    """
+
+    motors: Dict[int, CyberGearMotor]
+    trackers: Dict[int, ValueTracker]
+    statistics: Dict[int, StateStatistics]
+    stores: Dict[int, SampleStore]
+
+    def __init__(self):
+        self.motors = {}
+        self.trackers = {}
+        self.statistics = {}
+        self.stores = {}
+
+    def add_motor(self, motor: CyberGearMotor):
+        """Route messages from this motor to it"""
+        self.trackers.setdefault(motor.motor_id, ValueTracker())
+        self.statistics.setdefault(motor.motor_id, StateStatistics())
+        self.stores.setdefault(motor.motor_id, SampleStore())
+        self.motors[motor.motor_id] = motor
+
+    def remove_motor(self, motor_id: int):
+        """Stop routing messages for a motor ID"""
+        self.motors.pop(motor_id, None)
+
+    def get_motor(self, motor_id: int) -> Optional[CyberGearMotor]:
+        return self.motors.get(motor_id)
+
+    def get_tracker(self, motor_id: int) -> Optional[ValueTracker]:
+        """The receive timestamps of a motor's values"""
+        return self.trackers.get(motor_id)
+
+    def get_statistics(self, motor_id: int) -> Optional[StateStatistics]:
+        """The rolling statistics of a motor's state values"""
+        return self.statistics.get(motor_id)
+
+    def get_store(self, motor_id: int) -> Optional[SampleStore]:
+        """The recent samples of a motor's values, shared by all its views"""
+        return self.stores.get(motor_id)
+
+    def message_received(self, msg: can.Message):
+        """Pass a received message to the motor it came from"""
+        if not msg.is_extended_id:
+            return
+        motor_id = (msg.arbitration_id >> DATA_SHIFT) & 0xFF
+        motor = self.motors.get(motor_id)
+        if motor is not None:
+            self.trackers[motor_id].message_received(msg)
+            self.statistics[motor_id].message_received(msg)
+            self.stores[motor_id].message_received(msg)
+            motor.message_received(msg)
+
+    def samples_received(self, samples: np.ndarray):
+        """Add a batch of decoded samples (SAMPLE_DTYPE) to their motors' values"""
+        for motor_id in np.unique(samples["motor_id"]).tolist():
+            if motor_id not in self.motors:
+                continue
+            tracker = self.trackers[motor_id]
+            statistics = self.statistics[motor_id]
+            store = self.stores[motor_id]
+            rows = samples[samples["motor_id"] == motor_id]
+            for key in np.unique(rows["key"]).tolist():
+                name = SAMPLE_NAMES[key]
+                values = rows[rows["key"] == key]
+                tracker.extend(name, values["timestamp"], values["received"])
+                if name in STATE_NAMES:
+                    statistics.extend(name, values["value"])
+                store.channel(name).extend(values["received"], values["value"])
+
+    def update_received(self, msg: can.Message):
+        """Pass a message to its motor only (its values came in as samples)"""
+        if not msg.is_extended_id:
+            return
+        motor = self.motors.get((msg.arbitration_id >> DATA_SHIFT) & 0xFF)
+        if motor is not None:
+            motor.message_received(msg)
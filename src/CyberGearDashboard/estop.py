@@ -0,0 +1,216 @@
+import os
+import sys
+import time
+import threading
+from typing import Callable, Dict, List, Optional
+
+import can
+
+from CyberGearDriver import CyberGearMotor
+
+from CyberGearDashboard.connection import BusConnection
+from CyberGearDashboard.protocol import stop_request
+
+# The guaranteed worst-case time from triggering the e-stop until the last stop frame has
+# been handed to the adapter (in seconds)
+ESTOP_LATENCY_BOUND = 0.005
+
+# How long a thread can hold the GIL before it has to let another thread run (in seconds).
+# Python's default (5 ms) alone would use up the whole bound while the UI thread is busy.
+SWITCH_INTERVAL = 0.0005
+
+# Real-time priority for the e-stop thread (Linux, needs CAP_SYS_NICE) or, failing that,
+# the nice value
+REALTIME_PRIORITY = 50
+NICE_PRIORITY = -10
+
+
+def raise_priority():
+    """Give the calling thread a higher OS scheduling priority, if the platform allows it"""
+    try:
+        os.sched_setscheduler(
+            0, os.SCHED_FIFO, os.sched_param(REALTIME_PRIORITY)
+        )  # 0 is the calling thread on Linux
+        return
+    except (AttributeError, OSError):
+        pass
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), NICE_PRIORITY)
+    except (AttributeError, OSError):
+        pass
+
+
+class EmergencyStop(threading.Thread):
+    """
+    The emergency stop path, independent of the UI thread.
+
+    `trigger()` can be called from any thread. It wakes this (high priority) thread, which
+    halts the connection, so nothing but stops and reads can be sent anymore, drops the
+    frames queued in the adapter, then sends the stop frames for every motor in one burst.
+    Sending stays halted until `reset()`.
+    """
+
+    connection: BusConnection
+    motors: Dict[int, CyberGearMotor]
+    on_stopped: List[Callable[[], None]]
+    count: int
+    last_latency: float
+    max_latency: float
+
+    def __init__(self, connection: BusConnection, motors: Dict[int, CyberGearMotor]):
+        super().__init__(daemon=True)
+        self.connection = connection
+        self.motors = motors
+        self.on_stopped = []
+        self.count = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self.frames = {}
+        self.triggered_at = 0.0
+        self._trigger = threading.Event()
+
+    @property
+    def is_stopped(self) -> bool:
+        return self.connection.halted
+
+    def start(self):
+        sys.setswitchinterval(min(sys.getswitchinterval(), SWITCH_INTERVAL))
+        super().start()
+
+    def trigger(self):
+        """Stop all motors, now"""
+        self.triggered_at = time.perf_counter()
+        self._trigger.set()
+
+    def reset(self):
+        """Allow the motors to be enabled again"""
+        self.connection.resume()
+
+    def stop_frames(self) -> List[can.Message]:
+        """The stop frame for every motor (built once per motor)"""
+        frames = []
+        for motor_id, motor in list(self.motors.items()):
+            frame = self.frames.get(motor_id)
+            if frame is None:
+                message = stop_request(motor)
+                frame = can.Message(
+                    arbitration_id=message.arbitration_id,
+                    data=message.data,
+                    is_extended_id=True,
+                )
+                self.frames[motor_id] = frame
+            frames.append(frame)
+        return frames
+
+    def run(self):
+        raise_priority()
+        while True:
+            self._trigger.wait()
+            self._trigger.clear()
+            self.stop_all()
+
+    def stop_all(self) -> Optional[float]:
+        """Halt and send the stop frames. Returns the latency since the trigger (in seconds)."""
+        self.connection.halt()
+        sent_times = self.connection.send_burst(self.stop_frames())
+        latency = None
+        if sent_times:
+            latency = sent_times[-1] - self.triggered_at
+            self.count += 1
+            self.last_latency = latency
+            self.max_latency = max(self.max_latency, latency)
+        for callback in self.on_stopped:
+            callback()
+        return latency
+
+
+# Benchmark defaults
+BENCHMARK_RUNS = 200
+BENCHMARK_LOAD_THREADS = 2
+BENCHMARK_CONNECT_TIMEOUT = 5.0
+
+
+def benchmark(
+    interface: str,
+    channel: str,
+    bitrate: int,
+    motor_ids: List[int],
+    runs: int = BENCHMARK_RUNS,
+    load_threads: int = BENCHMARK_LOAD_THREADS,
+) -> bool:
+    """
+    Measure the e-stop latency while the process is busy: threads that hold the GIL with
+    Python work (like the UI rendering) and one that keeps the bus busy with control frames.
+    Prints the latency distribution, and returns whether the worst case was within the bound.
+    """
+    import random
+    import statistics
+
+    from CyberGearDashboard.protocol import control_message
+
+    connection = BusConnection(channel, interface, bitrate)
+    connection.open()
+    deadline = time.monotonic() + BENCHMARK_CONNECT_TIMEOUT
+    while not connection.is_connected and time.monotonic() < deadline:
+        time.sleep(0.01)
+    if not connection.is_connected:
+        print(f"Could not connect to the bus: {connection.error}")
+        connection.close()
+        return False
+
+    motors = {
+        motor_id: CyberGearMotor(motor_id, send_message=connection.send_motor_message)
+        for motor_id in motor_ids
+    }
+    estop = EmergencyStop(connection, motors)
+    stopped = threading.Event()
+    estop.on_stopped.append(stopped.set)
+    estop.start()
+
+    running = True
+
+    def busy():
+        while running:
+            sum(i * i for i in range(10_000))
+
+    def traffic():
+        messages = [control_message(motor, 0, 0, 0, 0, 0) for motor in motors.values()]
+        while running:
+            for message in messages:
+                connection.send_motor_message(message)
+            time.sleep(0.001)
+
+    load = [threading.Thread(target=busy, daemon=True) for _ in range(load_threads)]
+    load.append(threading.Thread(target=traffic, daemon=True))
+    for thread in load:
+        thread.start()
+
+    latencies = []
+    try:
+        for _ in range(runs):
+            time.sleep(random.uniform(0.005, 0.02))
+            stopped.clear()
+            estop.trigger()
+            stopped.wait()
+            latencies.append(estop.last_latency)
+            estop.reset()
+    finally:
+        running = False
+        connection.close()
+
+    latencies.sort()
+    p99 = latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)]
+    print(
+        f"E-stop latency over {runs} runs, {len(motors)} motor(s), "
+        f"{load_threads} busy thread(s) + bus traffic:"
+    )
+    print(
+        f"  min {latencies[0] * 1000:.3f} ms, median {statistics.median(latencies) * 1000:.3f} ms, "
+        f"p99 {p99 * 1000:.3f} ms, max {latencies[-1] * 1000:.3f} ms"
+    )
+    within = latencies[-1] <= ESTOP_LATENCY_BOUND
+    print(
+        f"  {'PASS' if within else 'FAIL'}: worst case "
+        f"{'within' if within else 'over'} the {ESTOP_LATENCY_BOUND * 1000:.1f} ms bound"
+    )
+    return within
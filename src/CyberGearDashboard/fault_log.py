@@ -0,0 +1,171 @@
+import os
+import csv
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+import can
+
+from CyberGearDriver.constants import Command
+
+from CyberGearDashboard.protocol import (
+    MODE_SHIFT,
+    MODE_MASK,
+    FEEDBACK_FAULT_SHIFT,
+    FEEDBACK_FAULT_MASK,
+    FEEDBACK_FAULT_NAMES,
+    FAULT_BITS,
+    FAULT_STRUCT,
+    is_reply,
+    sender_id,
+)
+
+# Fault flags as (bit, name), for both kinds of message that carry them
+FEEDBACK_BITS = tuple(enumerate(FEEDBACK_FAULT_NAMES))
+FAULT_MASK = sum(1 << bit for bit, _ in FAULT_BITS)
+
+# The most events kept in memory (the file keeps them all)
+MAX_EVENTS = 10_000
+
+LOG_COLUMNS = ("timestamp", "motor_id", "fault", "active")
+
+
+class FaultEvent:
+    """A fault being raised or cleared, at the CAN timestamp of the message that showed it"""
+
+    __slots__ = ("timestamp", "motor_id", "name", "active")
+
+    def __init__(self, timestamp: float, motor_id: int, name: str, active: bool):
+        self.timestamp = timestamp
+        self.motor_id = motor_id
+        self.name = name
+        self.active = active
+
+
+class FaultLog:
+    """
+    Records fault edges for every motor, straight from the receive path.
+
+    The fault flags of each feedback and fault reply are compared with the last ones seen
+    from that motor. Only when they differ (an edge), an event is recorded, appended to
+    the log file and passed to the listeners, so a steady state costs one comparison.
+    """
+
+    path: Optional[str]
+    events: Deque[FaultEvent]
+    flags: Dict[Tuple[int, int], int]
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.events = deque(maxlen=MAX_EVENTS)
+        self.flags = {}
+        self.listeners: Dict[Optional[int], List[Callable[[FaultEvent], None]]] = {}
+        self.lock = threading.Lock()
+        self.file = None
+        if path is not None:
+            self.load()
+            self.file = open(path, "a", newline="")
+            self.writer = csv.writer(self.file)
+            if self.file.tell() == 0:
+                self.writer.writerow(LOG_COLUMNS)
+
+    def load(self):
+        """Load the previous events from the log file"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, newline="") as file:
+            for row in csv.DictReader(file):
+                try:
+                    self.events.append(
+                        FaultEvent(
+                            float(row["timestamp"]),
+                            int(row["motor_id"]),
+                            row["fault"],
+                            row["active"] == "1",
+                        )
+                    )
+                except (KeyError, TypeError, ValueError):
+                    continue
+
+    def add_listener(
+        self, callback: Callable[[FaultEvent], None], motor_id: Optional[int] = None
+    ):
+        """Call `callback` with every new event (from one motor, or all of them)"""
+        with self.lock:
+            listeners = self.listeners.get(motor_id, [])
+            self.listeners[motor_id] = listeners + [callback]
+
+    def remove_listener(
+        self, callback: Callable[[FaultEvent], None], motor_id: Optional[int] = None
+    ):
+        with self.lock:
+            listeners = self.listeners.get(motor_id, [])
+            self.listeners[motor_id] = [cb for cb in listeners if cb != callback]
+
+    def active_faults(self, motor_id: int) -> List[str]:
+        """The faults currently raised on a motor"""
+        feedback = self.flags.get((motor_id, Command.STATE.value), 0)
+        faults = self.flags.get((motor_id, Command.FAULT.value), 0)
+        return [name for bit, name in FEEDBACK_BITS if feedback & (1 << bit)] + [
+            name for bit, name in FAULT_BITS if faults & (1 << bit)
+        ]
+
+    def message_received(self, msg: can.Message):
+        arbitration_id = msg.arbitration_id
+        if not msg.is_extended_id or not is_reply(arbitration_id):
+            return
+        mode = (arbitration_id >> MODE_SHIFT) & MODE_MASK
+        if mode == Command.STATE.value:
+            flags = (arbitration_id >> FEEDBACK_FAULT_SHIFT) & FEEDBACK_FAULT_MASK
+            bits = FEEDBACK_BITS
+        elif mode == Command.FAULT.value and len(msg.data) >= FAULT_STRUCT.size:
+            flags = FAULT_STRUCT.unpack_from(msg.data)[0] & FAULT_MASK
+            bits = FAULT_BITS
+        else:
+            return
+
+        key = (sender_id(arbitration_id), mode)
+        previous = self.flags.get(key, 0)
+        if flags == previous:
+            return
+        self.flags[key] = flags
+        changed = flags ^ previous
+        for bit, name in bits:
+            if changed & (1 << bit):
+                self.add(
+                    FaultEvent(msg.timestamp, key[0], name, bool(flags & (1 << bit)))
+                )
+
+    def add(self, event: FaultEvent):
+        """Record an event, and tell the listeners"""
+        with self.lock:
+            self.events.append(event)
+            if self.file is not None:
+                self.writer.writerow(
+                    (
+                        f"{event.timestamp:.6f}",
+                        event.motor_id,
+                        event.name,
+                        int(event.active),
+                    )
+                )
+                self.file.flush()
+            listeners = self.listeners.get(event.motor_id, []) + self.listeners.get(
+                None, []
+            )
+        for callback in listeners:
+            callback(event)
+
+    def history(self, motor_id: Optional[int] = None) -> List[FaultEvent]:
+        with self.lock:
+            return [
+                event
+                for event in self.events
+                if motor_id is None or event.motor_id == motor_id
+            ]
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
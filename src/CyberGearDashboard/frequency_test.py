@@ -0,0 +1,159 @@
+import time
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from CyberGearDriver import CyberGearMotor, RunMode, ParameterName
+
+from CyberGearDashboard.analysis.frequency_response import (
+    DEFAULT_SEGMENTS,
+    FrequencyResponse,
+    log_frequencies,
+    measure,
+    multisine,
+)
+from CyberGearDashboard.capture import FeedbackCapture
+from CyberGearDashboard.connection import BusConnection
+from CyberGearDashboard.protocol import parameter_write, state_request
+from CyberGearDashboard.trajectory import DEFAULT_RATE, FrameStreamer, chirp
+
+# Excitation modes: (run mode, setpoint parameter, unit)
+EXCITATION_MODES: Dict[str, Tuple[RunMode, ParameterName, str]] = {
+    "Torque": (RunMode.TORQUE, "iq_ref", "A"),
+    "Velocity": (RunMode.VELOCITY, "spd_ref", "rad/s"),
+}
+
+EXCITATION_SIGNALS = ("Chirp", "Multisine")
+
+# The feedback values that can be measured as the output
+OUTPUTS = ("velocity", "position", "torque")
+
+# How many frequencies a multisine excites
+MULTISINE_FREQUENCIES = 40
+
+
+def excitation_signal(
+    signal: str,
+    rate: float,
+    duration: float,
+    amplitude: float,
+    start_frequency: float,
+    end_frequency: float,
+    segment_count: int = DEFAULT_SEGMENTS,
+) -> np.ndarray:
+    """The setpoint values to excite the motor with, one per sample"""
+    if signal == "Chirp":
+        return chirp(
+            rate, duration, 0.0, amplitude, start_frequency, end_frequency
+        ).position
+
+    # Excite frequencies on the analysis bins, so each segment sees whole periods
+    t = np.arange(max(int(round(duration * rate)), 1)) / rate
+    segment_length = max(2 * len(t) // (segment_count + 1), 2)
+    frequencies = log_frequencies(
+        start_frequency, end_frequency, MULTISINE_FREQUENCIES, rate / segment_length
+    )
+    return multisine(t, frequencies, amplitude)
+
+
+class ExcitationStreamer(FrameStreamer):
+    """
+    Streams setpoint writes, each followed by a state request so the feedback is sampled
+    at the same rate. The time each setpoint was sent is recorded (NaN if it was skipped).
+    """
+
+    sent_times: np.ndarray
+
+    def __init__(
+        self,
+        motor: CyberGearMotor,
+        param_name: ParameterName,
+        values: np.ndarray,
+        rate: float,
+    ):
+        frames = [parameter_write(motor, param_name, value) for value in values]
+        super().__init__(motor, frames, rate)
+        self.sent_times = np.full(len(frames), np.nan)
+        self._state_request = state_request(motor)
+
+    def send_frame(self, index: int):
+        send = self.motor.send_message
+        send(self.frames[index])
+        self.sent_times[index] = time.time()
+        send(self._state_request)
+
+
+class FrequencyTest(threading.Thread):
+    """
+    Measures a motor's frequency response: excites the setpoint in torque or velocity
+    mode at a fixed rate, captures the timestamped feedback, and estimates the response
+    from the setpoint to an output value with FFTs.
+    """
+
+    motor: CyberGearMotor
+    connection: BusConnection
+    mode: str
+    output: str
+    values: np.ndarray
+    rate: float
+    streamer: ExcitationStreamer
+    result: Optional[FrequencyResponse]
+    on_finished: Optional[Callable[[], None]]
+
+    def __init__(
+        self,
+        motor: CyberGearMotor,
+        connection: BusConnection,
+        mode: str,
+        values: np.ndarray,
+        output: str = "velocity",
+        rate: float = DEFAULT_RATE,
+        on_finished: Optional[Callable[[], None]] = None,
+    ):
+        super().__init__(daemon=True)
+        self.motor = motor
+        self.connection = connection
+        self.mode = mode
+        self.output = output
+        self.values = values
+        self.rate = rate
+        _, param_name, _ = EXCITATION_MODES[mode]
+        self.streamer = ExcitationStreamer(motor, param_name, values, rate)
+        self.result = None
+        self.on_finished = on_finished
+
+    @property
+    def progress(self) -> float:
+        return self.streamer.progress
+
+    def abort(self):
+        self.streamer.abort()
+
+    def run(self):
+        motor = self.motor
+        run_mode, param_name, _ = EXCITATION_MODES[self.mode]
+        capture = FeedbackCapture(motor.motor_id)
+        self.connection.add_receiver(capture.message_received)
+        try:
+            motor.stop()
+            motor.mode(run_mode)
+            motor.enable()
+            motor.set_parameter(param_name, 0.0)
+            self.streamer.run()
+        finally:
+            motor.send_message(parameter_write(motor, param_name, 0.0))
+            motor.stop()
+            self.connection.remove_receiver(capture.message_received)
+
+        if not self.streamer.aborted:
+            samples = capture.samples()
+            self.result = measure(
+                self.streamer.sent_times,
+                self.values,
+                samples["timestamp"],
+                samples[self.output],
+                self.rate,
+            )
+        if self.on_finished is not None:
+            self.on_finished()
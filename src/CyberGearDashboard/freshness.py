@@ -0,0 +1,137 @@
+import time
+from typing import Dict, Optional
+
+import can
+import numpy as np
+
+from CyberGearDriver.constants import Command
+
+from CyberGearDashboard.protocol import MODE_SHIFT, MODE_MASK, decode_parameter
+
+# The state values every feedback message updates
+STATE_NAMES = ("position", "velocity", "torque", "temperature")
+
+# A value that keeps updating is stale when it hasn't been received for this long (in
+# seconds), or for this many of its own update intervals, whichever is longer.
+# The watcher polls every 0.1 s, so this is several missed replies in a row.
+# Values that were only read once are never stale.
+STALE_AFTER = 1.0
+STALE_INTERVALS = 5
+
+# Parameter read replies (both address ranges)
+PARAMETER_READ_MODES = (Command.READ_PARAM_LOWER.value, Command.READ_PARAM_UPPER.value)
+
+# Smoothing of the update interval average used for the rate (0~1, lower is smoother)
+RATE_SMOOTHING = 0.1
+
+
+class ValueStamp:
+    """When a value was last received, how many times, and how often it's updating"""
+
+    __slots__ = ("timestamp", "received", "count", "interval")
+
+    def __init__(self):
+        self.timestamp = 0.0
+        self.received = 0.0
+        self.count = 0
+        self.interval = 0.0
+
+    def update(self, timestamp: float, received: float):
+        if self.count:
+            interval = received - self.received
+            if self.count == 1:
+                self.interval = interval
+            else:
+                self.interval += RATE_SMOOTHING * (interval - self.interval)
+        self.timestamp = timestamp
+        self.received = received
+        self.count += 1
+
+    def extend(self, timestamps: np.ndarray, received: np.ndarray):
+        """Several updates at once (the same as updating with each in turn)"""
+        # The first interval starts the average
+        first = 0
+        while first < len(received) and self.count < 2:
+            self.update(float(timestamps[first]), float(received[first]))
+            first += 1
+        if first == len(received):
+            return
+        intervals = np.diff(received[first:], prepend=self.received)
+        decay = 1.0 - RATE_SMOOTHING
+        weights = RATE_SMOOTHING * decay ** np.arange(len(intervals) - 1, -1, -1)
+        self.interval = self.interval * decay ** len(intervals) + float(
+            weights @ intervals
+        )
+        self.timestamp = float(timestamps[-1])
+        self.received = float(received[-1])
+        self.count += len(intervals)
+
+    def age(self, now: Optional[float] = None) -> float:
+        """Seconds since the value was received"""
+        if now is None:
+            now = time.monotonic()
+        return now - self.received
+
+    def rate(self) -> float:
+        """The effective update rate (in Hz)"""
+        return 1.0 / self.interval if self.interval > 0 else 0.0
+
+    def is_stale(
+        self, now: Optional[float] = None, stale_after: float = STALE_AFTER
+    ) -> bool:
+        if self.count < 2:
+            return False
+        return self.age(now) > max(stale_after, STALE_INTERVALS * self.interval)
+
+
+class ValueTracker:
+    """
+    The receive timestamp and sample count of every state value and parameter of a motor.
+    Updated from the receive path, before the message is passed on to the motor.
+    """
+
+    stamps: Dict[str, ValueStamp]
+
+    def __init__(self):
+        self.stamps = {name: ValueStamp() for name in STATE_NAMES}
+
+    def get(self, name: str) -> Optional[ValueStamp]:
+        """The stamp of a value, or None if it was never received"""
+        stamp = self.stamps.get(name)
+        return stamp if stamp is not None and stamp.count else None
+
+    def update(self, name: str, timestamp: float, received: float):
+        stamp = self.stamps.get(name)
+        if stamp is None:
+            stamp = self.stamps[name] = ValueStamp()
+        stamp.update(timestamp, received)
+
+    def extend(self, name: str, timestamps: np.ndarray, received: np.ndarray):
+        """Several updates of one value at once"""
+        stamp = self.stamps.get(name)
+        if stamp is None:
+            stamp = self.stamps[name] = ValueStamp()
+        stamp.extend(timestamps, received)
+
+    def message_received(self, msg: can.Message):
+        mode = (msg.arbitration_id >> MODE_SHIFT) & MODE_MASK
+        if mode == Command.STATE.value:
+            received = time.monotonic()
+            for name in STATE_NAMES:
+                self.stamps[name].update(msg.timestamp, received)
+        elif mode in PARAMETER_READ_MODES and len(msg.data) >= 8:
+            _, name, _ = decode_parameter(msg.data)
+            if name is not None:
+                self.update(name, msg.timestamp, time.monotonic())
+
+
+def format_age(age: float) -> str:
+    if age < 1.0:
+        return f"{age * 1000:.0f} ms"
+    return f"{age:.1f} s"
+
+
+def format_rate(rate: float) -> str:
+    if rate <= 0:
+        return "-"
+    return f"{rate:.1f} Hz"
@@ -1,6 +1,44 @@
 import can
 import time
 import sys
+import queue
+import struct
+import threading
+from typing import Iterable, List, Optional
+
+from CyberGearDriver.constants import Command
+
+from CyberGearDashboard.bus_stats import BusStatistics, format_statistics
+from CyberGearDashboard.protocol import (
+    COMMAND_NAMES,
+    DATA_SHIFT,
+    DATA_MASK,
+    FEEDBACK_FAULT_SHIFT,
+    FEEDBACK_FAULT_MASK,
+    FEEDBACK_FAULT_TEXT,
+    MODE_SHIFT,
+    MODE_MASK,
+    MODE_STATUS_SHIFT,
+    MODE_STATUS_MASK,
+    MODE_STATUS_NAMES,
+    MOTOR_ID_MASK,
+    RES_SHIFT,
+    RES_MASK,
+    UNIQUE_ID_STRUCT,
+    decode_control,
+    decode_faults,
+    decode_feedback,
+    decode_parameter,
+    is_reply,
+)
+
+# High-throughput mode: lines are handed to the writer thread in batches of this size,
+# or after this many seconds, whichever comes first
+BATCH_SIZE = 256
+FLUSH_INTERVAL = 0.05
+
+# How many batches can wait for the writer, before output is dropped
+MAX_PENDING_BATCHES = 4096
 
 
 class ExCanIdInfo:
@@ -16,14 +54,330 @@ class ExCanIdInfo:
     def from_int(cls, value):
         """Create an ExCanIdInfo from a 32-bit value"""
         result = cls()
-        result.id = value & 0xFF
-        result.data = (value >> 8) & 0xFFFF
-        result.mode = (value >> 24) & 0x1F
-        result.res = (value >> 29) & 0x7
+        result.id = value & MOTOR_ID_MASK
+        result.data = (value >> DATA_SHIFT) & DATA_MASK
+        result.mode = (value >> MODE_SHIFT) & MODE_MASK
+        result.res = (value >> RES_SHIFT) & RES_MASK
         return result
 
 
-def can_listener(interface="slcan", channel="COM3", bitrate=1000000, timeout=None):
+def describe_route(arbitration_id: int) -> str:
+    """Which motor the message was sent to or from"""
+    if is_reply(arbitration_id):
+        return f"from {(arbitration_id >> DATA_SHIFT) & 0xFF:3d}"
+    return f"to   {arbitration_id & MOTOR_ID_MASK:3d}"
+
+
+def decode_device_id(arbitration_id: int, data: bytes) -> str:
+    route = describe_route(arbitration_id)
+    if is_reply(arbitration_id):
+        return f"{route} unique_id={UNIQUE_ID_STRUCT.unpack_from(data)[0]:016X}"
+    return f"{route} request"
+
+
+def decode_control_message(arbitration_id: int, data: bytes) -> str:
+    position, velocity, torque, kp, kd = decode_control(arbitration_id, data)
+    return (
+        f"{describe_route(arbitration_id)} position={position:.3f} velocity={velocity:.3f} "
+        f"torque={torque:.3f} kp={kp:.3f} kd={kd:.3f}"
+    )
+
+
+def decode_feedback_message(arbitration_id: int, data: bytes) -> str:
+    route = describe_route(arbitration_id)
+    if not is_reply(arbitration_id):
+        return f"{route} request"
+    position, velocity, torque, temperature = decode_feedback(data)
+    status = MODE_STATUS_NAMES[(arbitration_id >> MODE_STATUS_SHIFT) & MODE_STATUS_MASK]
+    faults = FEEDBACK_FAULT_TEXT[
+        (arbitration_id >> FEEDBACK_FAULT_SHIFT) & FEEDBACK_FAULT_MASK
+    ]
+    return (
+        f"{route} position={position:.3f} velocity={velocity:.3f} torque={torque:.3f} "
+        f"temperature={temperature:.1f} status={status}"
+        + (f" faults=[{faults}]" if faults else "")
+    )
+
+
+def decode_parameter_message(arbitration_id: int, data: bytes) -> str:
+    addr, name, value = decode_parameter(data)
+    label = name or f"0x{addr:04X}"
+    route = describe_route(arbitration_id)
+    mode = (arbitration_id >> MODE_SHIFT) & MODE_MASK
+    is_read_request = mode in READ_REQUESTS and not is_reply(arbitration_id)
+    if is_read_request or value is None:
+        return f"{route} {label}"
+    return f"{route} {label}={value:.6g}"
+
+
+def decode_fault_message(arbitration_id: int, data: bytes) -> str:
+    route = describe_route(arbitration_id)
+    if not is_reply(arbitration_id):
+        return f"{route} request"
+    active, overload = decode_faults(data)
+    if overload:
+        active = active + (f"Overload ({overload})",)
+    return f"{route} faults=[{', '.join(active)}]"
+
+
+def decode_simple_message(arbitration_id: int, data: bytes) -> str:
+    return describe_route(arbitration_id)
+
+
+READ_REQUESTS = (Command.READ_PARAM_LOWER.value, Command.READ_PARAM_UPPER.value)
+
+# Decoders for each communication type, indexed by the mode field
+_decoders = {
+    Command.GET_DEVICE_ID: decode_device_id,
+    Command.POSITION: decode_control_message,
+    Command.STATE: decode_feedback_message,
+    Command.ENABLE: decode_simple_message,
+    Command.STOP: decode_simple_message,
+    Command.SET_ZERO: decode_simple_message,
+    Command.CHANGE_CAN_ID: decode_simple_message,
+    Command.WRITE_PARAM_LOWER: decode_parameter_message,
+    Command.READ_PARAM_LOWER: decode_parameter_message,
+    Command.READ_PARAM_UPPER: decode_parameter_message,
+    Command.WRITE_PARAM_UPPER: decode_parameter_message,
+    Command.FAULT: decode_fault_message,
+}
+_decoders_by_mode = {command.value: decoder for command, decoder in _decoders.items()}
+DECODERS = tuple(_decoders_by_mode.get(mode) for mode in range(MODE_MASK + 1))
+
+
+def build_can_filters(
+    motor_ids: Optional[Iterable[int]] = None, modes: Optional[Iterable[int]] = None
+) -> Optional[List[dict]]:
+    """
+    Build hardware/kernel CAN filters that only pass messages for some motor IDs and/or modes.
+    A motor ID matches messages sent to the motor (bits 7~0) and from it (bits 15~8).
+    """
+    if not motor_ids and not modes:
+        return None
+
+    id_filters = [(0, 0)]
+    if motor_ids:
+        id_filters = []
+        for motor_id in motor_ids:
+            id_filters.append((motor_id, 0xFF))
+            id_filters.append((motor_id << 8, 0xFF00))
+
+    mode_filters = [(0, 0)]
+    if modes:
+        mode_filters = [(mode << 24, 0x1F << 24) for mode in modes]
+
+    return [
+        {"can_id": id | mode, "can_mask": id_mask | mode_mask, "extended": True}
+        for (id, id_mask) in id_filters
+        for (mode, mode_mask) in mode_filters
+    ]
+
+
+class OutputWriter(threading.Thread):
+    """Writes batches of lines from a background thread, so printing never holds up receiving"""
+
+    def __init__(self, stream=None, max_batches=MAX_PENDING_BATCHES):
+        super().__init__(daemon=True)
+        self.stream = stream if stream is not None else sys.stdout
+        self.queue = queue.Queue(maxsize=max_batches)
+        self.dropped = 0
+        self.written = 0
+
+    def write(self, lines: List[str]):
+        """Queue lines for output. If the writer has fallen too far behind, they are dropped."""
+        try:
+            self.queue.put_nowait(lines)
+        except queue.Full:
+            self.dropped += len(lines)
+
+    def close(self):
+        """Write everything that is queued and stop"""
+        self.queue.put(None)
+        self.join()
+
+    def run(self):
+        while True:
+            lines = self.queue.get()
+            if lines is None:
+                break
+            self.stream.write("".join(lines))
+            self.stream.flush()
+            self.written += len(lines)
+
+
+def format_compact(message: can.Message) -> str:
+    """Format a message on a single line: timestamp, motor ID, data field, mode and data"""
+    arbitration_id = message.arbitration_id
+    return "{:.6f} {:3d} {:04X} {:2d} {}\n".format(
+        message.timestamp,
+        arbitration_id & 0xFF,
+        (arbitration_id >> 8) & 0xFFFF,
+        (arbitration_id >> 24) & 0x1F,
+        message.data.hex(" ").upper(),
+    )
+
+
+def format_decoded(message: can.Message) -> str:
+    """Format a message on a single line, decoded into protocol values"""
+    arbitration_id = message.arbitration_id
+    mode = (arbitration_id >> MODE_SHIFT) & MODE_MASK
+    decoder = DECODERS[mode]
+    try:
+        if decoder is None:
+            details = message.data.hex(" ").upper()
+        else:
+            details = decoder(arbitration_id, message.data)
+    except struct.error:
+        details = f"[{message.data.hex(' ').upper()}] (too short)"
+    return f"{message.timestamp:.6f} {COMMAND_NAMES[mode]:<17} {details}\n"
+
+
+def fast_listener(
+    interface="slcan",
+    channel="COM3",
+    bitrate=1000000,
+    timeout=None,
+    can_filters=None,
+    stats_interval=None,
+    decode=False,
+):
+    """
+    Listen for CAN messages in high-throughput mode, one compact line per message
+
+    Parameters:
+    - interface: CAN interface type (default 'slcan')
+    - channel: CAN channel (default 'COM3', common for slcan on Windows)
+    - bitrate: CAN bus bitrate
+    - timeout: How long to listen in seconds (None = indefinitely)
+    - can_filters: Filters passed to the CAN interface (see `build_can_filters`)
+    - stats_interval: How often to print throughput counters to stderr, in seconds (None = never)
+    - decode: Decode the CyberGear protocol values, instead of printing the raw fields
+    """
+    format_message = format_decoded if decode else format_compact
+    writer = OutputWriter()
+    writer.start()
+    msg_count = 0
+    try:
+        bus = can.interface.Bus(
+            channel=channel,
+            interface=interface,
+            bitrate=bitrate,
+            can_filters=can_filters,
+        )
+        print(f"Listening on {interface} {channel}...", file=sys.stderr)
+
+        recv = bus.recv
+        batch = []
+        start_time = time.monotonic()
+        last_flush = start_time
+        last_stats = start_time
+        last_count = 0
+        while timeout is None or time.monotonic() - start_time < timeout:
+            message = recv(FLUSH_INTERVAL)
+            if message is not None:
+                msg_count += 1
+                batch.append(format_message(message))
+
+            now = time.monotonic()
+            if batch and (
+                len(batch) >= BATCH_SIZE
+                or message is None
+                or now - last_flush >= FLUSH_INTERVAL
+            ):
+                writer.write(batch)
+                batch = []
+                last_flush = now
+
+            if stats_interval and now - last_stats >= stats_interval:
+                rate = (msg_count - last_count) / (now - last_stats)
+                print(
+                    f"[stats] received: {msg_count}, {rate:.0f} msg/s, "
+                    f"written: {writer.written}, dropped: {writer.dropped}",
+                    file=sys.stderr,
+                )
+                last_stats = now
+                last_count = msg_count
+
+        if batch:
+            writer.write(batch)
+    except KeyboardInterrupt:
+        print("\nListener stopped by user", file=sys.stderr)
+    except can.CanError as e:
+        print(f"CAN Error: {e}", file=sys.stderr)
+    finally:
+        writer.close()
+        if "bus" in locals():
+            bus.shutdown()
+            print(
+                f"CAN interface closed ({msg_count} messages, {writer.dropped} dropped)",
+                file=sys.stderr,
+            )
+
+
+def stats_listener(
+    interface="slcan",
+    channel="COM3",
+    bitrate=1000000,
+    timeout=None,
+    can_filters=None,
+    stats_interval=1.0,
+):
+    """
+    Listen for CAN messages and print bus statistics: load, frame rates and jitter per motor
+
+    Parameters:
+    - interface: CAN interface type (default 'slcan')
+    - channel: CAN channel (default 'COM3', common for slcan on Windows)
+    - bitrate: CAN bus bitrate
+    - timeout: How long to listen in seconds (None = indefinitely)
+    - can_filters: Filters passed to the CAN interface (see `build_can_filters`)
+    - stats_interval: How often to print the statistics, in seconds
+    """
+    stats = BusStatistics(bitrate)
+    try:
+        bus = can.interface.Bus(
+            channel=channel,
+            interface=interface,
+            bitrate=bitrate,
+            can_filters=can_filters,
+        )
+        print(f"Listening on {interface} {channel}...")
+
+        recv = bus.recv
+        message_received = stats.message_received
+        start_time = time.monotonic()
+        last_stats = start_time
+        while timeout is None or time.monotonic() - start_time < timeout:
+            message = recv(stats_interval)
+            if message is not None:
+                message_received(message)
+
+            now = time.monotonic()
+            if now - last_stats >= stats_interval:
+                print(format_statistics(stats))
+                print("")
+                sys.stdout.flush()
+                last_stats = now
+
+    except KeyboardInterrupt:
+        print("\nListener stopped by user")
+    except can.CanError as e:
+        print(f"CAN Error: {e}")
+    finally:
+        if "bus" in locals():
+            bus.shutdown()
+            print(format_statistics(stats))
+            print("CAN interface closed")
+
+
+def can_listener(
+    interface="slcan",
+    channel="COM3",
+    bitrate=1000000,
+    timeout=None,
+    can_filters=None,
+    decode=False,
+):
     """
     Listen for CAN messages and print details
 
@@ -32,10 +386,14 @@ def can_listener(interface="slcan", channel="COM3", bitrate=1000000, timeout=Non
     - channel: CAN channel (default 'COM3', common for slcan on Windows)
     - bitrate: CAN bus bitrate
     - timeout: How long to listen in seconds (None = indefinitely)
+    - can_filters: Filters passed to the CAN interface (see `build_can_filters`)
+    - decode: Also print the decoded CyberGear protocol values
     """
     try:
         # Set up CAN bus
-        bus = can.interface.Bus(channel=channel, bustype=interface, bitrate=bitrate)
+        bus = can.interface.Bus(
+            channel=channel, bustype=interface, bitrate=bitrate, can_filters=can_filters
+        )
         print(f"Listening on {interface} {channel}...")
 
         start_time = time.time()
@@ -61,6 +419,8 @@ def can_listener(interface="slcan", channel="COM3", bitrate=1000000, timeout=Non
                 print(f"  Arbitration ID data field: {id_info.data}")
                 print(f"  Reserved bits: {id_info.res}")
                 print(f"  Data: [{data_hex}]")
+                if decode:
+                    print(f"  Decoded: {format_decoded(message).strip()}")
                 print("")
 
                 # Flush output to ensure real-time display
@@ -101,13 +461,69 @@ if __name__ == "__main__":
         default=None,
         help="Listening timeout in seconds (default: None)",
     )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="High-throughput mode: one compact line per message, written from a background thread",
+    )
+    parser.add_argument(
+        "--motor-id",
+        type=int,
+        nargs="+",
+        help="Only show messages to/from these motor IDs (filtered by the CAN interface)",
+    )
+    parser.add_argument(
+        "--mode",
+        type=int,
+        nargs="+",
+        help="Only show messages with these communication types/modes (filtered by the CAN interface)",
+    )
+    parser.add_argument(
+        "--decode",
+        action="store_true",
+        help="Decode the CyberGear protocol: message types, parameter names and feedback values",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Statistics mode: print the bus load, frame rates and jitter per motor and message type",
+    )
+    parser.add_argument(
+        "--stats-interval",
+        type=float,
+        default=None,
+        help="How often to print statistics (--stats) or throughput counters (--fast), in seconds",
+    )
 
     args = parser.parse_args()
+    can_filters = build_can_filters(args.motor_id, args.mode)
 
     # Run the listener with provided arguments
-    can_listener(
-        interface=args.interface,
-        channel=args.channel,
-        bitrate=args.bitrate,
-        timeout=args.timeout,
-    )
+    if args.stats:
+        stats_listener(
+            interface=args.interface,
+            channel=args.channel,
+            bitrate=args.bitrate,
+            timeout=args.timeout,
+            can_filters=can_filters,
+            stats_interval=args.stats_interval or 1.0,
+        )
+    elif args.fast:
+        fast_listener(
+            interface=args.interface,
+            channel=args.channel,
+            bitrate=args.bitrate,
+            timeout=args.timeout,
+            can_filters=can_filters,
+            stats_interval=args.stats_interval,
+            decode=args.decode,
+        )
+    else:
+        can_listener(
+            interface=args.interface,
+            channel=args.channel,
+            bitrate=args.bitrate,
+            timeout=args.timeout,
+            can_filters=can_filters,
+            decode=args.decode,
+        )
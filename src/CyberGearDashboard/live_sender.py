@@ -0,0 +1,73 @@
+import time
+import threading
+from typing import Callable, Dict, Hashable
+
+from CyberGearDriver import CyberMotorMessage
+
+# Default and allowed maximum send rates for live mode (in Hz)
+DEFAULT_LIVE_RATE = 20
+MIN_LIVE_RATE = 1
+MAX_LIVE_RATE = 200
+
+
+class LiveSender(threading.Thread):
+    """
+    Sends value changes from the UI in the background, coalesced and throttled.
+
+    Each value has a key (i.e. the parameter name). Only the most recent message for each
+    key is kept, and they're sent at most `max_rate` times per second, so dragging a slider
+    never queues up stale values or floods the bus. `update` never blocks.
+    """
+
+    send: Callable[[CyberMotorMessage], None]
+    max_rate: float
+    pending: Dict[Hashable, CyberMotorMessage]
+    sent: int
+    coalesced: int
+
+    def __init__(
+        self,
+        send: Callable[[CyberMotorMessage], None],
+        max_rate: float = DEFAULT_LIVE_RATE,
+    ):
+        super().__init__(daemon=True)
+        self.send = send
+        self.max_rate = max_rate
+        self.pending = {}
+        self.sent = 0
+        self.coalesced = 0
+        self.lock = threading.Lock()
+        self._changed = threading.Event()
+        self._stopping = threading.Event()
+
+    def update(self, key: Hashable, message: CyberMotorMessage):
+        """Queue a message, replacing any message for the same key that hasn't been sent yet"""
+        with self.lock:
+            if key in self.pending:
+                self.coalesced += 1
+            self.pending[key] = message
+        self._changed.set()
+
+    def stop(self):
+        """Stop sending (anything still pending is dropped)"""
+        self._stopping.set()
+        self._changed.set()
+
+    def run(self):
+        next_send = 0.0
+        while not self._stopping.is_set():
+            self._changed.wait()
+
+            # Throttle: hold the changes until the next send slot
+            delay = next_send - time.perf_counter()
+            if delay > 0 and self._stopping.wait(delay):
+                break
+
+            with self.lock:
+                self._changed.clear()
+                messages = list(self.pending.values())
+                self.pending = {}
+            for message in messages:
+                self.send(message)
+            self.sent += len(messages)
+            next_send = time.perf_counter() + 1.0 / self.max_rate
@@ -1,4 +1,5 @@
 from numbers import Real
+from typing import Optional
 from PySide6.QtCore import QSortFilterProxyModel, QTimer
 from PySide6.QtGui import QIcon
 from PySide6.QtWidgets import (
@@ -20,6 +21,8 @@ from CyberGearDriver.parameters import (
     READ_WRITE,
 )
 
+from CyberGearDashboard.freshness import ValueTracker
+
 from .table_model import ParameterTableModel
 
 REFRESH_RATE_MS = 500
@@ -27,14 +30,22 @@ REFRESH_RATE_MS = 500
 
 class ParametersTableDock(QDockWidget):
     motor: CyberGearMotor
+    tracker: Optional[ValueTracker]
     model: ParameterTableModel
     table: QTableView
     filtered_model: QSortFilterProxyModel
     last_data: dict
 
-    def __init__(self, motor: CyberGearMotor, *args, **kwargs):
+    def __init__(
+        self,
+        motor: CyberGearMotor,
+        tracker: Optional[ValueTracker] = None,
+        *args,
+        **kwargs,
+    ):
         super().__init__(*args, **kwargs)
         self.motor = motor
+        self.tracker = tracker
         self.type = type
         self.last_data = {}
 
@@ -43,6 +54,7 @@ class ParametersTableDock(QDockWidget):
             get_value=self.get_value,
             on_change=self.change_param,
             can_edit=self.can_edit,
+            get_stamp=tracker.get if tracker is not None else None,
         )
         self.filtered_model = QSortFilterProxyModel()
         self.filtered_model.setSourceModel(self.model)
@@ -51,7 +63,6 @@ class ParametersTableDock(QDockWidget):
         timer.timeout.connect(self.check_for_updates)
         timer.start(REFRESH_RATE_MS)
 
-        self.reload()
         self.build_layout()
 
     def get_data(self):
@@ -74,6 +85,7 @@ class ParametersTableDock(QDockWidget):
             if prev_value is None or value != prev_value:
                 self.model.data_did_change(name)
         self.last_data = data
+        self.model.refresh_ages()
 
     def change_param(self, name: str, value: Real):
         """Change the parameter value for the given name"""
@@ -1,6 +1,11 @@
 from numbers import Real
-from typing import List, Callable
+from typing import List, Callable, Optional
 from PySide6.QtCore import QAbstractTableModel, Qt
+from PySide6.QtGui import QColor
+
+from CyberGearDashboard.freshness import ValueStamp, format_age, format_rate
+
+STALE_COLOR = QColor(255, 170, 80)
 
 
 class ParameterTableModel(QAbstractTableModel):
@@ -9,8 +14,9 @@ class ParameterTableModel(QAbstractTableModel):
     get_value: Callable[[str], Real]
     on_change: Callable[[str, Real], None]
     can_edit: Callable[[str, bool], None]
+    get_stamp: Optional[Callable[[str], Optional[ValueStamp]]]
 
-    headers = ("Name", "Value")
+    headers = ("Name", "Value", "Age", "Rate", "Samples")
 
     def __init__(
         self,
@@ -18,11 +24,13 @@ class ParameterTableModel(QAbstractTableModel):
         get_value: Callable[[str], Real],
         on_change: Callable[[str, Real], None],
         can_edit: Callable[[str, bool], None],
+        get_stamp: Optional[Callable[[str], Optional[ValueStamp]]] = None,
     ):
         super().__init__()
         self.get_value = get_value
         self.on_change = on_change
         self.can_edit = can_edit
+        self.get_stamp = get_stamp
 
         self.name_list = name_list
         self.name_list.sort()
@@ -35,27 +43,47 @@ class ParameterTableModel(QAbstractTableModel):
         # Let the table know to reload the data row
         idx = self.name_list.index(name)
         if idx > -1:
-            data_index = self.index(idx, len(self.headers) - 1)
+            data_index = self.index(idx, 1)
             self.dataChanged.emit(data_index, data_index)
 
+    def refresh_ages(self):
+        """The ages keep changing, even when the values don't"""
+        if self.get_stamp is not None and self.name_list:
+            self.dataChanged.emit(
+                self.index(0, 1),
+                self.index(len(self.name_list) - 1, len(self.headers) - 1),
+            )
+
     def rowCount(self, index):
         return len(self.name_list)
 
     def columnCount(self, parent=None):
-        return len(self.headers)
+        return len(self.headers) if self.get_stamp is not None else 2
 
     def data(self, index, role=Qt.DisplayRole):
+        col = index.column()
+        row = index.row()
+        name = self.name_list[row]
+        stamp = self.get_stamp(name) if self.get_stamp is not None else None
         if role == Qt.DisplayRole:
-            col = index.column()
-            row = index.row()
-            name = self.name_list[row]
             if col == 0:
                 return name
-            else:
+            elif col == 1:
                 value = self.get_value(name)
                 if value is None:
                     return value
                 return "{:.3f}".format(value)  # Format to 3 decimal positions
+            elif stamp is None:
+                return None
+            elif col == 2:
+                return format_age(stamp.age())
+            elif col == 3:
+                return format_rate(stamp.rate())
+            elif col == 4:
+                return stamp.count
+        elif role == Qt.BackgroundRole and col > 0:
+            if stamp is not None and stamp.is_stale():
+                return STALE_COLOR
         return None
 
     def headerData(self, section, orientation, role=Qt.DisplayRole):
@@ -0,0 +1,281 @@
+import struct
+from typing import Dict, Optional, Tuple
+
+from CyberGearDriver import CyberGearMotor, CyberMotorMessage, ParameterName
+from CyberGearDriver.constants import (
+    Command,
+    DataType,
+    DEFAULT_HOST_CAN_ID,
+    PARAM_UPPER_ADDR,
+    P_MIN,
+    P_MAX,
+    V_MIN,
+    V_MAX,
+    T_MIN,
+    T_MAX,
+    KP_MIN,
+    KP_MAX,
+    KD_MIN,
+    KD_MAX,
+)
+from CyberGearDriver.parameters import Parameters
+from CyberGearDriver.utils import encode_to_bytes, float_to_uint
+
+# Extended arbitration ID layout (the same fields as `listen.ExCanIdInfo`)
+MOTOR_ID_MASK = 0xFF  # bits 7~0 - destination (or host) ID
+DATA_SHIFT = 8  # bits 23~8 - data field, the sender's ID is in bits 15~8
+DATA_MASK = 0xFFFF
+MODE_SHIFT = 24  # bits 28~24 - communication type
+MODE_MASK = 0x1F
+RES_SHIFT = 29  # bits 31~29 - reserved
+RES_MASK = 0x7
+
+# Motors reply to a device ID request with this in the destination ID field
+DEVICE_ID_REPLY = 0xFE
+
+# Messages sent from a motor are addressed to the host, or are a device ID reply
+REPLY_DESTINATIONS = (DEFAULT_HOST_CAN_ID, DEVICE_ID_REPLY)
+
+# Parameter addresses (and full definitions) by name, so building a message doesn't scan the
+# parameter table
+PARAMETER_ADDRESSES = {name: addr for addr, name, _, _, _ in Parameters}
+PARAMETERS_BY_NAME = {param[1]: param for param in Parameters}
+
+EMPTY_DATA = bytes(8)
+
+# Communication types that can't make a motor move, so they can still be sent after an
+# emergency stop
+SAFE_COMMANDS = frozenset(
+    command.value
+    for command in (
+        Command.GET_DEVICE_ID,
+        Command.STATE,
+        Command.STOP,
+        Command.READ_PARAM_LOWER,
+        Command.READ_PARAM_UPPER,
+        Command.FAULT,
+    )
+)
+
+# Communication type names, indexed by the mode field
+_command_names = {command.value: command.name for command in Command}
+COMMAND_NAMES = tuple(
+    _command_names.get(mode, f"TYPE_{mode}") for mode in range(MODE_MASK + 1)
+)
+
+# Unpackers for each parameter value type
+DATA_TYPE_STRUCTS = {
+    DataType.UINT8: struct.Struct("<B"),
+    DataType.UINT16: struct.Struct("<H"),
+    DataType.INT16: struct.Struct("<h"),
+    DataType.UINT32: struct.Struct("<I"),
+    DataType.INT32: struct.Struct("<i"),
+    DataType.FLOAT: struct.Struct("<f"),
+}
+
+# Parameter names and value unpackers, by address
+PARAMETER_NAMES: Dict[int, str] = {addr: name for addr, name, _, _, _ in Parameters}
+PARAMETER_STRUCTS: Dict[int, struct.Struct] = {
+    addr: DATA_TYPE_STRUCTS[data_type]
+    for addr, _, data_type, _, _ in Parameters
+    if data_type in DATA_TYPE_STRUCTS
+}
+
+# Message data layouts
+FEEDBACK_STRUCT = struct.Struct(">HHHH")  # position, velocity, torque, temperature
+CONTROL_STRUCT = struct.Struct(">HHHH")  # position, velocity, kp, kd
+PARAMETER_ADDR_STRUCT = struct.Struct("<H")
+FAULT_STRUCT = struct.Struct("<I")
+UNIQUE_ID_STRUCT = struct.Struct("<Q")
+
+# Scale raw 16-bit values back to floats: value * scale + min
+UINT16_MAX = 0xFFFF
+POSITION_SCALE = (P_MAX - P_MIN) / UINT16_MAX
+VELOCITY_SCALE = (V_MAX - V_MIN) / UINT16_MAX
+TORQUE_SCALE = (T_MAX - T_MIN) / UINT16_MAX
+KP_SCALE = (KP_MAX - KP_MIN) / UINT16_MAX
+KD_SCALE = (KD_MAX - KD_MIN) / UINT16_MAX
+TEMPERATURE_SCALE = 0.1
+
+# Feedback frames carry fault flags and the mode status in the data field of the arbitration ID
+FEEDBACK_FAULT_SHIFT = 16
+FEEDBACK_FAULT_MASK = 0x3F
+FEEDBACK_FAULT_NAMES = (
+    "Under voltage",
+    "Over current",
+    "Over temperature",
+    "Magnetic encoder failure",
+    "Hall encoder failure",
+    "Encoder not calibrated",
+)
+MODE_STATUS_SHIFT = 22
+MODE_STATUS_MASK = 0x3
+MODE_STATUS_NAMES = ("reset", "calibration", "run", "unknown")
+
+# Fault bits in the data of a fault feedback message (the overload bits 15~8 are handled separately)
+FAULT_BITS = (
+    (0, "Over temperature"),
+    (1, "Driver chip"),
+    (2, "Under voltage"),
+    (3, "Over voltage"),
+    (4, "Phase B over current"),
+    (5, "Phase C over current"),
+    (7, "Encoder not calibrated"),
+    (16, "Phase A over current"),
+)
+OVERLOAD_SHIFT = 8
+OVERLOAD_MASK = 0xFF
+
+# The active feedback fault names for every combination of the fault bits
+FEEDBACK_FAULT_TEXT = tuple(
+    ", ".join(
+        name for bit, name in enumerate(FEEDBACK_FAULT_NAMES) if flags & (1 << bit)
+    )
+    for flags in range(FEEDBACK_FAULT_MASK + 1)
+)
+
+
+def arbitration_id(command: Command, motor_id: int, extended_data: int = 0) -> int:
+    """Encode an extended arbitration ID for a message to a motor"""
+    return (command.value << MODE_SHIFT) | (extended_data << DATA_SHIFT) | motor_id
+
+
+def sender_id(arbitration_id: int) -> int:
+    """The ID of the motor that sent a message (bits 15~8)"""
+    return (arbitration_id >> DATA_SHIFT) & 0xFF
+
+
+def is_reply(arbitration_id: int) -> bool:
+    """Whether the message was sent by a motor"""
+    return (arbitration_id & MOTOR_ID_MASK) in REPLY_DESTINATIONS
+
+
+def motor_id_of(arbitration_id: int) -> int:
+    """The motor a message was sent to or from"""
+    if is_reply(arbitration_id):
+        return (arbitration_id >> DATA_SHIFT) & 0xFF
+    return arbitration_id & MOTOR_ID_MASK
+
+
+def state_request(motor: CyberGearMotor) -> CyberMotorMessage:
+    """The message that requests the motor state"""
+    return CyberMotorMessage(
+        arbitration_id=arbitration_id(Command.STATE, motor.motor_id),
+        data=EMPTY_DATA,
+    )
+
+
+def stop_request(motor: CyberGearMotor) -> CyberMotorMessage:
+    """The message that stops (disables) the motor"""
+    return CyberMotorMessage(
+        arbitration_id=arbitration_id(Command.STOP, motor.motor_id, motor.host_id),
+        data=EMPTY_DATA,
+    )
+
+
+def fault_request(motor: CyberGearMotor) -> CyberMotorMessage:
+    """The message that requests the motor fault status"""
+    return CyberMotorMessage(
+        arbitration_id=arbitration_id(Command.FAULT, motor.motor_id),
+        data=EMPTY_DATA,
+    )
+
+
+def parameter_request(
+    motor: CyberGearMotor, param_name: ParameterName
+) -> CyberMotorMessage:
+    """The message that requests a parameter value"""
+    addr = PARAMETER_ADDRESSES[param_name]
+    command = (
+        Command.READ_PARAM_UPPER
+        if addr >= PARAM_UPPER_ADDR
+        else Command.READ_PARAM_LOWER
+    )
+    data = bytearray(8)
+    data[0:2] = addr.to_bytes(2, byteorder="little")
+    return CyberMotorMessage(
+        arbitration_id=arbitration_id(command, motor.motor_id),
+        data=data,
+    )
+
+
+def parameter_write(
+    motor: CyberGearMotor, param_name: ParameterName, value: float
+) -> CyberMotorMessage:
+    """The message that writes a parameter value (the same as `motor.set_parameter`)"""
+    addr, _, data_type, range, _ = PARAMETERS_BY_NAME[param_name]
+    data = bytearray(4)
+    data[0:2] = addr.to_bytes(2, byteorder="little")
+    data[2] = data_type.value if addr < PARAM_UPPER_ADDR else 0x00
+    data.extend(encode_to_bytes(value, data_type, range))
+    command = (
+        Command.WRITE_PARAM_UPPER
+        if addr >= PARAM_UPPER_ADDR
+        else Command.WRITE_PARAM_LOWER
+    )
+    return CyberMotorMessage(
+        arbitration_id=arbitration_id(command, motor.motor_id), data=data
+    )
+
+
+def control_message(
+    motor: CyberGearMotor,
+    position: float,
+    velocity: float,
+    torque: float,
+    kp: float,
+    kd: float,
+) -> CyberMotorMessage:
+    """The operation control message (the same as `motor.control`)"""
+    data = CONTROL_STRUCT.pack(
+        float_to_uint(position, P_MIN, P_MAX, 16),
+        float_to_uint(velocity, V_MIN, V_MAX, 16),
+        float_to_uint(kp, KP_MIN, KP_MAX, 16),
+        float_to_uint(kd, KD_MIN, KD_MAX, 16),
+    )
+    torque_value = float_to_uint(torque, T_MIN, T_MAX, 16)
+    return CyberMotorMessage(
+        arbitration_id=arbitration_id(Command.POSITION, motor.motor_id, torque_value),
+        data=data,
+    )
+
+
+def decode_feedback(data: bytes) -> Tuple[float, float, float, float]:
+    """Decode the position, velocity, torque and temperature from a feedback message"""
+    position, velocity, torque, temperature = FEEDBACK_STRUCT.unpack_from(data)
+    return (
+        position * POSITION_SCALE + P_MIN,
+        velocity * VELOCITY_SCALE + V_MIN,
+        torque * TORQUE_SCALE + T_MIN,
+        temperature * TEMPERATURE_SCALE,
+    )
+
+
+def decode_control(
+    arbitration_id: int, data: bytes
+) -> Tuple[float, float, float, float, float]:
+    """Decode the position, velocity, torque, kp and kd of an operation control message"""
+    position, velocity, kp, kd = CONTROL_STRUCT.unpack_from(data)
+    torque = (arbitration_id >> DATA_SHIFT) & DATA_MASK
+    return (
+        position * POSITION_SCALE + P_MIN,
+        velocity * VELOCITY_SCALE + V_MIN,
+        torque * TORQUE_SCALE + T_MIN,
+        kp * KP_SCALE + KP_MIN,
+        kd * KD_SCALE + KD_MIN,
+    )
+
+
+def decode_parameter(data: bytes) -> Tuple[int, Optional[str], Optional[float]]:
+    """Decode the address, name and value of a parameter read/write message"""
+    (addr,) = PARAMETER_ADDR_STRUCT.unpack_from(data)
+    unpacker = PARAMETER_STRUCTS.get(addr)
+    value = unpacker.unpack_from(data, 4)[0] if unpacker and len(data) >= 8 else None
+    return (addr, PARAMETER_NAMES.get(addr), value)
+
+
+def decode_faults(data: bytes) -> Tuple[Tuple[str, ...], int]:
+    """Decode the active fault names and the overload value of a fault feedback message"""
+    (flags,) = FAULT_STRUCT.unpack_from(data)
+    active = tuple(name for bit, name in FAULT_BITS if flags & (1 << bit))
+    return (active, (flags >> OVERLOAD_SHIFT) & OVERLOAD_MASK)
@@ -0,0 +1,52 @@
+import os
+import sys
+from PySide6.QtWidgets import (
+    QApplication,
+    QMainWindow,
+    QWidget,
+    QLabel,
+    QTabWidget,
+)
+
+from CyberGearDashboard.analysis.session import SessionFile
+from CyberGearDashboard.charts.replay import ReplayChartLayout
+
+
+class ReplayWindow(QMainWindow):
+    """Browse a recorded session, with a chart tab for each motor"""
+
+    session: SessionFile
+    chart_tabs: QTabWidget
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.session = SessionFile(path)
+        self.setWindowTitle(f"CyberGear Dashboard - {os.path.basename(path)}")
+        self.resize(900, 600)
+        self.build_layout()
+
+    def build_layout(self):
+        """Construct the layout"""
+        self.chart_tabs = QTabWidget()
+        self.chart_tabs.setTabBarAutoHide(True)
+        self.setCentralWidget(self.chart_tabs)
+
+        motor_ids = self.session.motor_ids()
+        for motor_id in motor_ids:
+            widget = QWidget()
+            widget.setLayout(ReplayChartLayout(self.session, motor_id))
+            self.chart_tabs.addTab(widget, f"Motor {motor_id}")
+
+        if not motor_ids:
+            self.chart_tabs.addTab(QLabel("No motor feedback in this session"), "")
+        size_mb = os.path.getsize(self.session.path) / 1e6
+        self.statusBar().addWidget(
+            QLabel(f"Replay: {self.session.path} ({size_mb:.1f} MB)")
+        )
+
+
+def openReplay(path: str):
+    app = QApplication(sys.argv)
+    window = ReplayWindow(path)
+    window.show()
+    app.exec()
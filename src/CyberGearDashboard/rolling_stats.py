@@ -0,0 +1,228 @@
+import math
+import threading
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+import can
+import numpy as np
+
+from CyberGearDriver.constants import Command
+
+from CyberGearDashboard.protocol import MODE_SHIFT, MODE_MASK, decode_feedback
+from CyberGearDashboard.freshness import STATE_NAMES
+
+# The default statistics window (in samples), 0 is everything since the last reset
+DEFAULT_WINDOW = 100
+
+
+def push_extremes(
+    extremes: Deque[Tuple[int, float]],
+    first: int,
+    values: np.ndarray,
+    window: int,
+    lowest: bool,
+):
+    """
+    Add a batch of samples (numbered from `first`) to a monotonic deque of the window's
+    minimum (or maximum) candidates, the same as `RollingStats.add` does one at a time:
+    a sample only stays while no later one is lower (higher) or equal.
+    """
+    skipped = max(len(values) - window, 0)
+    values = values[skipped:]
+    first += skipped
+    ranked = values if lowest else -values
+    best_after = np.append(np.minimum.accumulate(ranked[::-1])[::-1][1:], np.inf)
+    keep = np.nonzero(ranked < best_after)[0]
+    best = ranked.min()
+    while extremes and (extremes[-1][1] if lowest else -extremes[-1][1]) >= best:
+        extremes.pop()
+    extremes.extend(zip((keep + first).tolist(), values[keep].tolist()))
+    last = first + len(values) - 1
+    while extremes[0][0] <= last - window:
+        extremes.popleft()
+
+
+class RollingStats:
+    """
+    Min, max, mean, standard deviation and RMS of the last `window` samples (or of all
+    of them since the last reset, when `window` is 0), updated in O(1) per sample.
+
+    The sums are taken around the first sample, so the variance of a value with a large
+    offset (like the temperature) doesn't get lost to rounding. In a window, they're
+    recomputed once per window, so rounding errors of the removed samples don't build up.
+    """
+
+    window: int
+    count: int
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.index = 0
+        self.shift = 0.0
+        self.sum = 0.0
+        self.sum_sq = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.values: Deque[float] = deque()
+        # Monotonic deques of (index, value), the front is the window's min/max
+        self.mins: Deque[Tuple[int, float]] = deque()
+        self.maxs: Deque[Tuple[int, float]] = deque()
+
+    def add(self, value: float):
+        if self.index == 0:
+            self.shift = value
+        index = self.index
+        self.index += 1
+        x = value - self.shift
+        self.sum += x
+        self.sum_sq += x * x
+
+        window = self.window
+        if not window:
+            self.count += 1
+            self.minimum = min(self.minimum, value)
+            self.maximum = max(self.maximum, value)
+            return
+
+        values = self.values
+        values.append(x)
+        if len(values) > window:
+            old = values.popleft()
+            self.sum -= old
+            self.sum_sq -= old * old
+        if index % window == 0:
+            self.sum = math.fsum(values)
+            self.sum_sq = math.fsum(v * v for v in values)
+        self.count = len(values)
+
+        mins = self.mins
+        while mins and mins[-1][1] >= value:
+            mins.pop()
+        mins.append((index, value))
+        if mins[0][0] <= index - window:
+            mins.popleft()
+        maxs = self.maxs
+        while maxs and maxs[-1][1] <= value:
+            maxs.pop()
+        maxs.append((index, value))
+        if maxs[0][0] <= index - window:
+            maxs.popleft()
+        self.minimum = mins[0][1]
+        self.maximum = maxs[0][1]
+
+    def extend(self, values: np.ndarray):
+        """Add several samples at once (the same as adding them one at a time)"""
+        added = len(values)
+        if not added:
+            return
+        if self.index == 0:
+            self.shift = float(values[0])
+        first = self.index
+        self.index += added
+        x = values - self.shift
+
+        window = self.window
+        if not window:
+            self.count += added
+            self.sum += float(x.sum())
+            self.sum_sq += float(x @ x)
+            self.minimum = min(self.minimum, float(values.min()))
+            self.maximum = max(self.maximum, float(values.max()))
+            return
+
+        kept = self.values
+        if first % window == 0 or first // window != (self.index - 1) // window:
+            # The batch reaches a recompute point (see `add`)
+            kept.extend(x[-window:].tolist())
+            while len(kept) > window:
+                kept.popleft()
+            self.sum = math.fsum(kept)
+            self.sum_sq = math.fsum(v * v for v in kept)
+        else:
+            kept.extend(x.tolist())
+            removed = [kept.popleft() for _ in range(len(kept) - window)]
+            self.sum += float(x.sum()) - sum(removed)
+            self.sum_sq += float(x @ x) - sum(v * v for v in removed)
+        self.count = len(kept)
+
+        push_extremes(self.mins, first, values, window, lowest=True)
+        push_extremes(self.maxs, first, values, window, lowest=False)
+        self.minimum = self.mins[0][1]
+        self.maximum = self.maxs[0][1]
+
+    @property
+    def mean(self) -> float:
+        if not self.count:
+            return math.nan
+        return self.shift + self.sum / self.count
+
+    @property
+    def std(self) -> float:
+        """The (population) standard deviation"""
+        if not self.count:
+            return math.nan
+        mean = self.sum / self.count
+        return math.sqrt(max(self.sum_sq / self.count - mean * mean, 0.0))
+
+    @property
+    def rms(self) -> float:
+        if not self.count:
+            return math.nan
+        return math.hypot(self.mean, self.std)
+
+    def summary(self) -> Tuple[float, float, float, float, float]:
+        """(min, max, mean, std, rms)"""
+        if not self.count:
+            return (math.nan,) * 5
+        return (self.minimum, self.maximum, self.mean, self.std, self.rms)
+
+
+class StateStatistics:
+    """Rolling statistics of a motor's feedback values, fed from the receive path"""
+
+    stats: Dict[str, RollingStats]
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self.stats = {name: RollingStats(window) for name in STATE_NAMES}
+        self.lock = threading.Lock()
+
+    @property
+    def window(self) -> int:
+        return next(iter(self.stats.values())).window
+
+    def set_window(self, window: int):
+        """Change the window (in samples, 0 for everything since reset), and start over"""
+        with self.lock:
+            for stats in self.stats.values():
+                stats.window = window
+                stats.reset()
+
+    def reset(self):
+        with self.lock:
+            for stats in self.stats.values():
+                stats.reset()
+
+    def summary(self, name: str) -> Optional[Tuple[float, float, float, float, float]]:
+        stats = self.stats.get(name)
+        if stats is None:
+            return None
+        with self.lock:
+            return stats.summary()
+
+    def extend(self, name: str, values: np.ndarray):
+        """Several samples of one value at once"""
+        with self.lock:
+            self.stats[name].extend(values)
+
+    def message_received(self, msg: can.Message):
+        mode = (msg.arbitration_id >> MODE_SHIFT) & MODE_MASK
+        if mode != Command.STATE.value or len(msg.data) < 8:
+            return
+        values = decode_feedback(msg.data)
+        with self.lock:
+            for name, value in zip(STATE_NAMES, values):
+                self.stats[name].add(value)
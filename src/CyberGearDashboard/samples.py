@@ -0,0 +1,146 @@
+import time
+import struct
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import can
+import numpy as np
+
+from CyberGearDriver.constants import Command
+
+from CyberGearDashboard.protocol import (
+    MODE_SHIFT,
+    MODE_MASK,
+    PARAMETER_NAMES,
+    decode_feedback,
+    decode_parameter,
+)
+from CyberGearDashboard.freshness import STATE_NAMES, PARAMETER_READ_MODES
+
+# How many samples each channel keeps (at 1 kHz feedback, 10 s)
+DEFAULT_CAPACITY = 10_000
+
+# Every value a sample can be of (the state values, then the parameters), numbered by
+# their position, so samples can be passed between processes as plain records
+SAMPLE_NAMES = STATE_NAMES + tuple(PARAMETER_NAMES.values())
+SAMPLE_KEYS = {name: key for key, name in enumerate(SAMPLE_NAMES)}
+
+# A decoded sample: when it was received (monotonic and wall clock), its value, which
+# value it is (the key in SAMPLE_NAMES), and the motor it came from
+SAMPLE_STRUCT = struct.Struct("<dddHB")
+SAMPLE_DTYPE = np.dtype(
+    [
+        ("received", "<f8"),
+        ("timestamp", "<f8"),
+        ("value", "<f8"),
+        ("key", "<u2"),
+        ("motor_id", "u1"),
+    ]
+)
+
+
+def message_values(msg: can.Message) -> List[Tuple[str, float]]:
+    """The values in a received message, by name: the state feedback, or a parameter"""
+    mode = (msg.arbitration_id >> MODE_SHIFT) & MODE_MASK
+    if len(msg.data) < 8:
+        return []
+    if mode == Command.STATE.value:
+        return list(zip(STATE_NAMES, decode_feedback(msg.data)))
+    if mode in PARAMETER_READ_MODES:
+        _, name, value = decode_parameter(msg.data)
+        if name is not None and value is not None:
+            return [(name, float(value))]
+    return []
+
+
+class SampleChannel:
+    """
+    The latest samples of one value, as (time, value) ring buffers.
+
+    Every sample is written twice, `capacity` apart, so the latest samples are always
+    one contiguous slice and can be read as views, without copying.
+    """
+
+    capacity: int
+    count: int
+    head: int
+    total: int
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.times = np.full(capacity * 2, np.nan)
+        self.values = np.full(capacity * 2, np.nan)
+        self.count = 0
+        self.head = 0
+        # Every sample ever appended, to tell how many are new since a given read
+        self.total = 0
+
+    def append(self, timestamp: float, value: float):
+        head = self.head
+        mirror = head + self.capacity
+        self.times[head] = self.times[mirror] = timestamp
+        self.values[head] = self.values[mirror] = value
+        self.head = (head + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+        self.total += 1
+
+    def extend(self, times: np.ndarray, values: np.ndarray):
+        """Append several samples at once"""
+        added = len(times)
+        skipped = max(added - self.capacity, 0)
+        slots = (self.head + np.arange(skipped, added)) % self.capacity
+        self.times[slots] = self.times[slots + self.capacity] = times[skipped:]
+        self.values[slots] = self.values[slots + self.capacity] = values[skipped:]
+        self.head = (self.head + added) % self.capacity
+        self.count = min(self.count + added, self.capacity)
+        self.total += added
+
+    def latest(self, count: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Views of the last `count` samples (or all of them), oldest first"""
+        available = self.count
+        if count is None or count > available:
+            count = available
+        end = self.head + self.capacity
+        return self.times[end - count : end], self.values[end - count : end]
+
+    def since(self, start: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Views of the samples from `start` (monotonic time) on"""
+        times, values = self.latest()
+        first = np.searchsorted(times, start)
+        return times[first:], values[first:]
+
+    def clear(self):
+        self.count = 0
+
+
+class SampleStore:
+    """
+    The recent samples of every state value and parameter of one motor, shared by all
+    views of that motor. Fed from the receive path, timestamped with `time.monotonic()`.
+    """
+
+    channels: Dict[str, SampleChannel]
+    capacity: int
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.channels = {name: SampleChannel(capacity) for name in STATE_NAMES}
+        self.lock = threading.Lock()
+
+    def channel(self, name: str) -> SampleChannel:
+        """A value's samples (a channel is started for it if it has none yet)"""
+        channel = self.channels.get(name)
+        if channel is None:
+            with self.lock:
+                channel = self.channels.setdefault(name, SampleChannel(self.capacity))
+        return channel
+
+    def clear(self):
+        for channel in list(self.channels.values()):
+            channel.clear()
+
+    def message_received(self, msg: can.Message):
+        now = time.monotonic()
+        for name, value in message_values(msg):
+            self.channel(name).append(now, value)
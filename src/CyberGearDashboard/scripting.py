@@ -0,0 +1,313 @@
+import time
+import threading
+import traceback
+import weakref
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, List, Optional
+
+from CyberGearDriver import CyberGearMotor, RunMode, ParameterName
+
+from CyberGearDashboard.protocol import (
+    parameter_request,
+    parameter_write,
+    state_request,
+)
+
+# How often to request the motor state while waiting on it (in Hz)
+WAIT_POLL_RATE = 100
+
+# How long to wait for parameter replies before asking again (in seconds), and how many times
+PARAM_TIMEOUT = 0.5
+PARAM_RETRIES = 2
+
+# The most log lines kept for the UI, if it falls behind
+MAX_LOG_LINES = 10_000
+
+
+class ScriptCancelled(Exception):
+    """The script was stopped"""
+
+
+class MotorUpdates:
+    """
+    Counts a motor's state updates and keeps its latest parameter replies, for scripts to
+    wait on. The listeners are added once per motor and never removed: the driver's
+    listener list isn't safe to change while the receive thread emits events.
+    """
+
+    state_count: int
+    param_counts: Dict[ParameterName, int]
+    params: Dict[ParameterName, float]
+
+    def __init__(self, motor: CyberGearMotor):
+        self.condition = threading.Condition()
+        self.state_count = 0
+        self.param_counts = {}
+        self.params = {}
+        motor.on("state_changed", self.state_changed)
+        motor.on("param_received", self.param_received)
+
+    def state_changed(self):
+        with self.condition:
+            self.state_count += 1
+            self.condition.notify_all()
+
+    def param_received(self, name: ParameterName, value):
+        with self.condition:
+            self.params[name] = value
+            self.param_counts[name] = self.param_counts.get(name, 0) + 1
+            self.condition.notify_all()
+
+
+_updates: "weakref.WeakKeyDictionary[CyberGearMotor, MotorUpdates]" = (
+    weakref.WeakKeyDictionary()
+)
+_updates_lock = threading.Lock()
+
+
+def motor_updates(motor: CyberGearMotor) -> MotorUpdates:
+    """The update tracking for a motor (its listeners are added the first time)"""
+    with _updates_lock:
+        updates = _updates.get(motor)
+        if updates is None:
+            updates = _updates[motor] = MotorUpdates(motor)
+        return updates
+
+
+def read_parameters(
+    motor: CyberGearMotor,
+    names: Iterable[ParameterName],
+    timeout: float = PARAM_TIMEOUT,
+    stop: Optional[threading.Event] = None,
+) -> Dict[ParameterName, float]:
+    """
+    Read several parameters at once: all the requests are sent back to back, then the
+    replies are collected. Parameters that didn't reply are asked for again, up to
+    PARAM_RETRIES times (or until `stop` is set). Those that never replied are left out.
+    """
+    updates = motor_updates(motor)
+    pending = set(names)
+    values = {}
+    with updates.condition:
+        seen = {name: updates.param_counts.get(name, 0) for name in pending}
+
+    def collect() -> bool:
+        """Take the replies that arrived since the requests (call with the lock)"""
+        for name in list(pending):
+            if updates.param_counts.get(name, 0) != seen[name]:
+                values[name] = updates.params[name]
+                pending.discard(name)
+        return not pending
+
+    for _ in range(PARAM_RETRIES + 1):
+        for name in list(pending):
+            motor.send_message(parameter_request(motor, name))
+        with updates.condition:
+            if updates.condition.wait_for(collect, timeout):
+                break
+        if stop is not None and stop.is_set():
+            break
+    return values
+
+
+class ScriptContext:
+    """
+    The API a script runs against. All helpers block the script's thread (never the UI),
+    and raise `ScriptCancelled` once the script has been stopped.
+    """
+
+    motors: Dict[int, CyberGearMotor]
+    progress: float
+    status: str
+
+    def __init__(self, motors: Dict[int, CyberGearMotor]):
+        self.motors = motors
+        self.progress = 0.0
+        self.status = ""
+        self.log_lines: Deque[str] = deque(maxlen=MAX_LOG_LINES)
+        self._cancel = threading.Event()
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise ScriptCancelled()
+
+    def motor(self, motor_id: Optional[int] = None) -> CyberGearMotor:
+        """A motor by ID (or the first one)"""
+        if motor_id is None:
+            return next(iter(self.motors.values()))
+        return self.motors[motor_id]
+
+    def log(self, *values):
+        """Show a line in the dashboard's script log"""
+        line = " ".join(str(value) for value in values)
+        self.log_lines.append(f"{time.strftime('%H:%M:%S')} {line}")
+
+    def set_progress(self, done: float, total: float = 1.0, status: str = ""):
+        """Show how far along the script is (`done` out of `total`)"""
+        self.progress = min(max(done / total, 0.0), 1.0) if total else 0.0
+        if status:
+            self.status = status
+
+    def dwell(self, seconds: float):
+        """Wait, but stop right away if the script is stopped"""
+        if self._cancel.wait(seconds):
+            raise ScriptCancelled()
+
+    def wait_until(
+        self,
+        motor: CyberGearMotor,
+        condition: Callable[[CyberGearMotor], bool],
+        timeout: float = 10.0,
+    ) -> bool:
+        """
+        Wait until `condition(motor)` is true, checking every time the motor state updates.
+        The state is requested at WAIT_POLL_RATE while waiting. Returns False on timeout.
+        """
+        updates = motor_updates(motor)
+        request = state_request(motor)
+        deadline = time.monotonic() + timeout
+        while True:
+            if condition(motor):
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            self.check_cancelled()
+            with updates.condition:
+                seen = updates.state_count
+                motor.send_message(request)
+                updates.condition.wait_for(
+                    lambda: updates.state_count != seen, 1.0 / WAIT_POLL_RATE
+                )
+
+    def wait_until_position(
+        self,
+        motor: CyberGearMotor,
+        position: float,
+        tolerance: float = 0.02,
+        timeout: float = 10.0,
+    ) -> bool:
+        """Wait until the motor is within `tolerance` (rad) of `position`"""
+        return self.wait_until(
+            motor,
+            lambda m: abs(m.state.get("position", float("inf")) - position)
+            <= tolerance,
+            timeout,
+        )
+
+    def move_to(
+        self,
+        motor: CyberGearMotor,
+        position: float,
+        tolerance: float = 0.02,
+        timeout: float = 10.0,
+    ) -> bool:
+        """Set the position target (in position mode), and wait until the motor gets there"""
+        motor.send_message(parameter_write(motor, "loc_ref", position))
+        return self.wait_until_position(motor, position, tolerance, timeout)
+
+    def read_params(
+        self,
+        motor: CyberGearMotor,
+        names: Iterable[ParameterName],
+        timeout: float = PARAM_TIMEOUT,
+    ) -> Dict[ParameterName, float]:
+        """Read several parameters at once (see `read_parameters`)"""
+        names = list(names)
+        values = read_parameters(motor, names, timeout, stop=self._cancel)
+        self.check_cancelled()
+        missing = [name for name in names if name not in values]
+        if missing:
+            self.log(f"No reply for: {', '.join(sorted(missing))}")
+        return values
+
+    def write_params(self, motor: CyberGearMotor, values: Dict[ParameterName, float]):
+        """Write several parameters at once"""
+        for name, value in values.items():
+            motor.send_message(parameter_write(motor, name, value))
+
+    def namespace(self) -> dict:
+        """The globals a script runs with"""
+        return {
+            "__name__": "__script__",
+            "ctx": self,
+            "motors": self.motors,
+            "motor": self.motor,
+            "log": self.log,
+            "progress": self.set_progress,
+            "dwell": self.dwell,
+            "wait_until": self.wait_until,
+            "wait_until_position": self.wait_until_position,
+            "move_to": self.move_to,
+            "read_params": self.read_params,
+            "write_params": self.write_params,
+            "RunMode": RunMode,
+        }
+
+
+class ScriptRunner(threading.Thread):
+    """
+    Runs a Python script in a worker thread. The script runs with the `ScriptContext`
+    helpers as globals. Motors are stopped when it ends, whether it finished, failed or
+    was stopped.
+    """
+
+    context: ScriptContext
+    source: str
+    path: str
+    error: Optional[str]
+    on_finished: Optional[Callable[[], None]]
+
+    def __init__(
+        self,
+        path: str,
+        motors: Dict[int, CyberGearMotor],
+        on_finished: Optional[Callable[[], None]] = None,
+    ):
+        super().__init__(daemon=True)
+        self.path = path
+        with open(path) as file:
+            self.source = file.read()
+        self.context = ScriptContext(motors)
+        self.error = None
+        self.on_finished = on_finished
+
+    @property
+    def cancelled(self) -> bool:
+        return self.context.is_cancelled
+
+    def cancel(self):
+        self.context.cancel()
+
+    def run(self):
+        context = self.context
+        context.log(f"Running {self.path}")
+        try:
+            code = compile(self.source, self.path, "exec")
+            exec(code, context.namespace())
+            context.set_progress(1.0)
+            context.log("Finished")
+        except ScriptCancelled:
+            context.log("Stopped")
+        except Exception:
+            self.error = traceback.format_exc(limit=-3)
+            context.log(self.error)
+        finally:
+            for motor in list(context.motors.values()):
+                motor.stop()
+        if self.on_finished is not None:
+            self.on_finished()
+
+    def take_log(self) -> List[str]:
+        """The log lines since the last call"""
+        lines = []
+        log_lines = self.context.log_lines
+        while log_lines:
+            lines.append(log_lines.popleft())
+        return lines
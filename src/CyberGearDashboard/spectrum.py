@@ -0,0 +1,118 @@
+import math
+import threading
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+from CyberGearDriver import CyberGearMotor
+
+from CyberGearDashboard.analysis.spectrum import resample, power_spectrum, to_db
+from CyberGearDashboard.capture import poll_state
+from CyberGearDashboard.freshness import STATE_NAMES
+from CyberGearDashboard.protocol import parameter_request
+from CyberGearDashboard.samples import SampleStore
+
+# Values that make sense to look at in the frequency domain
+SPECTRUM_SOURCES = ("velocity", "torque", "position", "iqf", "iq")
+
+# FFT lengths (in samples)
+FFT_SIZES = (256, 512, 1024, 2048, 4096, 8192)
+DEFAULT_FFT_SIZE = 1024
+
+# How much consecutive FFT windows overlap (0~1)
+DEFAULT_OVERLAP = 0.5
+
+# Exponential averaging of the power spectra (1 is no averaging)
+DEFAULT_AVERAGING = 0.3
+
+# How often the worker checks for new samples (in seconds)
+CHECK_INTERVAL = 0.02
+
+# Rate to request the value at while the spectrum runs (in Hz)
+DEFAULT_POLL_RATE = 500
+
+Spectrum = Tuple[np.ndarray, np.ndarray]
+
+
+class SpectrumAnalyzer(threading.Thread):
+    """
+    A live spectrum of one value, computed in this worker thread from the motor's shared
+    sample store. A new FFT runs every time enough new samples arrived for the next
+    (overlapping) window, and the power is averaged over the windows.
+    Each result, (frequencies in Hz, magnitude in dB), goes to `on_spectrum`.
+    """
+
+    store: SampleStore
+    name: str
+    size: int
+    overlap: float
+    window: str
+    averaging: float
+    rate: float
+    on_spectrum: Optional[Callable[[np.ndarray, np.ndarray], None]]
+
+    def __init__(
+        self,
+        store: SampleStore,
+        name: str,
+        size: int = DEFAULT_FFT_SIZE,
+        overlap: float = DEFAULT_OVERLAP,
+        window: str = "Hann",
+        averaging: float = DEFAULT_AVERAGING,
+        on_spectrum: Optional[Callable[[np.ndarray, np.ndarray], None]] = None,
+    ):
+        super().__init__(daemon=True)
+        self.store = store
+        self.name = name
+        self.size = size
+        self.overlap = overlap
+        self.window = window
+        self.averaging = averaging
+        self.on_spectrum = on_spectrum
+        self.rate = 0.0
+        self.count = 0
+        self.power: Optional[np.ndarray] = None
+        self._stop = threading.Event()
+
+    @property
+    def hop(self) -> int:
+        """New samples between two FFTs"""
+        return max(1, round(self.size * (1.0 - self.overlap)))
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self):
+        channel = self.store.channel(self.name)
+        last_total = channel.total - self.hop
+        while not self._stop.wait(CHECK_INTERVAL):
+            if channel.count < self.size or channel.total - last_total < self.hop:
+                continue
+            last_total = channel.total
+            times, values = channel.latest(self.size)
+            result = self.analyze(np.array(times), np.array(values))
+            if result is not None and self.on_spectrum is not None:
+                self.on_spectrum(*result)
+
+    def analyze(self, times: np.ndarray, values: np.ndarray) -> Optional[Spectrum]:
+        values, rate = resample(times, values)
+        if not rate:
+            return None
+        frequencies, power = power_spectrum(values, rate, self.window)
+
+        # Start over if the rate changed, the bins no longer line up
+        if self.power is None or not math.isclose(rate, self.rate, rel_tol=0.05):
+            self.power = power
+        else:
+            self.power += self.averaging * (power - self.power)
+        self.rate = rate
+        self.count += 1
+        return frequencies, to_db(self.power)
+
+
+def poll_value(
+    motor: CyberGearMotor, name: str, rate: float, stop: threading.Event
+) -> bool:
+    """Request a state value or parameter at `rate` until stopped (blocking)"""
+    message = None if name in STATE_NAMES else parameter_request(motor, name)
+    return poll_state(motor, math.inf, rate, stop, message=message)
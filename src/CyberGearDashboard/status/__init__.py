@@ -1 +1,2 @@
 from .motor_state import MotorStateWidget
+from .fault_timeline import FaultTimelineDock
@@ -1,4 +1,5 @@
-from PySide6.QtCore import Signal, Qt, QTimer
+from typing import Dict, List
+from PySide6.QtCore import Signal
 from PySide6.QtGui import QColor
 from PySide6.QtWidgets import (
     QWidget,
@@ -11,44 +12,72 @@ from PySide6.QtWidgets import (
 
 from CyberGearDriver import CyberGearMotor
 
-REFRESH_RATE_MS = 250
+from CyberGearDashboard.fault_log import FaultLog, FaultEvent
 
 
 class FaultListWidget(QWidget):
+    """The motor's active faults, updated only when a fault is raised or cleared"""
+
     motor: CyberGearMotor
+    fault_log: FaultLog
     list: QListWidget
+    items: Dict[str, QListWidgetItem]
+    counts: Dict[str, int]
 
     has_fault = Signal(bool)
+    fault_event = Signal(object)
 
-    def __init__(self, motor: CyberGearMotor, *args, **kwargs):
+    def __init__(self, motor: CyberGearMotor, fault_log: FaultLog, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.motor = motor
+        self.fault_log = fault_log
+        self.items = {}
+        # The same fault can be reported by both the feedback and the fault replies
+        self.counts = {}
         self.build_layout()
 
-        timer = QTimer(self)
-        timer.timeout.connect(self.update_list)
-        timer.start(REFRESH_RATE_MS)
+        # Events arrive on the receive thread
+        self.fault_event.connect(self.on_fault_event)
+        for name in fault_log.active_faults(motor.motor_id):
+            self.add_fault(name)
+        fault_log.add_listener(self.fault_event.emit, motor.motor_id)
 
-    def update_list(self):
-        """Update the items in the fault list"""
-        in_fault = [in_fault for in_fault in self.motor.faults.values() if in_fault]
-        if len(in_fault) == 0:
-            self.list.clear()
-            self.list.setVisible(False)
+    def on_fault_event(self, event: FaultEvent):
+        if event.active:
+            self.add_fault(event.name)
         else:
-            for name, in_fault in self.motor.faults.items():
-                list_item = self.list.findItems(name, Qt.MatchExactly)
-                # Add fault, if it's not already in the list
-                if in_fault and len(list_item) == 0:
-                    item = QListWidgetItem(name)
-                    item.setForeground(QColor("red"))
-                    self.list.addItem(item)
-                # Remove fault, if it was in the list
-                elif not in_fault and len(list_item) > 0:
-                    self.list.takeItem(self.list.row(list_item[0]))
-            self.setVisible(True)
+            self.remove_fault(event.name)
+
+    def add_fault(self, name: str):
+        count = self.counts.get(name, 0)
+        self.counts[name] = count + 1
+        if count == 0:
+            item = QListWidgetItem(name)
+            item.setForeground(QColor("red"))
+            self.items[name] = item
+            self.list.addItem(item)
+            self.update_visibility()
+
+    def remove_fault(self, name: str):
+        count = self.counts.get(name, 0)
+        if count == 0:
+            return
+        self.counts[name] = count - 1
+        if count == 1:
+            item = self.items.pop(name)
+            self.list.takeItem(self.list.row(item))
+            self.update_visibility()
+
+    def active_faults(self) -> List[str]:
+        return list(self.items.keys())
+
+    def update_visibility(self):
+        in_fault = len(self.items) > 0
+        self.setVisible(in_fault)
+        if in_fault:
             self.list.adjustSize()
             self.adjustSize()
+        self.has_fault.emit(in_fault)
 
     def build_layout(self):
         self.setVisible(False)
@@ -0,0 +1,159 @@
+import time
+from datetime import datetime
+from typing import Dict, List, Tuple
+from PySide6.QtCore import Qt, QTimer, Signal
+from PySide6.QtGui import QColor
+from PySide6.QtWidgets import (
+    QWidget,
+    QDockWidget,
+    QSplitter,
+    QVBoxLayout,
+    QTableWidget,
+    QTableWidgetItem,
+    QHeaderView,
+    QAbstractItemView,
+)
+
+import pyqtgraph as pg
+
+from CyberGearDashboard.fault_log import FaultLog, FaultEvent, MAX_EVENTS
+
+# How often to extend the faults that are still active (in milliseconds)
+REFRESH_RATE_MS = 1000
+
+EVENT_COLUMNS = ("Time", "Motor", "Fault", "")
+
+RAISED_COLOR = QColor("red")
+CLEARED_COLOR = QColor("green")
+
+# A timeline row: the motor and fault name
+RowKey = Tuple[int, str]
+
+
+class FaultTimelineDock(QDockWidget):
+    """
+    Every fault raised and cleared, on a timeline with one row per motor and fault, and
+    in an event list. Both are only updated when an event arrives.
+    """
+
+    fault_log: FaultLog
+    rows: Dict[RowKey, int]
+    intervals: Dict[RowKey, List[float]]
+    opened: Dict[RowKey, float]
+    curves: Dict[RowKey, pg.PlotDataItem]
+    timer: QTimer
+
+    fault_event = Signal(object)
+
+    def __init__(self, fault_log: FaultLog, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fault_log = fault_log
+        self.rows = {}
+        self.intervals = {}
+        self.opened = {}
+        self.curves = {}
+        self.build_layout()
+
+        # Keep active faults growing until they're cleared
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.extend_open)
+
+        # Events from earlier sessions; faults still open back then ended with that session
+        history = fault_log.history()
+        for event in history:
+            self.add_event(event)
+        if history:
+            for key in list(self.opened.keys()):
+                self.close_interval(key, history[-1].timestamp)
+
+        # Events arrive on the receive thread
+        self.fault_event.connect(self.add_event)
+        fault_log.add_listener(self.fault_event.emit)
+
+    def add_event(self, event: FaultEvent):
+        key = (event.motor_id, event.name)
+        if key not in self.rows:
+            self.add_row(key)
+        if event.active:
+            if key not in self.opened:
+                self.opened[key] = event.timestamp
+                self.intervals[key] += [event.timestamp, event.timestamp]
+                self.timer.start(REFRESH_RATE_MS)
+        elif key in self.opened:
+            self.close_interval(key, event.timestamp)
+        self.append_event_row(event)
+
+    def close_interval(self, key: RowKey, timestamp: float):
+        del self.opened[key]
+        self.intervals[key][-1] = timestamp
+        self.update_curve(key)
+        if not self.opened:
+            self.timer.stop()
+
+    def extend_open(self):
+        now = time.time()
+        for key in self.opened:
+            self.intervals[key][-1] = max(now, self.opened[key])
+            self.update_curve(key)
+
+    def update_curve(self, key: RowKey):
+        intervals = self.intervals[key]
+        self.curves[key].setData(intervals, [self.rows[key]] * len(intervals))
+
+    def add_row(self, key: RowKey):
+        row = len(self.rows)
+        self.rows[key] = row
+        self.intervals[key] = []
+        self.curves[key] = self.plot.plot(
+            connect="pairs", pen=pg.mkPen(RAISED_COLOR, width=8)
+        )
+        self.plot.getAxis("left").setTicks(
+            [[(y, f"{motor_id}: {name}") for (motor_id, name), y in self.rows.items()]]
+        )
+        self.plot.setYRange(-0.5, len(self.rows) - 0.5)
+
+    def append_event_row(self, event: FaultEvent):
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        moment = datetime.fromtimestamp(event.timestamp)
+        values = (
+            moment.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3],
+            str(event.motor_id),
+            event.name,
+            "raised" if event.active else "cleared",
+        )
+        for col, value in enumerate(values):
+            item = QTableWidgetItem(value)
+            if col == 3:
+                item.setForeground(RAISED_COLOR if event.active else CLEARED_COLOR)
+            self.table.setItem(row, col, item)
+        if row >= MAX_EVENTS:
+            self.table.removeRow(0)
+        self.table.scrollToBottom()
+
+    def build_layout(self):
+        self.setWindowTitle("Fault timeline")
+
+        self.plot = pg.PlotWidget(axisItems={"bottom": pg.DateAxisItem()})
+        self.plot.showGrid(x=True)
+        self.plot.setMouseEnabled(y=False)
+
+        self.table = QTableWidget(0, len(EVENT_COLUMNS))
+        self.table.setHorizontalHeaderLabels(EVENT_COLUMNS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(
+            QHeaderView.ResizeMode.ResizeToContents
+        )
+        self.table.horizontalHeader().setStretchLastSection(True)
+
+        splitter = QSplitter(Qt.Orientation.Horizontal)
+        splitter.addWidget(self.plot)
+        splitter.addWidget(self.table)
+        splitter.setStretchFactor(0, 2)
+
+        root = QWidget()
+        layout = QVBoxLayout()
+        layout.addWidget(splitter)
+        root.setLayout(layout)
+        self.setWidget(root)
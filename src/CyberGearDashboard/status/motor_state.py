@@ -1,12 +1,20 @@
+from typing import Optional
 from PySide6.QtWidgets import (
     QWidget,
     QVBoxLayout,
+    QHBoxLayout,
+    QLabel,
+    QSpinBox,
+    QPushButton,
     QTableView,
     QDockWidget,
     QAbstractItemView,
 )
 
 from CyberGearDashboard.charts import ChartLayout
+from CyberGearDashboard.fault_log import FaultLog
+from CyberGearDashboard.freshness import ValueTracker
+from CyberGearDashboard.rolling_stats import StateStatistics
 from CyberGearDriver import CyberGearMotor
 
 from .state_table_model import StateTableModel
@@ -17,18 +25,31 @@ class MotorStateWidget(QDockWidget):
     model: StateTableModel
     motor: CyberGearMotor
     charts: ChartLayout
+    fault_log: FaultLog
+    statistics: Optional[StateStatistics]
 
-    def __init__(self, motor: CyberGearMotor, charts: ChartLayout, *args, **kwargs):
+    def __init__(
+        self,
+        motor: CyberGearMotor,
+        charts: ChartLayout,
+        fault_log: FaultLog,
+        tracker: Optional[ValueTracker] = None,
+        statistics: Optional[StateStatistics] = None,
+        *args,
+        **kwargs,
+    ):
         super().__init__(*args, **kwargs)
         self.motor = motor
         self.charts = charts
-        self.model = StateTableModel(self.motor)
+        self.fault_log = fault_log
+        self.statistics = statistics
+        self.model = StateTableModel(self.motor, tracker, statistics)
         self.build_layout()
 
     def build_layout(self):
         self.setWindowTitle("Motor state")
 
-        fault_list = FaultListWidget(motor=self.motor)
+        fault_list = FaultListWidget(motor=self.motor, fault_log=self.fault_log)
 
         table = QTableView()
         table.setModel(self.model)
@@ -37,6 +58,28 @@ class MotorStateWidget(QDockWidget):
         root = QWidget()
         layout = QVBoxLayout()
         layout.addWidget(fault_list)
+        if self.statistics is not None:
+            layout.addLayout(self.build_statistics_toolbar())
         layout.addWidget(table)
         root.setLayout(layout)
         self.setWidget(root)
+
+    def build_statistics_toolbar(self) -> QHBoxLayout:
+        window_input = QSpinBox()
+        window_input.setRange(0, 100_000)
+        window_input.setValue(self.statistics.window)
+        window_input.setSpecialValueText("All")
+        window_input.setSuffix(" samples")
+        window_input.setToolTip("The statistics window (All is everything since reset)")
+        window_input.valueChanged.connect(self.statistics.set_window)
+
+        reset_button = QPushButton("Reset")
+        reset_button.setToolTip("Reset the statistics")
+        reset_button.clicked.connect(self.statistics.reset)
+
+        toolbar = QHBoxLayout()
+        toolbar.addWidget(QLabel("Statistics over"))
+        toolbar.addWidget(window_input)
+        toolbar.addStretch()
+        toolbar.addWidget(reset_button)
+        return toolbar
@@ -0,0 +1,112 @@
+from typing import List
+from PySide6.QtCore import QAbstractTableModel, Qt, QTimer, Signal, QModelIndex
+from PySide6.QtGui import QColor
+from PySide6.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QTableView,
+    QDockWidget,
+    QAbstractItemView,
+    QHeaderView,
+)
+
+from CyberGearDriver import CyberGearMotor
+
+REFRESH_RATE_MS = 250
+
+
+class MotorOverviewModel(QAbstractTableModel):
+    """A compact grid with one row per motor"""
+
+    motors: List[CyberGearMotor]
+    headers = ["Motor", "Position", "Velocity", "Torque", "Temp", "Faults"]
+    state_list = ["position", "velocity", "torque", "temperature"]
+
+    def __init__(self):
+        super().__init__()
+        self.motors = []
+
+        timer = QTimer(self)
+        timer.timeout.connect(self.update_data)
+        timer.start(REFRESH_RATE_MS)
+
+    def add_motor(self, motor: CyberGearMotor):
+        """Add a row for a motor"""
+        row = len(self.motors)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.motors.append(motor)
+        self.endInsertRows()
+
+    def update_data(self):
+        """Refresh all the values"""
+        if self.motors:
+            top_left = self.index(0, 1)
+            bottom_right = self.index(len(self.motors) - 1, len(self.headers) - 1)
+            self.dataChanged.emit(top_left, bottom_right)
+
+    def fault_count(self, motor: CyberGearMotor) -> int:
+        return len([in_fault for in_fault in motor.faults.values() if in_fault])
+
+    def rowCount(self, index=None):
+        return len(self.motors)
+
+    def columnCount(self, parent=None):
+        return len(self.headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        col = index.column()
+        motor = self.motors[index.row()]
+        if role == Qt.DisplayRole:
+            if col == 0:
+                return str(motor.motor_id)
+            elif col == len(self.headers) - 1:
+                return str(self.fault_count(motor))
+            value = motor.state.get(self.state_list[col - 1])
+            if value is None:
+                return value
+            return "{:.2f}".format(value)
+        elif role == Qt.ForegroundRole:
+            if col == len(self.headers) - 1 and self.fault_count(motor) > 0:
+                return QColor("red")
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+        return None
+
+
+class MotorOverviewDock(QDockWidget):
+    model: MotorOverviewModel
+
+    motor_selected = Signal(int)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.model = MotorOverviewModel()
+        self.build_layout()
+
+    def add_motor(self, motor: CyberGearMotor):
+        self.model.add_motor(motor)
+
+    def on_double_click(self, index: QModelIndex):
+        """Select the motor for this row"""
+        self.motor_selected.emit(self.model.motors[index.row()].motor_id)
+
+    def build_layout(self):
+        self.setWindowTitle("Motor overview")
+
+        table = QTableView()
+        table.setModel(self.model)
+        table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        table.verticalHeader().setVisible(False)
+        table.horizontalHeader().setSectionResizeMode(
+            QHeaderView.ResizeMode.ResizeToContents
+        )
+        table.doubleClicked.connect(self.on_double_click)
+
+        root = QWidget()
+        layout = QVBoxLayout()
+        layout.addWidget(table)
+        root.setLayout(layout)
+        self.setWidget(root)
@@ -1,22 +1,50 @@
+import math
+import time
+from typing import List, Optional
 from PySide6.QtCore import QAbstractTableModel, Qt, QTimer
+from PySide6.QtGui import QColor
 
 from CyberGearDashboard.charts import ChartLayout
+from CyberGearDashboard.freshness import ValueTracker, format_age, format_rate
+from CyberGearDashboard.rolling_stats import StateStatistics
 from CyberGearDriver import CyberGearMotor
 
 REFRESH_RATE_MS = 100
 
+STALE_COLOR = QColor(255, 170, 80)
+
+FRESHNESS_HEADERS = ["Age", "Rate", "Samples"]
+STATISTICS_HEADERS = ["Min", "Max", "Mean", "Std", "RMS"]
+
 
 class StateTableModel(QAbstractTableModel):
     motor: CyberGearMotor
+    tracker: Optional[ValueTracker]
+    statistics: Optional[StateStatistics]
     prev_data: dict
-    headers = ["Name", "Value"]
+    headers: List[str]
     state_list = ["position", "velocity", "torque", "temperature"]
 
-    def __init__(self, motor: CyberGearMotor):
+    def __init__(
+        self,
+        motor: CyberGearMotor,
+        tracker: Optional[ValueTracker] = None,
+        statistics: Optional[StateStatistics] = None,
+    ):
         super().__init__()
         self.motor = motor
+        self.tracker = tracker
+        self.statistics = statistics
         self.prev_data = {}
 
+        # Column layout: name, value, then the optional freshness and statistics columns
+        self.headers = ["Name", "Value"]
+        if tracker is not None:
+            self.headers += FRESHNESS_HEADERS
+        self.stats_column = len(self.headers)
+        if statistics is not None:
+            self.headers += STATISTICS_HEADERS
+
         timer = QTimer(self)
         timer.timeout.connect(self.update_data)
         timer.start(REFRESH_RATE_MS)
@@ -31,31 +59,57 @@ class StateTableModel(QAbstractTableModel):
                 self.data_did_change(name)
         self.prev_data = self.motor.state.copy()
 
+        # The age and statistics keep changing, even when the value doesn't
+        if len(self.headers) > 2:
+            self.dataChanged.emit(
+                self.index(0, 1),
+                self.index(len(self.state_list) - 1, len(self.headers) - 1),
+            )
+
     def data_did_change(self, name: str):
         """The data for a state item (by name) has changed"""
         idx = self.state_list.index(name)
         if idx > -1:
-            data_index = self.index(idx, len(self.headers) - 1)
+            data_index = self.index(idx, 1)
             self.dataChanged.emit(data_index, data_index)
 
     def rowCount(self, index):
         return len(self.state_list)
 
     def columnCount(self, parent=None):
-        return 2
+        return len(self.headers)
 
     def data(self, index, role=Qt.DisplayRole):
+        col = index.column()
+        row = index.row()
+        name = self.state_list[row]
+        stamp = self.tracker.get(name) if self.tracker is not None else None
         if role == Qt.DisplayRole:
-            col = index.column()
-            row = index.row()
-            name = self.state_list[row]
             if col == 0:
                 return name
-            else:
+            elif col == 1:
                 value = self.motor.state.get(name)
                 if value is None:
                     return value
                 return "{:.3f}".format(value)
+            elif col >= self.stats_column:
+                summary = self.statistics.summary(name)
+                if summary is None or math.isnan(summary[0]):
+                    return None
+                return "{:.3f}".format(summary[col - self.stats_column])
+            elif stamp is None:
+                return None
+            elif col == 2:
+                return format_age(stamp.age())
+            elif col == 3:
+                return format_rate(stamp.rate())
+            elif col == 4:
+                return stamp.count
+        elif role == Qt.BackgroundRole and 0 < col < self.stats_column:
+            if stamp is not None and stamp.is_stale():
+                return STALE_COLOR
+        elif role == Qt.ToolTipRole and stamp is not None:
+            return f"Received at {time.strftime('%H:%M:%S', time.localtime(stamp.timestamp))}"
         return None
 
     def headerData(self, section, orientation, role=Qt.DisplayRole):
@@ -0,0 +1,171 @@
+import time
+import threading
+from itertools import product
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from CyberGearDriver import CyberGearMotor, RunMode, ParameterName
+
+from CyberGearDashboard.analysis.step_response import (
+    STEP_METRICS,
+    rank,
+    resample,
+    step_metrics,
+)
+from CyberGearDashboard.capture import CAPTURE_RATE, FeedbackCapture, poll_state
+from CyberGearDashboard.connection import BusConnection
+from CyberGearDashboard.protocol import parameter_write
+from CyberGearDashboard.scripting import read_parameters
+
+# How long to hold the start position before each step, and to capture after it (in seconds)
+SETTLE_TIME = 1.0
+CAPTURE_TIME = 1.5
+
+# The gains that can be swept
+TUNING_PARAMS = ("loc_kp", "spd_kp", "spd_ki")
+
+
+class StepTestResult:
+    """One step test: the gains used, the captured response, and its metrics"""
+
+    gains: Dict[ParameterName, float]
+    t: np.ndarray
+    position: np.ndarray
+    metrics: Dict[str, float]
+    rank: Optional[int]
+
+    def __init__(
+        self, gains: Dict[ParameterName, float], t: np.ndarray, position: np.ndarray
+    ):
+        self.gains = gains
+        self.t = t
+        self.position = position
+        self.metrics = {}
+        self.rank = None
+
+
+class GainSweep(threading.Thread):
+    """
+    Runs a position step test for every combination of gains in a grid, capturing the
+    feedback at a high rate, then scores all the responses together.
+
+    Each test writes the gains, holds the start position for `settle_time`, then steps to
+    the target and captures `capture_time` of feedback. The motor's own gains are read
+    first and written back when the sweep ends.
+    """
+
+    motor: CyberGearMotor
+    connection: BusConnection
+    start_position: float
+    target: float
+    combinations: List[Dict[ParameterName, float]]
+    settle_time: float
+    capture_time: float
+    results: List[StepTestResult]
+    error: Optional[str]
+    on_result: Optional[Callable[[StepTestResult], None]]
+    on_finished: Optional[Callable[[], None]]
+
+    def __init__(
+        self,
+        motor: CyberGearMotor,
+        connection: BusConnection,
+        start_position: float,
+        target: float,
+        grid: Dict[ParameterName, List[float]],
+        settle_time: float = SETTLE_TIME,
+        capture_time: float = CAPTURE_TIME,
+        on_result: Optional[Callable[[StepTestResult], None]] = None,
+        on_finished: Optional[Callable[[], None]] = None,
+    ):
+        super().__init__(daemon=True)
+        self.motor = motor
+        self.connection = connection
+        self.start_position = start_position
+        self.target = target
+        names = list(grid.keys())
+        self.combinations = [
+            dict(zip(names, values)) for values in product(*grid.values())
+        ]
+        self.settle_time = settle_time
+        self.capture_time = capture_time
+        self.results = []
+        self.error = None
+        self.on_result = on_result
+        self.on_finished = on_finished
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def run(self):
+        motor = self.motor
+        names = {name for gains in self.combinations for name in gains}
+        original = read_parameters(motor, names, stop=self._cancel)
+        missing = names - original.keys()
+        if missing:
+            # Don't change gains that couldn't be put back afterwards
+            self.error = f"Could not read the current {', '.join(sorted(missing))}"
+            if self.on_finished is not None:
+                self.on_finished()
+            return
+
+        capture = FeedbackCapture(motor.motor_id)
+        self.connection.add_receiver(capture.message_received)
+        try:
+            motor.stop()
+            motor.mode(RunMode.POSITION)
+            motor.enable()
+            for gains in self.combinations:
+                result = self.run_test(capture, gains)
+                if result is None:
+                    break
+                self.results.append(result)
+                if self.on_result is not None:
+                    self.on_result(result)
+        finally:
+            self.connection.remove_receiver(capture.message_received)
+            motor.stop()
+            for name, value in original.items():
+                motor.set_parameter(name, value)
+
+        self.score()
+        if self.on_finished is not None:
+            self.on_finished()
+
+    def run_test(
+        self, capture: FeedbackCapture, gains: Dict[ParameterName, float]
+    ) -> Optional[StepTestResult]:
+        """Run one step test (returns None if cancelled)"""
+        motor = self.motor
+        for name, value in gains.items():
+            motor.set_parameter(name, value)
+        motor.set_parameter("loc_ref", self.start_position)
+        if not poll_state(motor, self.settle_time, stop=self._cancel):
+            return None
+
+        capture.clear()
+        step_time = time.time()
+        motor.send_message(parameter_write(motor, "loc_ref", self.target))
+        if not poll_state(motor, self.capture_time, stop=self._cancel):
+            return None
+
+        samples = capture.samples()
+        return StepTestResult(
+            gains, samples["timestamp"] - step_time, samples["position"]
+        )
+
+    def score(self):
+        """Compute the metrics for all responses at once, and rank them"""
+        if not self.results:
+            return
+        grid = np.arange(0, self.capture_time, 1.0 / CAPTURE_RATE)
+        responses = np.stack(
+            [resample(result.t, result.position, grid) for result in self.results]
+        )
+        metrics = step_metrics(grid, responses, self.start_position, self.target)
+        for i, result in enumerate(self.results):
+            result.metrics = {name: float(metrics[name][i]) for name in STEP_METRICS}
+        for position, i in enumerate(rank(metrics)):
+            self.results[i].rank = position + 1
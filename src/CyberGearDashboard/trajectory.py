@@ -0,0 +1,294 @@
+import math
+import time
+import threading
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from CyberGearDriver import CyberGearMotor, CyberMotorMessage
+from CyberGearDriver.constants import (
+    Command,
+    P_MIN,
+    P_MAX,
+    V_MIN,
+    V_MAX,
+    T_MIN,
+    T_MAX,
+    KP_MIN,
+    KP_MAX,
+    KD_MIN,
+    KD_MAX,
+)
+
+from CyberGearDashboard.bus_stats import StreamStatistics
+from CyberGearDashboard.protocol import (
+    MODE_SHIFT,
+    MODE_MASK,
+    DATA_SHIFT,
+    UINT16_MAX,
+    stop_request,
+)
+
+# Supported stream rates (in Hz)
+MIN_RATE = 50
+MAX_RATE = 1000
+DEFAULT_RATE = 500
+
+# Sleep until this close to a deadline (in seconds), then yield until it arrives.
+# OS sleeps routinely overshoot by more than a 1 kHz period.
+SPIN_TIME = 0.002
+
+WAVEFORMS = ("Step", "Ramp", "Sine", "Chirp", "CSV")
+
+
+class Trajectory:
+    """A setpoint trajectory, sampled at a fixed rate"""
+
+    rate: float
+    position: np.ndarray
+    velocity: np.ndarray
+    torque: np.ndarray
+
+    def __init__(
+        self,
+        rate: float,
+        position: np.ndarray,
+        velocity: Optional[np.ndarray] = None,
+        torque: Optional[np.ndarray] = None,
+    ):
+        self.rate = rate
+        self.position = np.asarray(position, dtype=float)
+        if velocity is None:
+            # Feed the velocity forward from the position profile
+            velocity = (
+                np.gradient(self.position) * rate
+                if len(self.position) > 1
+                else np.zeros(len(self.position))
+            )
+        self.velocity = np.asarray(velocity, dtype=float)
+        self.torque = (
+            np.zeros(len(self.position))
+            if torque is None
+            else np.asarray(torque, dtype=float)
+        )
+
+    def __len__(self) -> int:
+        return len(self.position)
+
+    @property
+    def duration(self) -> float:
+        return len(self) / self.rate
+
+    def control_frames(
+        self, motor: CyberGearMotor, kp: float, kd: float
+    ) -> List[CyberMotorMessage]:
+        """Build all the operation control frames up front, so streaming only has to send them"""
+        count = len(self)
+
+        def encode(values, range_min: float, range_max: float) -> np.ndarray:
+            # Same as the driver's float_to_uint: clamp, scale and truncate
+            values = np.clip(values, range_min, range_max)
+            scaled = (values - range_min) * UINT16_MAX / (range_max - range_min)
+            return np.broadcast_to(scaled.astype(np.uint32), (count,))
+
+        data = np.stack(
+            (
+                encode(self.position, P_MIN, P_MAX),
+                encode(self.velocity, V_MIN, V_MAX),
+                encode(kp, KP_MIN, KP_MAX),
+                encode(kd, KD_MIN, KD_MAX),
+            ),
+            axis=1,
+        ).astype(">u2")
+        ids = (
+            (Command.POSITION.value << MODE_SHIFT)
+            | (encode(self.torque, T_MIN, T_MAX) << DATA_SHIFT)
+            | motor.motor_id
+        )
+        return [
+            CyberMotorMessage(arbitration_id=int(id), data=row.tobytes())
+            for id, row in zip(ids, data)
+        ]
+
+
+def sample_times(duration: float, rate: float) -> np.ndarray:
+    return np.arange(max(int(round(duration * rate)), 1)) / rate
+
+
+def step(
+    rate: float, duration: float, start: float, end: float, delay: float = 0.0
+) -> Trajectory:
+    """Hold `start` for `delay` seconds, then jump to `end`"""
+    t = sample_times(duration, rate)
+    position = np.where(t < delay, start, end)
+    return Trajectory(rate, position, velocity=np.zeros(len(t)))
+
+
+def ramp(rate: float, duration: float, start: float, end: float) -> Trajectory:
+    """Move from `start` to `end` at constant velocity"""
+    t = sample_times(duration, rate)
+    return Trajectory(rate, np.linspace(start, end, len(t)))
+
+
+def sine(
+    rate: float, duration: float, offset: float, amplitude: float, frequency: float
+) -> Trajectory:
+    t = sample_times(duration, rate)
+    omega = 2 * math.pi * frequency
+    return Trajectory(
+        rate,
+        offset + amplitude * np.sin(omega * t),
+        velocity=amplitude * omega * np.cos(omega * t),
+    )
+
+
+def chirp(
+    rate: float,
+    duration: float,
+    offset: float,
+    amplitude: float,
+    start_frequency: float,
+    end_frequency: float,
+) -> Trajectory:
+    """A sine sweep, with the frequency rising linearly from start to end"""
+    t = sample_times(duration, rate)
+    sweep = (end_frequency - start_frequency) / max(duration, 1e-9)
+    phase = 2 * math.pi * (start_frequency * t + sweep * t**2 / 2)
+    omega = 2 * math.pi * (start_frequency + sweep * t)
+    return Trajectory(
+        rate,
+        offset + amplitude * np.sin(phase),
+        velocity=amplitude * omega * np.cos(phase),
+    )
+
+
+def load_csv(path: str, rate: float) -> Trajectory:
+    """
+    Load a trajectory from a CSV file with a header row and a `position` column.
+    Optional columns: `time` (seconds, resampled to the stream rate), `velocity` and `torque`.
+    Without a time column, each row is one sample at the stream rate.
+    """
+    table = np.genfromtxt(path, delimiter=",", names=True, dtype=float)
+    table = np.atleast_1d(table)
+    columns = table.dtype.names or ()
+    if "position" not in columns:
+        raise ValueError("The CSV file needs a 'position' column")
+
+    values = {
+        name: table[name]
+        for name in ("position", "velocity", "torque")
+        if name in columns
+    }
+    if "time" in columns:
+        times = table["time"] - table["time"][0]
+        t = sample_times(times[-1], rate)
+        values = {name: np.interp(t, times, column) for name, column in values.items()}
+    return Trajectory(rate, **values)
+
+
+class FrameStreamer(threading.Thread):
+    """
+    Sends a list of frames at a fixed rate, one per period, from its own thread.
+
+    Each frame has a deadline on a fixed schedule. The thread sleeps until just before it,
+    then yields until the deadline arrives. If it falls behind by a whole period or more, the
+    stale frames are skipped (and counted as missed), so the stream stays on time.
+    """
+
+    motor: CyberGearMotor
+    frames: List[CyberMotorMessage]
+    period: float
+    stats: StreamStatistics
+    sent: int
+    missed: int
+    max_late: float
+    aborted: bool
+    on_finished: Optional[Callable[[], None]]
+
+    def __init__(
+        self,
+        motor: CyberGearMotor,
+        frames: List[CyberMotorMessage],
+        rate: float,
+        on_finished: Optional[Callable[[], None]] = None,
+    ):
+        super().__init__(daemon=True)
+        self.motor = motor
+        self.frames = frames
+        self.period = 1.0 / rate
+        mode = (frames[0].arbitration_id >> MODE_SHIFT) & MODE_MASK if frames else 0
+        self.stats = StreamStatistics(motor.motor_id, mode)
+        self.sent = 0
+        self.missed = 0
+        self.max_late = 0.0
+        self.aborted = False
+        self.on_finished = on_finished
+        self._abort = threading.Event()
+
+    @property
+    def progress(self) -> float:
+        return (self.sent + self.missed) / max(len(self.frames), 1)
+
+    def abort(self):
+        """Stop streaming right away and stop the motor"""
+        self.aborted = True
+        self._abort.set()
+
+    def send_frame(self, index: int):
+        self.motor.send_message(self.frames[index])
+
+    def run(self):
+        period = self.period
+        start = time.perf_counter()
+        index = 0
+        while index < len(self.frames) and not self._abort.is_set():
+            deadline = start + index * period
+            remaining = deadline - time.perf_counter()
+            if remaining > SPIN_TIME:
+                if self._abort.wait(remaining - SPIN_TIME):
+                    break
+            while time.perf_counter() < deadline:
+                time.sleep(0)
+
+            now = time.perf_counter()
+            late = now - deadline
+            if late >= period:
+                # Too far behind: jump to the frame that's due now
+                skipped = min(int(late / period), len(self.frames) - index - 1)
+                self.missed += skipped
+                index += skipped
+                late -= skipped * period
+
+            self.send_frame(index)
+            sent_at = time.perf_counter()
+            self.stats.add(sent_at, sent_at)
+            self.max_late = max(self.max_late, late)
+            self.sent += 1
+            index += 1
+
+        if self.aborted:
+            self.motor.send_message(stop_request(self.motor))
+        if self.on_finished is not None:
+            self.on_finished()
+
+
+class TrajectoryStreamer(FrameStreamer):
+    """Streams a trajectory as operation control frames"""
+
+    trajectory: Trajectory
+
+    def __init__(
+        self,
+        motor: CyberGearMotor,
+        trajectory: Trajectory,
+        kp: float,
+        kd: float,
+        on_finished: Optional[Callable[[], None]] = None,
+    ):
+        super().__init__(
+            motor,
+            trajectory.control_frames(motor, kp, kd),
+            trajectory.rate,
+            on_finished=on_finished,
+        )
+        self.trajectory = trajectory
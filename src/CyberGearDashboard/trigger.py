@@ -0,0 +1,189 @@
+import csv
+import math
+import threading
+from enum import Enum
+from typing import Callable, Optional, Tuple
+
+import can
+import numpy as np
+
+from CyberGearDriver import CyberGearMotor
+
+from CyberGearDashboard.analysis.frames import FEEDBACK_DTYPE
+from CyberGearDashboard.capture import CAPTURE_RATE, feedback_row, poll_state
+
+# State values a trigger can watch, and the fault flags
+TRIGGER_SOURCES = ("torque", "velocity", "position", "temperature", "faults")
+TRIGGER_EDGES = ("Rising", "Falling", "Either")
+
+# Default capture window around the trigger (in seconds)
+DEFAULT_PRE_TRIGGER = 0.2
+DEFAULT_POST_TRIGGER = 0.5
+
+# Extra room in the ring buffer, in case replies arrive faster than the poll rate
+BUFFER_MARGIN = 2
+
+
+class TriggerState(Enum):
+    IDLE = "Idle"
+    ARMED = "Armed"
+    TRIGGERED = "Triggered"
+    FROZEN = "Captured"
+
+
+class Trigger:
+    """
+    A trigger condition: a state value crossing a level (on a rising, falling or either
+    edge), or for `faults`, any fault flag being raised (even with others already set).
+    """
+
+    source: str
+    level: float
+    edge: str
+    index: int
+
+    def __init__(self, source: str, level: float = 0.0, edge: str = "Rising"):
+        self.source = source
+        self.level = level
+        self.edge = edge
+        self.index = FEEDBACK_DTYPE.names.index(source)
+
+    def fired(self, previous: Tuple, current: Tuple) -> bool:
+        """Whether the trigger fires between two feedback rows"""
+        before = previous[self.index]
+        after = current[self.index]
+        if self.source == "faults":
+            return (int(after) & ~int(before)) != 0
+
+        rising = before < self.level <= after
+        falling = before > self.level >= after
+        if self.edge == "Rising":
+            return rising
+        if self.edge == "Falling":
+            return falling
+        return rising or falling
+
+
+class TriggeredCapture:
+    """
+    An oscilloscope style capture of one motor's feedback.
+
+    While armed, the motor state is polled at the capture rate, and every reply goes into a
+    ring buffer, straight from the receive path. When the trigger fires, it keeps capturing
+    for the post-trigger time, then freezes the window around the trigger (with the
+    pre-trigger samples from the ring buffer) and stops polling.
+    """
+
+    motor: CyberGearMotor
+    trigger: Trigger
+    pre_trigger: float
+    post_trigger: float
+    state: TriggerState
+    trigger_time: Optional[float]
+    frozen: Optional[np.ndarray]
+    on_frozen: Optional[Callable[[], None]]
+
+    def __init__(
+        self,
+        motor: CyberGearMotor,
+        trigger: Trigger,
+        pre_trigger: float = DEFAULT_PRE_TRIGGER,
+        post_trigger: float = DEFAULT_POST_TRIGGER,
+        on_frozen: Optional[Callable[[], None]] = None,
+    ):
+        self.motor = motor
+        self.trigger = trigger
+        self.pre_trigger = pre_trigger
+        self.post_trigger = post_trigger
+        self.on_frozen = on_frozen
+        self.state = TriggerState.IDLE
+        self.trigger_time = None
+        self.frozen = None
+        size = math.ceil((pre_trigger + post_trigger) * CAPTURE_RATE * BUFFER_MARGIN)
+        self.buffer = np.zeros(max(size, 1), dtype=FEEDBACK_DTYPE)
+        self.count = 0
+        self.previous = None
+        self.lock = threading.Lock()
+        self._stop_polling = threading.Event()
+
+    def arm(self):
+        """Start polling at the capture rate and waiting for the trigger"""
+        self._stop_polling.set()
+        with self.lock:
+            self.state = TriggerState.ARMED
+            self.trigger_time = None
+            self.frozen = None
+            self.count = 0
+            self.previous = None
+        self._stop_polling = threading.Event()
+        threading.Thread(
+            target=poll_state,
+            args=(self.motor, math.inf),
+            kwargs={"stop": self._stop_polling},
+            daemon=True,
+        ).start()
+
+    def disarm(self):
+        """Stop capturing (keeps any frozen capture)"""
+        self._stop_polling.set()
+        with self.lock:
+            if self.state != TriggerState.FROZEN:
+                self.state = TriggerState.IDLE
+
+    def force(self):
+        """Trigger now"""
+        with self.lock:
+            if self.state == TriggerState.ARMED and self.previous is not None:
+                self.fire(self.previous[0])
+
+    def fire(self, timestamp: float):
+        self.state = TriggerState.TRIGGERED
+        self.trigger_time = timestamp
+
+    def message_received(self, msg: can.Message):
+        if self.state not in (TriggerState.ARMED, TriggerState.TRIGGERED):
+            return
+        row = feedback_row(msg, self.motor.motor_id)
+        if row is None:
+            return
+
+        frozen = False
+        with self.lock:
+            self.buffer[self.count % len(self.buffer)] = row
+            self.count += 1
+            if self.state == TriggerState.ARMED:
+                if self.previous is not None and self.trigger.fired(self.previous, row):
+                    self.fire(row[0])
+            elif row[0] >= self.trigger_time + self.post_trigger:
+                self.freeze()
+                frozen = True
+            self.previous = row
+
+        if frozen:
+            self._stop_polling.set()
+            if self.on_frozen is not None:
+                self.on_frozen()
+
+    def freeze(self):
+        """Copy the samples around the trigger out of the ring buffer"""
+        size = len(self.buffer)
+        if self.count > size:
+            start = self.count % size
+            samples = np.concatenate((self.buffer[start:], self.buffer[:start]))
+        else:
+            samples = self.buffer[: self.count].copy()
+        timestamps = samples["timestamp"]
+        window = (timestamps >= self.trigger_time - self.pre_trigger) & (
+            timestamps <= self.trigger_time + self.post_trigger
+        )
+        self.frozen = samples[window]
+        self.state = TriggerState.FROZEN
+
+
+def write_csv(path: str, samples: np.ndarray, trigger_time: float):
+    """Export a capture, with the time relative to the trigger"""
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(("time", *FEEDBACK_DTYPE.names[1:]))
+        for row in samples.tolist():
+            writer.writerow((f"{row[0] - trigger_time:.6f}", *row[1:]))
@@ -0,0 +1,2 @@
+from .step_tuning_dialog import StepTuningDialog
+from .frequency_response_dialog import FrequencyResponseDialog
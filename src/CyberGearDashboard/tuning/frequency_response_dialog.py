@@ -0,0 +1,193 @@
+from typing import Dict, Optional
+from PySide6.QtCore import QTimer, Signal
+from PySide6.QtWidgets import (
+    QDialog,
+    QVBoxLayout,
+    QHBoxLayout,
+    QFormLayout,
+    QLabel,
+    QComboBox,
+    QDoubleSpinBox,
+    QSpinBox,
+    QPushButton,
+    QProgressBar,
+)
+
+from CyberGearDriver import CyberGearMotor
+
+from CyberGearDashboard.charts import BodeChart
+from CyberGearDashboard.connection import BusConnection
+from CyberGearDashboard.frequency_test import (
+    EXCITATION_MODES,
+    EXCITATION_SIGNALS,
+    OUTPUTS,
+    FrequencyTest,
+    excitation_signal,
+)
+from CyberGearDashboard.trajectory import MIN_RATE, MAX_RATE, DEFAULT_RATE
+
+# How often to update the progress (in milliseconds)
+REFRESH_RATE_MS = 200
+
+
+class FrequencyResponseDialog(QDialog):
+    """Excite a motor with a chirp or multisine, and show its frequency response as a Bode diagram"""
+
+    motors: Dict[int, CyberGearMotor]
+    connection: BusConnection
+    test: Optional[FrequencyTest]
+    chart: BodeChart
+    timer: QTimer
+
+    test_finished = Signal()
+
+    def __init__(
+        self,
+        motors: Dict[int, CyberGearMotor],
+        connection: BusConnection,
+        *args,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.motors = motors
+        self.connection = connection
+        self.test = None
+
+        # The test finishes on its own thread
+        self.test_finished.connect(self.on_finished)
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.update_progress)
+        self.build_layout()
+
+    @property
+    def motor(self) -> CyberGearMotor:
+        return self.motors[self.motor_input.currentData()]
+
+    def start(self):
+        """Start exciting the motor"""
+        rate = self.rate_input.value()
+        values = excitation_signal(
+            self.signal_input.currentText(),
+            rate,
+            self.duration_input.value(),
+            self.amplitude_input.value(),
+            self.start_frequency_input.value(),
+            self.end_frequency_input.value(),
+        )
+        self.test = FrequencyTest(
+            self.motor,
+            self.connection,
+            self.mode_input.currentText(),
+            values,
+            output=self.output_input.currentText(),
+            rate=rate,
+            on_finished=self.test_finished.emit,
+        )
+        self.chart.clear()
+        self.status.setText("Measuring...")
+        self.test.start()
+        self.timer.start(REFRESH_RATE_MS)
+        self.update_buttons()
+
+    def abort(self):
+        if self.test is not None:
+            self.test.abort()
+
+    def update_progress(self):
+        if self.test is not None:
+            self.progress.setValue(round(self.test.progress * 100))
+
+    def on_finished(self):
+        test = self.test
+        self.test = None
+        self.timer.stop()
+        self.update_buttons()
+        streamer = test.streamer
+        stats = f"sent {streamer.sent}, missed {streamer.missed}, jitter {streamer.stats.jitter:.3f} ms"
+        if streamer.aborted:
+            self.status.setText(f"Aborted ({stats})")
+        elif test.result is None:
+            self.status.setText(f"Not enough feedback was captured ({stats})")
+        else:
+            self.progress.setValue(100)
+            self.chart.set_response(test.result)
+            self.status.setText(f"Done ({stats})")
+
+    def update_buttons(self):
+        running = self.test is not None
+        self.start_button.setEnabled(not running)
+        self.abort_button.setEnabled(running)
+
+    def update_amplitude_unit(self):
+        _, _, unit = EXCITATION_MODES[self.mode_input.currentText()]
+        self.amplitude_input.setSuffix(f" {unit}")
+
+    def done(self, result: int):
+        self.abort()
+        super().done(result)
+
+    def build_layout(self):
+        self.setWindowTitle("Frequency response")
+        self.resize(760, 720)
+
+        self.motor_input = QComboBox()
+        for motor_id in self.motors:
+            self.motor_input.addItem(f"Motor {motor_id}", motor_id)
+        self.mode_input = QComboBox()
+        self.mode_input.addItems(EXCITATION_MODES.keys())
+        self.mode_input.currentTextChanged.connect(self.update_amplitude_unit)
+        self.signal_input = QComboBox()
+        self.signal_input.addItems(EXCITATION_SIGNALS)
+        self.output_input = QComboBox()
+        self.output_input.addItems(OUTPUTS)
+
+        def number(value: float, range, suffix: str = "") -> QDoubleSpinBox:
+            field = QDoubleSpinBox()
+            field.setDecimals(2)
+            field.setRange(*range)
+            field.setValue(value)
+            field.setSuffix(suffix)
+            return field
+
+        self.amplitude_input = number(0.5, (0.01, 23))
+        self.start_frequency_input = number(1.0, (0.1, 500), " Hz")
+        self.end_frequency_input = number(100.0, (0.1, 500), " Hz")
+        self.duration_input = number(10.0, (1, 120), " s")
+        self.rate_input = QSpinBox()
+        self.rate_input.setRange(MIN_RATE, MAX_RATE)
+        self.rate_input.setValue(DEFAULT_RATE)
+        self.rate_input.setSuffix(" Hz")
+        self.update_amplitude_unit()
+
+        form = QFormLayout()
+        form.addRow("Motor", self.motor_input)
+        form.addRow("Mode", self.mode_input)
+        form.addRow("Signal", self.signal_input)
+        form.addRow("Amplitude", self.amplitude_input)
+        form.addRow("From", self.start_frequency_input)
+        form.addRow("To", self.end_frequency_input)
+        form.addRow("Duration", self.duration_input)
+        form.addRow("Sample rate", self.rate_input)
+        form.addRow("Output", self.output_input)
+
+        self.start_button = QPushButton("Start")
+        self.start_button.clicked.connect(self.start)
+        self.abort_button = QPushButton("Abort")
+        self.abort_button.clicked.connect(self.abort)
+        buttons = QHBoxLayout()
+        buttons.addWidget(self.start_button)
+        buttons.addWidget(self.abort_button)
+        buttons.addStretch()
+
+        self.progress = QProgressBar()
+        self.status = QLabel("Warning: the motor will move")
+        self.chart = BodeChart()
+
+        layout = QVBoxLayout()
+        layout.addLayout(form)
+        layout.addLayout(buttons)
+        layout.addWidget(self.progress)
+        layout.addWidget(self.status)
+        layout.addWidget(self.chart, 1)
+        self.setLayout(layout)
+        self.update_buttons()
@@ -0,0 +1,276 @@
+import math
+from typing import Dict, List, Optional
+from PySide6.QtCore import Qt, Signal
+from PySide6.QtWidgets import (
+    QDialog,
+    QVBoxLayout,
+    QHBoxLayout,
+    QFormLayout,
+    QLabel,
+    QLineEdit,
+    QComboBox,
+    QDoubleSpinBox,
+    QPushButton,
+    QProgressBar,
+    QTableWidget,
+    QTableWidgetItem,
+    QAbstractItemView,
+    QHeaderView,
+)
+
+import pyqtgraph as pg
+
+from CyberGearDriver import CyberGearMotor, P_MIN, P_MAX
+
+from CyberGearDashboard.connection import BusConnection
+from CyberGearDashboard.step_test import (
+    GainSweep,
+    StepTestResult,
+    TUNING_PARAMS,
+    SETTLE_TIME,
+    CAPTURE_TIME,
+)
+
+# Metric columns: (metric, title, scale)
+METRIC_COLUMNS = (
+    ("rise_time", "Rise (ms)", 1000),
+    ("overshoot", "Overshoot (%)", 1),
+    ("settling_time", "Settling (ms)", 1000),
+    ("steady_state_error", "SS error (rad)", 1),
+    ("iae", "IAE", 1),
+)
+
+
+def parse_values(text: str) -> List[float]:
+    """Parse a comma separated list of numbers"""
+    return [float(value) for value in text.replace(" ", "").split(",") if value]
+
+
+class StepTuningDialog(QDialog):
+    """Step-test a motor across a grid of position/velocity loop gains, and rank the results"""
+
+    motors: Dict[int, CyberGearMotor]
+    connection: BusConnection
+    sweep: Optional[GainSweep]
+    results: List[StepTestResult]
+    gain_inputs: Dict[str, QLineEdit]
+    table: QTableWidget
+    plot: pg.PlotWidget
+
+    result_ready = Signal(object)
+    sweep_finished = Signal()
+
+    def __init__(
+        self,
+        motors: Dict[int, CyberGearMotor],
+        connection: BusConnection,
+        *args,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.motors = motors
+        self.connection = connection
+        self.sweep = None
+        self.results = []
+
+        # Signals move the sweep callbacks from its thread to the UI thread
+        self.result_ready.connect(self.show_result)
+        self.sweep_finished.connect(self.on_finished)
+        self.build_layout()
+
+    @property
+    def motor(self) -> CyberGearMotor:
+        return self.motors[self.motor_input.currentData()]
+
+    def start(self):
+        """Start the sweep"""
+        try:
+            grid = {
+                name: parse_values(field.text())
+                for name, field in self.gain_inputs.items()
+                if field.text().strip()
+            }
+        except ValueError:
+            self.status.setText("Gains must be comma separated numbers")
+            return
+
+        self.results = []
+        self.table.setRowCount(0)
+        self.plot.clear()
+        self.sweep = GainSweep(
+            self.motor,
+            self.connection,
+            self.start_input.value(),
+            self.target_input.value(),
+            grid,
+            settle_time=self.settle_input.value(),
+            capture_time=self.capture_input.value(),
+            on_result=self.result_ready.emit,
+            on_finished=self.sweep_finished.emit,
+        )
+        self.progress.setRange(0, len(self.sweep.combinations))
+        self.progress.setValue(0)
+        self.status.setText(f"Running {len(self.sweep.combinations)} step tests...")
+        self.sweep.start()
+        self.update_buttons()
+
+    def cancel(self):
+        if self.sweep is not None:
+            self.sweep.cancel()
+
+    def show_result(self, result: StepTestResult):
+        """A step test finished, plot its response"""
+        self.results.append(result)
+        self.progress.setValue(len(self.results))
+        self.plot.plot(result.t * 1000, result.position, pen=pg.mkPen(width=1))
+
+    def on_finished(self):
+        """Show the ranked results"""
+        error = self.sweep.error if self.sweep is not None else None
+        self.sweep = None
+        self.update_buttons()
+        if error:
+            self.status.setText(error)
+            return
+        self.status.setText(
+            f"Finished {len(self.results)} step tests, restored the original gains"
+        )
+
+        ranked = sorted(
+            (r for r in self.results if r.rank is not None), key=lambda r: r.rank
+        )
+        self.table.setRowCount(len(ranked))
+        for row, result in enumerate(ranked):
+            values = [str(result.rank)]
+            values += [
+                f"{result.gains[name]:g}" if name in result.gains else "-"
+                for name in TUNING_PARAMS
+            ]
+            for metric, _, scale in METRIC_COLUMNS:
+                value = result.metrics.get(metric, math.nan)
+                values.append("-" if math.isnan(value) else f"{value * scale:.3f}")
+            for col, text in enumerate(values):
+                item = QTableWidgetItem(text)
+                item.setData(Qt.ItemDataRole.UserRole, self.results.index(result))
+                self.table.setItem(row, col, item)
+        if ranked:
+            self.table.selectRow(0)
+
+    def selected_result(self) -> Optional[StepTestResult]:
+        rows = self.table.selectionModel().selectedRows()
+        if not rows:
+            return None
+        return self.results[
+            self.table.item(rows[0].row(), 0).data(Qt.ItemDataRole.UserRole)
+        ]
+
+    def show_selected(self):
+        """Highlight the selected response"""
+        result = self.selected_result()
+        self.plot.clear()
+        for other in self.results:
+            self.plot.plot(
+                other.t * 1000, other.position, pen=pg.mkPen("#555", width=1)
+            )
+        if result is not None:
+            self.plot.plot(result.t * 1000, result.position, pen=pg.mkPen("y", width=2))
+        self.plot.addLine(
+            y=self.target_input.value(), pen=pg.mkPen("g", style=Qt.PenStyle.DashLine)
+        )
+
+    def apply_selected(self):
+        """Write the selected gains to the motor"""
+        result = self.selected_result()
+        if result is None:
+            return
+        for name, value in result.gains.items():
+            self.motor.set_parameter(name, value)
+        self.status.setText(
+            "Applied " + ", ".join(f"{n}={v:g}" for n, v in result.gains.items())
+        )
+
+    def update_buttons(self):
+        running = self.sweep is not None
+        self.run_button.setEnabled(not running)
+        self.cancel_button.setEnabled(running)
+        self.apply_button.setEnabled(not running)
+
+    def done(self, result: int):
+        self.cancel()
+        super().done(result)
+
+    def build_layout(self):
+        self.setWindowTitle("Step response tuning")
+        self.resize(760, 640)
+
+        self.motor_input = QComboBox()
+        for motor_id in self.motors:
+            self.motor_input.addItem(f"Motor {motor_id}", motor_id)
+
+        def number(value: float, range, suffix: str) -> QDoubleSpinBox:
+            field = QDoubleSpinBox()
+            field.setDecimals(3)
+            field.setRange(*range)
+            field.setValue(value)
+            field.setSuffix(suffix)
+            return field
+
+        self.start_input = number(0.0, (P_MIN, P_MAX), " rad")
+        self.target_input = number(1.0, (P_MIN, P_MAX), " rad")
+        self.settle_input = number(SETTLE_TIME, (0.1, 30), " s")
+        self.capture_input = number(CAPTURE_TIME, (0.1, 30), " s")
+
+        form = QFormLayout()
+        form.addRow("Motor", self.motor_input)
+        form.addRow("Step from", self.start_input)
+        form.addRow("Step to", self.target_input)
+        form.addRow("Hold before step", self.settle_input)
+        form.addRow("Capture after step", self.capture_input)
+        self.gain_inputs = {}
+        for name in TUNING_PARAMS:
+            field = QLineEdit()
+            field.setPlaceholderText("Leave empty to keep the current value")
+            self.gain_inputs[name] = field
+            form.addRow(f"{name} values", field)
+        self.gain_inputs["loc_kp"].setText("10, 30, 60")
+
+        self.run_button = QPushButton("Run sweep")
+        self.run_button.clicked.connect(self.start)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.clicked.connect(self.cancel)
+        self.apply_button = QPushButton("Apply selected gains")
+        self.apply_button.clicked.connect(self.apply_selected)
+        buttons = QHBoxLayout()
+        buttons.addWidget(self.run_button)
+        buttons.addWidget(self.cancel_button)
+        buttons.addStretch()
+        buttons.addWidget(self.apply_button)
+
+        self.progress = QProgressBar()
+        self.status = QLabel("Warning: the motor will move")
+
+        headers = ["Rank", *TUNING_PARAMS, *(title for _, title, _ in METRIC_COLUMNS)]
+        self.table = QTableWidget(0, len(headers))
+        self.table.setHorizontalHeaderLabels(headers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(
+            QHeaderView.ResizeMode.ResizeToContents
+        )
+        self.table.itemSelectionChanged.connect(self.show_selected)
+
+        self.plot = pg.PlotWidget()
+        self.plot.setLabel("bottom", "Time since step (ms)")
+        self.plot.setLabel("left", "Position (rad)")
+
+        layout = QVBoxLayout()
+        layout.addLayout(form)
+        layout.addLayout(buttons)
+        layout.addWidget(self.progress)
+        layout.addWidget(self.status)
+        layout.addWidget(self.table)
+        layout.addWidget(self.plot)
+        self.setLayout(layout)
+        self.update_buttons()
@@ -1,41 +1,154 @@
 import threading
 import time
-from typing import Set
+from itertools import chain, zip_longest
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
-from CyberGearDriver import CyberGearMotor, ParameterName
+from CyberGearDriver import CyberGearMotor, CyberMotorMessage, ParameterName
 
-# How often to request updates from the motor (in seconds)
+from CyberGearDashboard.protocol import (
+    state_request,
+    fault_request,
+    parameter_request,
+)
+
+# How often to request updates from each motor (in seconds)
 UPDATE_RATE = 0.1
 
+# A poll request as a raw frame: (arbitration ID, data, extended ID)
+PollFrame = Tuple[int, bytes, bool]
+
+
+def interleave(queues: Sequence[list], cycle: int) -> list:
+    """
+    Interleave the per-motor request queues round-robin, rotating which motor goes first
+    every cycle, so they all take turns at the front
+    """
+    queues = list(queues)
+    if queues:
+        start = cycle % len(queues)
+        queues = queues[start:] + queues[:start]
+    rounds = zip_longest(*queues)
+    return [request for request in chain.from_iterable(rounds) if request]
+
+
+def poll_frame(message: CyberMotorMessage) -> PollFrame:
+    return (message.arbitration_id, bytes(message.data), message.is_extended_id)
+
 
 class MotorWatcher(threading.Thread):
+    """
+    Polls all motors on the bus for their state, faults and watched parameters.
+
+    Requests from every motor are interleaved round-robin and spaced out evenly over
+    the update period, so no motor waits behind another and the bus doesn't get bursts.
+
+    With a `scheduler` (i.e. the bus process), the request frames are handed to it
+    whenever they change, and it does the sending.
+    """
+
     is_watching: bool
-    motor: CyberGearMotor
-    params: Set[ParameterName]
+    motors: Dict[int, CyberGearMotor]
+    params: Dict[int, Set[ParameterName]]
+    scheduler: Optional[Callable[[List[List[PollFrame]]], None]]
 
-    def __init__(self, motor=CyberGearMotor, *args, **kwargs):
-        self.motor = motor
-        self.params = set()
+    def __init__(
+        self,
+        motors: Iterable[CyberGearMotor] = (),
+        scheduler: Optional[Callable[[List[List[PollFrame]]], None]] = None,
+        *args,
+        **kwargs,
+    ):
+        self.motors = {}
+        self.params = {}
+        self.scheduler = scheduler
+        self.cycle = 0
+        self.lock = threading.Lock()
+        for motor in motors:
+            self.add_motor(motor)
         super().__init__(daemon=True, *args, **kwargs)
 
-    def watch_param(self, name: ParameterName):
-        """Add a parameter to watch"""
-        self.params.add(name)
+    def add_motor(self, motor: CyberGearMotor):
+        """Start polling a motor"""
+        with self.lock:
+            self.motors[motor.motor_id] = motor
+            self.params.setdefault(motor.motor_id, set())
 
-    def unwatch_param(self, name: ParameterName):
+    def remove_motor(self, motor_id: int):
+        """Stop polling a motor"""
+        with self.lock:
+            self.motors.pop(motor_id, None)
+            self.params.pop(motor_id, None)
+
+    def watch_param(self, name: ParameterName, motor_id: Optional[int] = None):
+        """Add a parameter to watch, on one motor or all of them"""
+        with self.lock:
+            for id in self.motors if motor_id is None else (motor_id,):
+                self.params.setdefault(id, set()).add(name)
+
+    def unwatch_param(self, name: ParameterName, motor_id: Optional[int] = None):
         """Remove a parameter to watch"""
-        self.params.remove(name)
+        with self.lock:
+            for id in self.motors if motor_id is None else (motor_id,):
+                self.params.get(id, set()).discard(name)
 
     def stop_watching(self):
         """Stop watching the motor"""
         self.is_watching = False
 
+    def request_queues(self) -> List[List[Tuple[CyberGearMotor, CyberMotorMessage]]]:
+        """The requests for one update period, per motor"""
+        with self.lock:
+            queues = []
+            for motor_id, motor in self.motors.items():
+                queue = [(motor, state_request(motor))]
+                for param in self.params[motor_id]:
+                    queue.append((motor, parameter_request(motor, param)))
+                queue.append((motor, fault_request(motor)))
+                queues.append(queue)
+        return queues
+
+    def schedule(self) -> List[Tuple[CyberGearMotor, CyberMotorMessage]]:
+        """The requests for one update period, interleaved across all motors"""
+        requests = interleave(self.request_queues(), self.cycle)
+        self.cycle += 1
+        return requests
+
     def run(self):
         self.is_watching = True
+        if self.scheduler is not None:
+            self.run_scheduler()
+            return
+
+        next_send = time.perf_counter()
         while self.is_watching:
-            self.motor.request_motor_state()
-            for param in self.params:
-                self.motor.request_parameter(param)
-            self.motor.request_motor_fault_status()
+            requests = self.schedule()
+            if not requests:
+                time.sleep(UPDATE_RATE)
+                next_send = time.perf_counter()
+                continue
+
+            interval = UPDATE_RATE / len(requests)
+            for motor, message in requests:
+                delay = next_send - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                motor.send_message(message)
+                next_send += interval
 
+            # Don't try to catch up after a stall (i.e. the bus was busy)
+            now = time.perf_counter()
+            if next_send < now - UPDATE_RATE:
+                next_send = now
+
+    def run_scheduler(self):
+        """Keep the scheduler's requests up to date with the watched motors and params"""
+        published = None
+        while self.is_watching:
+            queues = [
+                [poll_frame(message) for _, message in queue]
+                for queue in self.request_queues()
+            ]
+            if queues != published:
+                self.scheduler(queues)
+                published = queues
             time.sleep(UPDATE_RATE)
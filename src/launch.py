@@ -1,18 +1,62 @@
 import sys
 
 from CyberGearDashboard import openDashboard
-from CyberGearDashboard.args_parser import parse_args
+from CyberGearDashboard.args_parser import (
+    parse_args,
+    parse_scan_args,
+    parse_replay_args,
+    parse_analyze_args,
+    parse_estop_benchmark_args,
+)
+from CyberGearDashboard.discovery import print_scan
 
 
 def launch() -> None:
     """Launch the CyberGear Dashboard"""
-    args = parse_args(sys.argv[1:])
+    argv = sys.argv[1:]
+    if argv and argv[0] == "scan":
+        args = parse_scan_args(argv[1:])
+        print_scan(
+            interface=args.interface,
+            channel=args.channel,
+            bitrate=args.bitrate,
+            timeout=args.timeout,
+        )
+        return
+    if argv and argv[0] == "replay":
+        from CyberGearDashboard.replay import openReplay
+
+        args = parse_replay_args(argv[1:])
+        openReplay(args.session)
+        return
+    if argv and argv[0] == "analyze":
+        from CyberGearDashboard.analysis.summary import analyze
+
+        args = parse_analyze_args(argv[1:])
+        analyze(args.files, window=args.window, jobs=args.jobs, csv_path=args.csv)
+        return
+    if argv and argv[0] == "estop-benchmark":
+        from CyberGearDashboard.estop import benchmark
+
+        args = parse_estop_benchmark_args(argv[1:])
+        within = benchmark(
+            interface=args.interface,
+            channel=args.channel,
+            bitrate=args.bitrate,
+            motor_ids=args.motor_ids,
+            runs=args.runs,
+            load_threads=args.load_threads,
+        )
+        raise SystemExit(0 if within else 1)
+
+    args = parse_args(argv)
     openDashboard(
         channel=args.channel,
         interface=args.interface,
-        motor_id=args.motor_id,
+        motor_ids=args.motor_ids,
         verbose=args.verbose,
         bitrate=args.bitrate,
+        bus_process=args.bus_process,
     )
 
 
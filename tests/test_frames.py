@@ -0,0 +1,25 @@
+import numpy as np
+
+from CyberGearDashboard.analysis.frames import (
+    FLAG_ERROR,
+    FLAG_EXTENDED,
+    parse_candump,
+    parse_candump_line,
+)
+
+
+def test_error_frame_block_matches_line():
+    line = b"(1.0) can0 20000004#0004000000000000"
+    block = parse_candump(line + b"\n")
+    single = parse_candump_line(line)
+    assert np.array_equal(block, single)
+    assert block["arbitration_id"][0] == 0x4
+    assert block["flags"][0] == FLAG_ERROR | FLAG_EXTENDED
+
+
+def test_data_frame_block_matches_line():
+    line = b"(1436509052.249713) can0 0200007F#7FFF80007FFF012C"
+    block = parse_candump(line + b"\n")
+    single = parse_candump_line(line)
+    assert np.array_equal(block, single)
+    assert block["flags"][0] == FLAG_EXTENDED